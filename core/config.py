@@ -56,6 +56,12 @@ class Settings(BaseSettings):
     CHROMADB_PORT: int = Field(
         default=8001, description="ChromaDB port", ge=1, le=65535
     )
+    CHROMADB_PATH: str = Field(
+        default="./data/chromadb", description="Local vector storage path"
+    )
+    CHROMA_COLLECTION_NAME: str = Field(
+        default="softarchitect", description="Collection searched by the server"
+    )
 
     # Ollama Configuration
     OLLAMA_HOST: str = Field(default="localhost", description="Ollama host")
@@ -63,6 +69,15 @@ class Settings(BaseSettings):
     OLLAMA_MODEL: str = Field(
         default="llama3.2:latest", description="Ollama model name"
     )
+    OLLAMA_EMBED_MODEL: str = Field(
+        default="nomic-embed-text",
+        description="Ollama embedding model (documents and search queries)",
+    )
+
+    @property
+    def OLLAMA_BASE_URL(self) -> str:
+        """HTTP URL of the Ollama server."""
+        return f"http://{self.OLLAMA_HOST}:{self.OLLAMA_PORT}"
 
     # LLM Provider (local or cloud)
     LLM_PROVIDER: str = Field(default="local", description="LLM provider (local/cloud)")
@@ -5,15 +5,47 @@ semantic chunking to build a knowledge base for AI-powered retrieval.
 
 Main components:
 - DocumentLoader: Recursive Markdown file loading with semantic chunking
+- AsyncDocumentLoader: Event-loop friendly loading with backpressure
+- ChunkBatch: Columnar batches of chunks for bulk embedding and indexing
+- EmbeddingPipeline: Token-budgeted, concurrent embedding through Ollama
+- ingest_chunks: Embeds chunks and upserts them into the server's ChromaDB
+  collection
+- KnowledgeBaseWatcher: Live add/update/delete events as files change
 - MarkdownCleaner: Text normalization and security hardening
+- ChunkCache: Content-addressed cache of cleaned and chunked documents
+- IngestionManifest: Persistent file signatures for incremental re-ingestion
+- Tokenizer: Pluggable token counting for token-budgeted chunking
 """
 
 from .document_loader import DocumentLoader, DocumentMetadata, DocumentChunk
-from .markdown_cleaner import MarkdownCleaner
+from .async_loader import AsyncDocumentLoader
+from .chunk_batch import ChunkBatch
+from .chunk_cache import ChunkCache
+from .embedding_pipeline import EmbeddingPipeline, EmbeddingStats
+from .chroma_ingestion import chunk_metadata, ingest_chunks
+from .ingestion_manifest import ChunkTombstone, IngestionManifest, ManifestEntry
+from .markdown_cleaner import CleaningStats, MarkdownCleaner
+from .watcher import KnowledgeBaseEvent, KnowledgeBaseWatcher
+from .tokenizers import RegexTokenizer, Tokenizer
 
 __all__ = [
     "DocumentLoader",
     "DocumentMetadata",
     "DocumentChunk",
+    "AsyncDocumentLoader",
+    "ChunkBatch",
+    "EmbeddingPipeline",
+    "EmbeddingStats",
+    "ingest_chunks",
+    "chunk_metadata",
+    "KnowledgeBaseWatcher",
+    "KnowledgeBaseEvent",
     "MarkdownCleaner",
+    "CleaningStats",
+    "ChunkCache",
+    "IngestionManifest",
+    "ManifestEntry",
+    "ChunkTombstone",
+    "Tokenizer",
+    "RegexTokenizer",
 ]
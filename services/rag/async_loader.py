@@ -0,0 +1,173 @@
+"""Asyncio-native front end for DocumentLoader.
+
+DocumentLoader does blocking file IO and CPU-bound cleaning. Calling it from
+a coroutine (e.g. a re-index endpoint in the FastAPI process) would stall the
+event loop and every chat request sharing it. AsyncDocumentLoader runs that
+work on a small bounded thread pool and hands chunks back through a bounded
+asyncio.Queue, so:
+
+- at most ``max_in_flight`` files are being processed at once
+- a slow consumer pauses ingestion instead of buffering the whole corpus
+- closing or cancelling the consumer stops ingestion promptly
+
+Each file is loaded by a private copy of the loader with its own IOStats;
+the event loop merges them into ``loader.io_stats``, so pool threads never
+update shared counters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from .document_loader import DocumentChunk, DocumentLoader, IOStats
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the producer's output in the queue
+_DONE = object()
+
+
+class AsyncDocumentLoader:
+    """Load documents without blocking the event loop.
+
+    Example:
+        >>> loader = AsyncDocumentLoader(DocumentLoader())
+        >>> async for chunk in loader.aload_all_documents():
+        ...     await index(chunk)
+    """
+
+    DEFAULT_WORKERS = 2
+    DEFAULT_QUEUE_SIZE = 256  # chunks buffered ahead of the consumer
+
+    def __init__(
+        self,
+        loader: DocumentLoader,
+        workers: int = DEFAULT_WORKERS,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_in_flight: Optional[int] = None,
+    ):
+        """Initialize the async loader.
+
+        Args:
+            loader: Configured DocumentLoader doing the actual work.
+            workers: Threads used for file IO, cleaning and chunking.
+            max_queue_size: Chunks buffered before ingestion pauses.
+            max_in_flight: Files submitted to the pool at once. Defaults to
+                ``workers``.
+
+        Raises:
+            ValueError: If workers, max_queue_size or max_in_flight is lower
+                than 1.
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if max_queue_size < 1:
+            raise ValueError(f"max_queue_size must be >= 1, got {max_queue_size}")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be >= 1, got {max_in_flight}")
+
+        self.loader = loader
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.max_in_flight = max_in_flight or workers
+
+    async def aload_document(self, filepath: Path) -> list[DocumentChunk]:
+        """Load and chunk a single document off the event loop.
+
+        Raises:
+            ValueError: Same as DocumentLoader.load_document.
+        """
+        return await asyncio.to_thread(self.loader.load_document, filepath)
+
+    async def aload_all_documents(self) -> AsyncGenerator[DocumentChunk, None]:
+        """Yield all document chunks from the knowledge base.
+
+        Chunks come in the same order as DocumentLoader.load_all_documents.
+        Files that fail to load are logged and skipped, like the sync path.
+
+        Yields:
+            DocumentChunk: Semantic chunks of documents.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="doc-loader"
+        )
+        producer = asyncio.create_task(self._produce(queue, executor))
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+            # Files already running finish in the background; queued ones drop
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _produce(
+        self, queue: asyncio.Queue, executor: ThreadPoolExecutor
+    ) -> None:
+        """Scan, load and enqueue chunks, keeping max_in_flight files busy."""
+        loop = asyncio.get_running_loop()
+        pending: deque[tuple[str, asyncio.Future]] = deque()
+        try:
+            entries = await loop.run_in_executor(
+                executor, lambda: list(self.loader.scan_markdown_files())
+            )
+            entries_iter = iter(entries)
+
+            def submit_next() -> bool:
+                entry = next(entries_iter, None)
+                if entry is None:
+                    return False
+                future = loop.run_in_executor(executor, self._load_entry, entry)
+                pending.append((entry.path, future))
+                return True
+
+            while len(pending) < self.max_in_flight and submit_next():
+                pass
+
+            while pending:
+                path, future = pending.popleft()
+                chunks, error, io_stats = await future
+                self.loader.io_stats.merge(io_stats)
+                if error is not None:
+                    logger.error(f"Error processing {path}: {error}")
+                submit_next()
+                for chunk in chunks:
+                    await queue.put(chunk)  # Backpressure: waits for consumer
+
+            await queue.put(_DONE)
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as e:
+            await queue.put(e)
+
+    def _load_entry(
+        self, entry: os.DirEntry
+    ) -> tuple[list[DocumentChunk], Optional[Exception], IOStats]:
+        """Fully load one scanned file (runs on a pool thread).
+
+        Errors are returned instead of raised, together with the IO counters
+        of this file, which the event loop merges into the shared loader.
+        """
+        loader = copy.copy(self.loader)
+        loader.io_stats = IOStats()
+        try:
+            return list(loader.load_entry(entry)), None, loader.io_stats
+        except Exception as e:
+            return [], e, loader.io_stats
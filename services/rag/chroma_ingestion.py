@@ -0,0 +1,111 @@
+"""Ingestion of the knowledge base into the ChromaDB collection.
+
+The last ingestion stage: DocumentLoader (or AsyncDocumentLoader) output
+is embedded by an EmbeddingPipeline and upserted into the collection the
+backend server searches (CHROMA_COLLECTION_NAME), one record per chunk:
+
+- id: the chunk id ("path#index"), so re-ingesting a file replaces its
+  records instead of duplicating them
+- document: the chunk text, read back by the server for BM25 and chat
+- metadata: category, tags, language and depth (the filterable fields)
+  plus title, filepath and position in the document
+- embedding: the chunk vector, from OLLAMA_EMBED_MODEL, the model the
+  server embeds search queries with
+
+Example:
+    >>> loader = DocumentLoader()
+    >>> async with EmbeddingPipeline(cache=EmbeddingCache()) as pipeline, \\
+    ...         ChromaCollection() as collection:
+    ...     await ingest_chunks(loader.load_all_documents(), pipeline, collection)
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import AsyncIterable, Iterable, Union
+
+import numpy as np
+
+from services.vectors.chroma_collection import (
+    ChromaCollection,
+    MetadataValue,
+    chroma_metadata,
+)
+
+from .document_loader import DocumentChunk
+from .embedding_pipeline import EmbeddedChunk, EmbeddingPipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPSERT_BATCH = 256  # Records per upsert request
+
+
+def chunk_metadata(chunk: DocumentChunk) -> dict[str, MetadataValue]:
+    """Return the Chroma record metadata of a chunk."""
+    metadata = chunk.metadata
+    return chroma_metadata(
+        {
+            "title": metadata.title,
+            "filepath": metadata.filepath,
+            "category": metadata.category,
+            "tags": metadata.tags,
+            "language": metadata.language,
+            "depth": metadata.depth,
+            "chunk_index": chunk.chunk_index,
+            "total_chunks": chunk.total_chunks,
+            "header_level": chunk.header_level,
+        }
+    )
+
+
+async def ingest_chunks(
+    chunks: Union[Iterable[DocumentChunk], AsyncIterable[DocumentChunk]],
+    pipeline: EmbeddingPipeline,
+    collection: ChromaCollection,
+    batch_size: int = DEFAULT_UPSERT_BATCH,
+) -> int:
+    """Embed chunks and upsert them into a Chroma collection.
+
+    Records are upserted in batches as embeddings complete, so memory holds
+    at most one batch of vectors.
+
+    Args:
+        chunks: DocumentLoader or AsyncDocumentLoader output.
+        pipeline: Embeds the chunks (and caches their vectors).
+        collection: Collection the server searches.
+        batch_size: Records per upsert request.
+
+    Returns:
+        Number of chunks upserted.
+
+    Raises:
+        ValueError: If batch_size < 1.
+        httpx.HTTPError: If Ollama or ChromaDB fails; batches upserted
+            before the failure stay in the collection.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+    batch: list[EmbeddedChunk] = []
+    upserted = 0
+    async for pair in pipeline.embed_chunks(chunks):
+        batch.append(pair)
+        if len(batch) == batch_size:
+            upserted += await _upsert(collection, batch)
+            batch = []
+    if batch:
+        upserted += await _upsert(collection, batch)
+
+    logger.info(f"Upserted {upserted} chunks into Chroma collection {collection.name}")
+    return upserted
+
+
+async def _upsert(collection: ChromaCollection, batch: list[EmbeddedChunk]) -> int:
+    chunks = [chunk for chunk, _ in batch]
+    await collection.upsert(
+        [chunk.chunk_id for chunk in chunks],
+        [chunk.content for chunk in chunks],
+        [chunk_metadata(chunk) for chunk in chunks],
+        np.stack([vector for _, vector in batch]),
+    )
+    return len(batch)
@@ -0,0 +1,156 @@
+"""Columnar container for bulk handoff of document chunks.
+
+A ChunkBatch holds the chunks produced by DocumentLoader as parallel
+columns instead of one DocumentChunk object per chunk, so the embedder and
+the vector store can consume whole batches without per-object attribute
+access. Numeric columns are stdlib ``array.array`` instances, which expose
+the buffer protocol (``numpy.frombuffer`` views them without copying).
+
+Serialization: with pickle protocol 5 every column is emitted as an
+out-of-band buffer, so handing a batch to a worker process with a
+``buffer_callback`` (or through ``multiprocessing.shared_memory``) avoids
+copies. On the receiving side numeric columns are read-only memoryviews
+over those buffers; only the chunk texts are decoded into new strings. The
+first append() to a restored batch copies its columns back into arrays.
+"""
+
+from __future__ import annotations
+
+import pickle
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from .document_loader import DocumentChunk, DocumentMetadata
+
+# Stored for None values (array columns cannot hold None)
+NO_HEADER = 0
+NO_TOKEN_COUNT = 0
+
+NUMERIC_COLUMNS = (
+    "doc_ids",
+    "chunk_indexes",
+    "total_chunks",
+    "char_counts",
+    "header_levels",
+    "token_counts",
+)
+
+
+@dataclass
+class ChunkBatch:
+    """A batch of chunks stored as parallel columns.
+
+    Row ``i`` of the batch is described by ``contents[i]``,
+    ``documents[doc_ids[i]]``, ``chunk_indexes[i]`` and so on.
+    """
+
+    contents: list[str] = field(default_factory=list)
+    documents: list[DocumentMetadata] = field(default_factory=list)
+    doc_ids: array = field(default_factory=lambda: array("I"))
+    chunk_indexes: array = field(default_factory=lambda: array("I"))
+    total_chunks: array = field(default_factory=lambda: array("I"))
+    char_counts: array = field(default_factory=lambda: array("I"))
+    header_levels: array = field(default_factory=lambda: array("B"))
+    token_counts: array = field(default_factory=lambda: array("I"))
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[DocumentChunk]) -> ChunkBatch:
+        """Build a batch from DocumentChunk objects.
+
+        Chunks sharing a metadata object (all chunks of one document) share
+        a single entry in ``documents``.
+        """
+        batch = cls()
+        for chunk in chunks:
+            batch.append(chunk)
+        return batch
+
+    def append(self, chunk: DocumentChunk) -> None:
+        """Add one chunk as a new row."""
+        if not isinstance(self.doc_ids, array):
+            self._copy_columns()
+        documents = self.documents
+        if not documents or documents[-1] is not chunk.metadata:
+            documents.append(chunk.metadata)
+        self.contents.append(chunk.content)
+        self.doc_ids.append(len(documents) - 1)
+        self.chunk_indexes.append(chunk.chunk_index)
+        self.total_chunks.append(chunk.total_chunks)
+        self.char_counts.append(chunk.char_count)
+        self.header_levels.append(chunk.header_level or NO_HEADER)
+        self.token_counts.append(chunk.token_count or NO_TOKEN_COUNT)
+
+    def _copy_columns(self) -> None:
+        """Replace read-only column views (after unpickling) with arrays."""
+        for name in NUMERIC_COLUMNS:
+            column = getattr(self, name)
+            if not isinstance(column, array):
+                setattr(self, name, array(column.format, column.tobytes()))
+
+    def chunk_ids(self) -> list[str]:
+        """Return the DocumentChunk.chunk_id of every row."""
+        documents = self.documents
+        return [
+            f"{documents[doc_id].filepath}#{index}"
+            for doc_id, index in zip(self.doc_ids, self.chunk_indexes)
+        ]
+
+    def metadata_at(self, row: int) -> DocumentMetadata:
+        """Return the metadata of the document a row belongs to."""
+        return self.documents[self.doc_ids[row]]
+
+    def to_chunks(self) -> Iterator[DocumentChunk]:
+        """Rebuild DocumentChunk objects, one per row."""
+        documents = self.documents
+        for i, content in enumerate(self.contents):
+            level = self.header_levels[i]
+            tokens = self.token_counts[i]
+            yield DocumentChunk(
+                content=content,
+                metadata=documents[self.doc_ids[i]],
+                chunk_index=self.chunk_indexes[i],
+                total_chunks=self.total_chunks[i],
+                char_count=self.char_counts[i],
+                header_level=level if level != NO_HEADER else None,
+                token_count=tokens if tokens != NO_TOKEN_COUNT else None,
+            )
+
+    def __reduce_ex__(self, protocol: int):
+        """Pickle the columns as raw buffers (out-of-band under protocol 5)."""
+        encoded = [text.encode("utf-8") for text in self.contents]
+        offsets = array("Q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        columns = (offsets, *(getattr(self, name) for name in NUMERIC_COLUMNS))
+        typecodes = tuple(
+            c.typecode if isinstance(c, array) else c.format for c in columns
+        )
+        buffers = (b"".join(encoded), *columns)
+        if protocol >= 5:
+            buffers = tuple(pickle.PickleBuffer(b) for b in buffers)
+        else:
+            buffers = tuple(bytes(b) for b in buffers)
+        return (_rebuild_batch, (self.documents, typecodes, buffers))
+
+
+def _rebuild_batch(
+    documents: list[DocumentMetadata],
+    typecodes: tuple[str, ...],
+    buffers: tuple,
+) -> ChunkBatch:
+    """Unpickle a ChunkBatch serialized by ChunkBatch.__reduce_ex__."""
+    blob = memoryview(buffers[0]).cast("B")
+    # Numeric columns stay read-only views over the received buffers
+    offsets, *columns = [
+        memoryview(buffer).cast("B").cast(typecode)
+        for typecode, buffer in zip(typecodes, buffers[1:])
+    ]
+    contents = [
+        str(blob[offsets[i] : offsets[i + 1]], "utf-8")
+        for i in range(len(offsets) - 1)
+    ]
+    return ChunkBatch(contents, documents, *columns)
@@ -0,0 +1,230 @@
+"""Content-addressed cache of cleaned and chunked documents.
+
+Cleaning and chunking a file depends only on its bytes and on the chunker
+configuration, so the result can be reused whenever both are unchanged,
+even after a container restart or when the same bytes live under another
+path. Entries are keyed by a BLAKE2b digest of the raw bytes plus a
+configuration fingerprint (see DocumentLoader.cache_fingerprint) and hold
+the serialized chunk list: content, header level and token count of every
+chunk. Metadata is not cached; it is cheap and depends on path and mtime.
+
+Storage: a single SQLite file with size-bounded LRU eviction. Payloads are
+JSON (never pickle), zstd-compressed when ``zstandard`` is installed. One
+cache may be shared by threads (AsyncDocumentLoader workers, the watcher
+thread): they use a single connection, serialized by a lock.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional: entries are stored uncompressed
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# One cached chunk: (content, header_level, token_count)
+CachedChunk = tuple[str, Optional[int], Optional[int]]
+
+CODEC_JSON = "json"
+CODEC_ZSTD = "zstd"
+
+
+class ChunkCache:
+    """Persistent, size-bounded LRU cache of chunk lists.
+
+    Example:
+        >>> cache = ChunkCache()
+        >>> loader = DocumentLoader(chunk_cache=cache)
+        >>> chunks = list(loader.load_all_documents())  # Mostly hits next run
+    """
+
+    DEFAULT_PATH = Path("./data/chunk_cache.db")
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of payloads
+    DIGEST_SIZE = 20  # bytes
+    ZSTD_LEVEL = 3
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compress: Optional[bool] = None,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path. If None, uses DEFAULT_PATH.
+            max_bytes: Payload budget; least recently used entries are
+                evicted beyond it.
+            compress: Compress payloads with zstd. None compresses when
+                ``zstandard`` is installed.
+
+        Raises:
+            ValueError: If max_bytes is lower than 1, or compression is
+                requested without ``zstandard``.
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got {max_bytes}")
+        if compress and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self.compress = zstandard is not None if compress is None else compress
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect()
+
+        logger.debug(f"ChunkCache opened: {self.path}")
+
+    def _connect(self) -> None:
+        # Autocommit + WAL: pool workers share the file without long locks
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        # Reentrant: put() evicts while holding it
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                key TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS chunks_last_access ON chunks (last_access)"
+        )
+
+    def __getstate__(self) -> dict:
+        # Connections and locks cannot be pickled; process pool workers reconnect
+        state = self.__dict__.copy()
+        del state["_conn"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._connect()
+
+    def __enter__(self) -> ChunkCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def make_key(cls, raw_bytes: bytes, fingerprint: str) -> str:
+        """Return the cache key of a file's bytes under a chunker config."""
+        hasher = hashlib.blake2b(raw_bytes, digest_size=cls.DIGEST_SIZE)
+        hasher.update(b"\0")
+        hasher.update(fingerprint.encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[list[CachedChunk]]:
+        """Return the cached chunks for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, payload FROM chunks WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            codec, payload = row
+            try:
+                if codec == CODEC_ZSTD:
+                    if zstandard is None:
+                        raise ValueError("zstandard is not installed")
+                    payload = zstandard.ZstdDecompressor().decompress(payload)
+                chunks = [tuple(item) for item in json.loads(payload)]
+            except Exception as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._conn.execute("DELETE FROM chunks WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE chunks SET last_access = ? WHERE key = ?",
+                (time.time_ns(), key),
+            )
+            self.hits += 1
+            return chunks
+
+    def put(self, key: str, chunks: list[CachedChunk]) -> None:
+        """Store the chunks for key, evicting old entries if over budget."""
+        payload = json.dumps(chunks, ensure_ascii=False).encode("utf-8")
+        codec = CODEC_JSON
+        if self.compress:
+            payload = zstandard.ZstdCompressor(level=self.ZSTD_LEVEL).compress(payload)
+            codec = CODEC_ZSTD
+
+        if len(payload) > self.max_bytes:
+            return  # Would evict everything else and still not fit
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunks "
+                "(key, codec, payload, size_bytes, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, codec, payload, len(payload), time.time_ns()),
+            )
+            self._evict()
+
+    def size_bytes(self) -> int:
+        """Return the total size of stored payloads."""
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM chunks"
+            ).fetchone()
+        return total
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()
+        return count
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_bytes.
+
+        Called with the lock held.
+        """
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = []
+        for key, size in self._conn.execute(
+            "SELECT key, size_bytes FROM chunks ORDER BY last_access"
+        ):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM chunks WHERE key = ?", evicted)
+        logger.debug(f"ChunkCache evicted {len(evicted)} entries")
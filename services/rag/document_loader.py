@@ -10,21 +10,56 @@ from __future__ import annotations
 
 import os
 import re
+import sys
+import mmap
 import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Generator, Optional
-from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generator, Iterable, Optional, Union
+from dataclasses import dataclass, replace
 from datetime import datetime
 
+from .chunk_cache import ChunkCache
+from .ingestion_manifest import ChunkTombstone, IngestionManifest, ManifestEntry
 from .markdown_cleaner import MarkdownCleaner
+from .tokenizers import Tokenizer
+
+if TYPE_CHECKING:
+    from .chunk_batch import ChunkBatch
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Precompiled header detection, shared by all loaders
+HEADER_LINE_PATTERNS = {
+    level: re.compile(f"^{'#' * level} ", re.MULTILINE) for level in range(1, 7)
+}
+HEADER_LEVEL_PATTERN = re.compile(r"^(#+)\s")
+
+# Language detection: frequent function words of each supported language,
+# counted over the first LANGUAGE_SAMPLE_CHARS characters of a document
+LANGUAGE_STOPWORDS = {
+    "en": frozenset(
+        "the and of to is in that for with this are be on as it by from".split()
+    ),
+    "es": frozenset(
+        "el la los las de del que y en para con una por es se al como".split()
+    ),
+}
+LANGUAGE_SAMPLE_CHARS = 4096
+LANGUAGE_MIN_HITS = 5
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+@dataclass(frozen=True, slots=True)
 class DocumentMetadata:
-    """Metadata extracted from a document."""
+    """Metadata extracted from a document.
+
+    One instance is shared by every chunk of the document. It is immutable
+    and hashable (tags are a tuple). Category and tag strings are interned,
+    so repeated values across documents share storage.
+    """
 
     title: str
     filepath: str
@@ -33,12 +68,17 @@ class DocumentMetadata:
     modified_at: datetime
     depth: int  # Folder depth in knowledge base hierarchy
     category: Optional[str] = None  # From folder structure (e.g., "02-TECH-PACKS")
-    tags: list = field(default_factory=list)
+    tags: tuple[str, ...] = ()
+    language: Optional[str] = None  # ISO 639-1 code ("en", "es"), if detected
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
-    """A semantic chunk of document content."""
+    """A semantic chunk of document content.
+
+    Slotted (no per-instance __dict__) because the whole corpus of chunks
+    may stay resident for retrieval.
+    """
 
     content: str
     metadata: DocumentMetadata
@@ -46,6 +86,36 @@ class DocumentChunk:
     total_chunks: int
     char_count: int
     header_level: Optional[int] = None  # H1, H2, H3, etc. if part of structure
+    token_count: Optional[int] = None  # Set in token-budgeted mode
+
+    @property
+    def chunk_id(self) -> str:
+        """Stable identifier of this chunk within the knowledge base."""
+        return f"{self.metadata.filepath}#{self.chunk_index}"
+
+
+@dataclass
+class IOStats:
+    """Filesystem calls made by a loader, to measure ingestion IO cost."""
+
+    stat_calls: int = 0
+    open_calls: int = 0
+    bytes_read: int = 0
+    files_parsed: int = 0
+
+    def merge(self, other: IOStats) -> None:
+        """Add the counters of another IOStats (e.g. from a pool worker)."""
+        self.stat_calls += other.stat_calls
+        self.open_calls += other.open_calls
+        self.bytes_read += other.bytes_read
+        self.files_parsed += other.files_parsed
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        self.stat_calls = 0
+        self.open_calls = 0
+        self.bytes_read = 0
+        self.files_parsed = 0
 
 
 class DocumentLoader:
@@ -68,6 +138,10 @@ class DocumentLoader:
     # Configuration constants
     DEFAULT_MAX_CHUNK_SIZE = 2000  # characters
     DEFAULT_MIN_CHUNK_SIZE = 500  # characters
+    DEFAULT_MAX_CHUNK_TOKENS = 512  # tokens (token-budgeted mode)
+    DEFAULT_MIN_CHUNK_TOKENS = 64  # tokens (token-budgeted mode)
+    DEFAULT_BATCH_SIZE = 256  # chunks per ChunkBatch
+    CHUNKER_VERSION = 1  # Bump when chunking output changes (cache keys)
     SYSTEM_FILES = {".DS_Store", ".gitkeep", "Thumbs.db"}
     KNOWLEDGE_BASE_DIR = (
         Path(__file__).parent.parent.parent / "packages" / "knowledge_base"
@@ -77,12 +151,23 @@ class DocumentLoader:
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
     MAX_RECURSION_DEPTH = 10
 
+    # Streaming mode: largest slice of a mapped file decoded at once
+    STREAM_WINDOW_SIZE = 1024 * 1024  # 1 MB
+
     def __init__(
         self,
         knowledge_base_dir: Optional[Path] = None,
         max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
         min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE,
         validate_security: bool = True,
+        tokenizer: Optional[Tokenizer] = None,
+        max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS,
+        min_chunk_tokens: int = DEFAULT_MIN_CHUNK_TOKENS,
+        chunk_overlap_tokens: int = 0,
+        max_file_size: Optional[int] = MAX_FILE_SIZE,
+        stream_large_files: bool = False,
+        preserve_code_blocks: bool = False,
+        chunk_cache: Optional[ChunkCache] = None,
     ):
         """Initialize the DocumentLoader.
 
@@ -91,14 +176,51 @@ class DocumentLoader:
             max_chunk_size: Maximum characters per chunk (before splitting).
             min_chunk_size: Minimum characters to consider a valid chunk.
             validate_security: Enable security checks (path traversal, symlinks).
+            tokenizer: Enables token-budgeted chunking when given. Chunk sizes
+                are then measured with tokenizer.count instead of len.
+            max_chunk_tokens: Token budget per chunk (token-budgeted mode).
+            min_chunk_tokens: Chunks below this are merged with a sibling
+                instead of being dropped (token-budgeted mode).
+            chunk_overlap_tokens: Tokens of trailing context repeated at the
+                start of the next chunk (token-budgeted mode).
+            max_file_size: Largest file (bytes) loaded fully into memory.
+                None removes the limit.
+            stream_large_files: Stream files above max_file_size through
+                memory-mapped, section-by-section parsing instead of
+                rejecting them.
+            preserve_code_blocks: Leave fenced code blocks untouched by the
+                cleaner and never split a section on a header-like line
+                inside one (e.g. a shell comment).
+            chunk_cache: Reuse cleaned and chunked output for files whose
+                bytes and chunker configuration are unchanged.
 
         Raises:
-            ValueError: If knowledge_base_dir doesn't exist or security check fails.
+            ValueError: If knowledge_base_dir doesn't exist, security check
+                fails or the token budget is inconsistent.
         """
         self.knowledge_base_dir = knowledge_base_dir or self.KNOWLEDGE_BASE_DIR
         self.max_chunk_size = max_chunk_size
         self.min_chunk_size = min_chunk_size
         self.validate_security = validate_security
+        self.tokenizer = tokenizer
+        self.max_chunk_tokens = max_chunk_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.max_file_size = max_file_size
+        self.stream_large_files = stream_large_files
+        self.preserve_code_blocks = preserve_code_blocks
+        self.chunk_cache = chunk_cache
+        self.io_stats = IOStats()
+
+        if tokenizer is not None:
+            if not 0 < min_chunk_tokens <= max_chunk_tokens:
+                raise ValueError(
+                    "Token budget requires 0 < min_chunk_tokens <= max_chunk_tokens"
+                )
+            if not 0 <= chunk_overlap_tokens < max_chunk_tokens:
+                raise ValueError(
+                    "chunk_overlap_tokens must be >= 0 and < max_chunk_tokens"
+                )
 
         if not self.knowledge_base_dir.exists():
             raise ValueError(
@@ -135,26 +257,268 @@ class DocumentLoader:
                 f"Knowledge base directory not readable: {self.knowledge_base_dir}"
             )
 
-    def load_all_documents(self) -> Generator[DocumentChunk, None, None]:
+    def load_all_documents(
+        self,
+        workers: int = 1,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+    ) -> Generator[DocumentChunk, None, None]:
         """Yield all document chunks from knowledge base.
 
+        With ``workers > 1`` files are read, cleaned and chunked in a process
+        pool while chunks are still streamed back one at a time.
+
+        Args:
+            workers: Number of worker processes. 1 keeps the sequential path.
+            ordered: In parallel mode, yield files in discovery order (True)
+                or as soon as each file completes (False).
+            max_in_flight: Maximum number of files submitted to the pool at
+                once. Defaults to ``2 * workers``.
+
         Yields:
             DocumentChunk: Semantic chunks of documents.
 
+        Raises:
+            ValueError: If workers or max_in_flight is lower than 1.
+
         Example:
             >>> loader = DocumentLoader()
             >>> for chunk in loader.load_all_documents():
             ...     print(chunk.metadata.title)
         """
-        for md_file in self._find_markdown_files():
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be >= 1, got {max_in_flight}")
+
+        if workers > 1:
+            yield from self._load_all_parallel(
+                workers=workers,
+                ordered=ordered,
+                max_in_flight=max_in_flight or 2 * workers,
+            )
+            return
+
+        for entry in self.scan_markdown_files():
             try:
-                chunks = self.load_document(md_file)
+                chunks = self.load_entry(entry)
                 for chunk in chunks:
                     yield chunk
             except Exception as e:
-                logger.error(f"Error processing {md_file}: {e}")
+                logger.error(f"Error processing {entry.path}: {e}")
                 continue
 
+    def load_batches(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = 1,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+    ) -> Generator[ChunkBatch, None, None]:
+        """Yield all document chunks as columnar batches.
+
+        Same chunks, in the same order, as load_all_documents, grouped into
+        ChunkBatch objects for bulk embedding and vector store upserts.
+
+        Args:
+            batch_size: Maximum number of chunks per batch.
+            workers: Passed to load_all_documents.
+            ordered: Passed to load_all_documents.
+            max_in_flight: Passed to load_all_documents.
+
+        Yields:
+            ChunkBatch: Up to batch_size chunks; only the last one may be
+                smaller.
+
+        Raises:
+            ValueError: If batch_size is lower than 1.
+        """
+        from .chunk_batch import ChunkBatch
+
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        batch = ChunkBatch()
+        for chunk in self.load_all_documents(
+            workers=workers, ordered=ordered, max_in_flight=max_in_flight
+        ):
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                yield batch
+                batch = ChunkBatch()
+        if len(batch):
+            yield batch
+
+    def _load_all_parallel(
+        self, workers: int, ordered: bool, max_in_flight: int
+    ) -> Generator[DocumentChunk, None, None]:
+        """Fan file processing out to a process pool.
+
+        At most ``max_in_flight`` files are pending at any time, so memory
+        stays bounded no matter how large the knowledge base is. Each worker
+        catches its own errors, which are logged here exactly like the
+        sequential path does.
+
+        Files come from the same scan as the sequential path and workers
+        run the same loading code (_load_scanned, behind load_entry), so
+        both apply the same filters and count the same IO.
+        """
+        entries = self.scan_markdown_files()
+        pending: deque[Future] = deque()
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self,)
+        ) as executor:
+
+            def submit_next() -> bool:
+                # Stat here, from the scan entry, exactly as the sequential
+                # path does; workers get the path and stat result
+                for entry in entries:
+                    try:
+                        stat = self._stat(entry)
+                    except OSError as e:
+                        logger.error(f"Error processing {entry.path}: {e}")
+                        continue
+                    pending.append(
+                        executor.submit(_load_entry_in_worker, Path(entry.path), stat)
+                    )
+                    return True
+                return False
+
+            try:
+                while len(pending) < max_in_flight and submit_next():
+                    pass
+
+                while pending:
+                    if ordered:
+                        done = [pending.popleft()]
+                    else:
+                        completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        done = [f for f in pending if f in completed]
+                        for future in done:
+                            pending.remove(future)
+
+                    for future in done:
+                        md_file, chunks, error, io_stats = future.result()
+                        self.io_stats.merge(io_stats)
+                        submit_next()
+                        if error is not None:
+                            logger.error(f"Error processing {md_file}: {error}")
+                            continue
+                        yield from chunks
+            finally:
+                # Generator closed early: drop work that has not started yet
+                for future in pending:
+                    future.cancel()
+
+    def load_incremental(
+        self, manifest: IngestionManifest
+    ) -> Generator[Union[DocumentChunk, ChunkTombstone], None, None]:
+        """Yield only what changed since the last run recorded in manifest.
+
+        Files whose mtime and size match the manifest are skipped without
+        being read. Files whose signature changed but whose content digest
+        did not are only re-stamped. Everything else is re-chunked, including
+        unchanged files recorded under different chunking settings (see
+        cache_fingerprint), so no chunk built with old settings survives.
+
+        Yields:
+            DocumentChunk: Chunks of added or changed files.
+            ChunkTombstone: Chunk IDs that disappeared, either because a
+                changed file now produces fewer chunks or because the file
+                was deleted.
+
+        Example:
+            >>> with IngestionManifest() as manifest:
+            ...     for item in loader.load_incremental(manifest):
+            ...         if isinstance(item, ChunkTombstone):
+            ...             index.delete(item.chunk_ids)
+            ...         else:
+            ...             index.upsert(item)
+        """
+        known = manifest.entries()
+        seen: set[str] = set()
+        fingerprint = self.cache_fingerprint
+
+        try:
+            for dir_entry in self.scan_markdown_files():
+                md_file = Path(dir_entry.path)
+                relative_path = md_file.relative_to(self.knowledge_base_dir)
+                relative = str(relative_path)
+                seen.add(relative)
+                entry = known.get(relative)
+
+                try:
+                    stat = self._stat(dir_entry)
+                    # Chunks recorded under other settings must be rebuilt
+                    up_to_date = entry is not None and entry.fingerprint == fingerprint
+                    if (
+                        up_to_date
+                        and entry.mtime_ns == stat.st_mtime_ns
+                        and entry.size_bytes == stat.st_size
+                    ):
+                        continue
+
+                    if self._use_streaming(md_file, stat):
+                        raw_bytes = None
+                        self.io_stats.open_calls += 1
+                        digest = IngestionManifest.digest_file(md_file)
+                    else:
+                        raw_bytes = self._read_bytes(md_file)
+                        digest = IngestionManifest.digest_bytes(raw_bytes)
+                    if up_to_date and entry.digest == digest:
+                        manifest.upsert(
+                            replace(
+                                entry,
+                                mtime_ns=stat.st_mtime_ns,
+                                size_bytes=stat.st_size,
+                            )
+                        )
+                        continue
+
+                    if raw_bytes is None:
+                        chunks = self._stream_parse(md_file, relative_path, stat)
+                    else:
+                        chunks = self._parse_document(
+                            md_file, relative_path, stat, raw_bytes
+                        )
+
+                    chunk_ids = []
+                    for chunk in chunks:
+                        chunk_ids.append(chunk.chunk_id)
+                        yield chunk
+                except Exception as e:
+                    logger.error(f"Error processing {md_file}: {e}")
+                    continue
+
+                if entry is not None:
+                    current = set(chunk_ids)
+                    stale = [cid for cid in entry.chunk_ids if cid not in current]
+                    if stale:
+                        yield ChunkTombstone(filepath=relative, chunk_ids=stale)
+
+                manifest.upsert(
+                    ManifestEntry(
+                        filepath=relative,
+                        mtime_ns=stat.st_mtime_ns,
+                        size_bytes=stat.st_size,
+                        digest=digest,
+                        chunk_ids=chunk_ids,
+                        fingerprint=fingerprint,
+                    )
+                )
+
+            for relative, entry in known.items():
+                if relative not in seen:
+                    yield ChunkTombstone(
+                        filepath=relative,
+                        chunk_ids=entry.chunk_ids,
+                        file_deleted=True,
+                    )
+                    manifest.remove(relative)
+        finally:
+            manifest.commit()
+
     def load_document(self, filepath: Path) -> list[DocumentChunk]:
         """Load and chunk a single document.
 
@@ -168,54 +532,332 @@ class DocumentLoader:
             ValueError: If file is not .md or doesn't exist.
             IOError: If file cannot be read.
         """
-        filepath = Path(filepath).resolve()
+        original_path = Path(filepath)
+        filepath = original_path.resolve()
 
         # Security: Validate file is within knowledge base
         if self.validate_security:
-            self._validate_file_path(filepath)
+            self._validate_file_path(original_path, resolved_file=filepath)
 
         if filepath.suffix != ".md":
             raise ValueError(f"File must be .md: {filepath}")
 
-        if not filepath.exists():
+        try:
+            stat = self._stat(filepath)
+        except FileNotFoundError:
             raise ValueError(f"File not found: {filepath}")
 
-        # Security: Check file size
-        if filepath.stat().st_size > self.MAX_FILE_SIZE:
-            raise ValueError(f"File too large (>10MB): {filepath}")
+        relative_path = filepath.relative_to(self.knowledge_base_dir)
+        return self._parse_document(filepath, relative_path, stat)
+
+    def stream_document(self, filepath: Path) -> Generator[DocumentChunk, None, None]:
+        """Chunk a document of any size without loading it into memory.
+
+        The file is memory-mapped and walked by H2 header boundaries. Each
+        section is decoded, cleaned and chunked on its own, so only one
+        section (at most STREAM_WINDOW_SIZE bytes) is held in memory. There
+        is no size limit in this mode.
+
+        Because sections are cleaned independently and the chunk count is
+        unknown until the end, streamed chunks have total_chunks set to 0.
+
+        Args:
+            filepath: Path to .md file.
 
-        # Extract metadata
-        metadata = self._extract_metadata(filepath)
+        Yields:
+            DocumentChunk: Chunks in document order.
+
+        Raises:
+            ValueError: If file is not .md, doesn't exist or is not UTF-8.
+        """
+        original_path = Path(filepath)
+        filepath = original_path.resolve()
+
+        if self.validate_security:
+            self._validate_file_path(original_path, resolved_file=filepath)
+
+        if filepath.suffix != ".md":
+            raise ValueError(f"File must be .md: {filepath}")
 
-        # Read and clean content
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                raw_content = f.read()
+            stat = self._stat(filepath)
+        except FileNotFoundError:
+            raise ValueError(f"File not found: {filepath}")
+
+        relative_path = filepath.relative_to(self.knowledge_base_dir)
+        yield from self._stream_parse(filepath, relative_path, stat)
+
+    def load_entry(self, entry: os.DirEntry) -> Iterable[DocumentChunk]:
+        """Load a file found by scan_markdown_files.
+
+        The scan only yields regular, non-symlink files below the resolved
+        knowledge base root, so path resolution and validation are skipped
+        and the stat result comes from the directory entry. Large files are
+        returned as a lazy stream when streaming is enabled.
+
+        Args:
+            entry: Directory entry yielded by scan_markdown_files.
+
+        Returns:
+            Chunks of the file: a list, or a lazy generator for streamed
+            files.
+
+        Raises:
+            ValueError: If the file is too large (without streaming) or not
+                valid UTF-8.
+            OSError: If the file cannot be stat'ed or read.
+        """
+        return self._load_scanned(Path(entry.path), self._stat(entry))
+
+    def _load_scanned(
+        self, filepath: Path, stat: os.stat_result
+    ) -> Iterable[DocumentChunk]:
+        """Load a scanned file from its path and stat result (see load_entry)."""
+        relative_path = filepath.relative_to(self.knowledge_base_dir)
+        if self._use_streaming(filepath, stat):
+            return self._stream_parse(filepath, relative_path, stat)
+        return self._parse_document(filepath, relative_path, stat)
+
+    def _parse_document(
+        self,
+        filepath: Path,
+        relative_path: Path,
+        stat: os.stat_result,
+        raw_bytes: Optional[bytes] = None,
+    ) -> list[DocumentChunk]:
+        """Single-pass parse: one read, then everything from the buffer.
+
+        Args:
+            filepath: Absolute path to the document.
+            relative_path: Path relative to the knowledge base root.
+            stat: The only stat result taken for this file.
+            raw_bytes: File content if the caller already read it.
+
+        Returns:
+            List of DocumentChunk objects.
+        """
+        if raw_bytes is None:
+            # Security: Check file size before reading anything
+            if self._use_streaming(filepath, stat):
+                return list(self._stream_parse(filepath, relative_path, stat))
+            raw_bytes = self._read_bytes(filepath)
+
+        try:
+            raw_content = raw_bytes.decode("utf-8")
         except UnicodeDecodeError as e:
             logger.error(f"Unicode decode error in {filepath}: {e}")
             raise ValueError(f"File encoding error: {filepath}") from e
 
+        # Universal newlines, as text-mode reads would produce
+        if "\r" in raw_content:
+            raw_content = raw_content.replace("\r\n", "\n").replace("\r", "\n")
+
+        self.io_stats.files_parsed += 1
+
         # Validate Markdown
         if not MarkdownCleaner.is_valid_markdown(raw_content):
             logger.warning(f"File appears invalid: {filepath}")
             return []
 
+        # Extract metadata from the same buffer
+        metadata = self._extract_metadata(filepath, relative_path, stat, raw_content)
+
+        cache_key = None
+        if self.chunk_cache is not None:
+            cache_key = ChunkCache.make_key(raw_bytes, self.cache_fingerprint)
+            cached = self.chunk_cache.get(cache_key)
+            if cached is not None:
+                return self._chunks_from_cache(cached, metadata)
+
         # Clean content
-        cleaned_content = MarkdownCleaner.clean(raw_content)
+        cleaned_content = MarkdownCleaner.clean(
+            raw_content, preserve_code_blocks=self.preserve_code_blocks
+        )
 
         # Perform semantic chunking
         chunks = self._semantic_split(cleaned_content, metadata)
 
+        if cache_key is not None:
+            self.chunk_cache.put(
+                cache_key,
+                [(c.content, c.header_level, c.token_count) for c in chunks],
+            )
+
         return chunks
 
-    def _validate_file_path(self, filepath: Path) -> None:
+    @property
+    def cache_fingerprint(self) -> str:
+        """Every setting that changes cleaning or chunking output."""
+        tokenizer = self.tokenizer.name if self.tokenizer is not None else "chars"
+        return (
+            f"chunker={self.CHUNKER_VERSION};cleaner={MarkdownCleaner.VERSION};"
+            f"chars={self.max_chunk_size},{self.min_chunk_size};"
+            f"tokens={tokenizer},{self.max_chunk_tokens},{self.min_chunk_tokens},"
+            f"{self.chunk_overlap_tokens};code_blocks={self.preserve_code_blocks}"
+        )
+
+    def _chunks_from_cache(
+        self, cached: list[tuple], metadata: DocumentMetadata
+    ) -> list[DocumentChunk]:
+        """Rebuild a document's chunks from a ChunkCache entry."""
+        total_chunks = len(cached)
+        return [
+            DocumentChunk(
+                content=content,
+                metadata=metadata,
+                chunk_index=index,
+                total_chunks=total_chunks,
+                char_count=len(content),
+                header_level=header_level,
+                token_count=token_count,
+            )
+            for index, (content, header_level, token_count) in enumerate(cached)
+        ]
+
+    def _use_streaming(self, filepath: Path, stat: os.stat_result) -> bool:
+        """Decide how a file is loaded based on max_file_size.
+
+        Returns:
+            False if the file fits in memory, True if it must be streamed.
+
+        Raises:
+            ValueError: If the file is too large and streaming is disabled.
+        """
+        if self.max_file_size is None or stat.st_size <= self.max_file_size:
+            return False
+        if self.stream_large_files:
+            return True
+        raise ValueError(
+            f"File too large (>{self.max_file_size} bytes): {filepath}"
+        )
+
+    def _stream_parse(
+        self, filepath: Path, relative_path: Path, stat: os.stat_result
+    ) -> Generator[DocumentChunk, None, None]:
+        """Memory-map a file and emit its chunks section by section."""
+        if stat.st_size == 0:
+            return
+
+        self.io_stats.open_calls += 1
+        with open(filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            # Title only needs the leading lines
+            head = mapped[: self.STREAM_WINDOW_SIZE].decode("utf-8", errors="ignore")
+            metadata = self._extract_metadata(filepath, relative_path, stat, head)
+            self.io_stats.files_parsed += 1
+
+            chunk_index = 0
+            for start, end, was_cut in self._stream_spans(mapped):
+                try:
+                    section = mapped[start:end].decode("utf-8")
+                except UnicodeDecodeError as e:
+                    logger.error(f"Unicode decode error in {filepath}: {e}")
+                    raise ValueError(f"File encoding error: {filepath}") from e
+                self.io_stats.bytes_read += end - start
+
+                if "\r" in section:
+                    section = section.replace("\r\n", "\n").replace("\r", "\n")
+                if not MarkdownCleaner.is_valid_markdown(section):
+                    continue
+
+                cleaned = MarkdownCleaner.clean(
+                    section, preserve_code_blocks=self.preserve_code_blocks
+                )
+                if self.tokenizer is not None:
+                    chunks = self._token_split(cleaned, metadata)
+                else:
+                    chunks = [
+                        self._make_chunk(piece, metadata, 0)
+                        for piece in self._section_pieces(cleaned, was_cut)
+                    ]
+
+                for chunk in chunks:
+                    chunk.chunk_index = chunk_index
+                    chunk.total_chunks = 0  # Unknown while streaming
+                    chunk_index += 1
+                    yield chunk
+
+            # Same whole-document fallback as _semantic_split, for files
+            # small enough to hold in memory
+            if chunk_index == 0 and stat.st_size <= self.STREAM_WINDOW_SIZE:
+                content = mapped[:].decode("utf-8")
+                if "\r" in content:
+                    content = content.replace("\r\n", "\n").replace("\r", "\n")
+                content = MarkdownCleaner.clean(
+                    content, preserve_code_blocks=self.preserve_code_blocks
+                )
+                if content.strip():
+                    chunk = self._make_chunk(content, metadata, 0)
+                    chunk.header_level = None
+                    yield chunk
+
+    def _stream_spans(
+        self, mapped: mmap.mmap
+    ) -> Generator[tuple[int, int, bool], None, None]:
+        """Yield (start, end, was_cut) byte spans of H2 sections.
+
+        Sections longer than STREAM_WINDOW_SIZE are cut at the last
+        paragraph break (or line break, or UTF-8 character boundary) inside
+        the window, so a single span never exceeds the window. Every span of
+        a cut section has was_cut set.
+        """
+        size = len(mapped)
+        window = self.STREAM_WINDOW_SIZE
+        start = 0
+
+        while start < size:
+            end = mapped.find(b"\n## ", start)
+            if end == -1:
+                end = size
+
+            was_cut = False
+            while end - start > window:
+                cut = mapped.rfind(b"\n\n", start + 1, start + window)
+                if cut == -1:
+                    cut = mapped.rfind(b"\n", start + 1, start + window)
+                if cut == -1:
+                    cut = start + window
+                    # Never split a multi-byte UTF-8 character
+                    while cut > start + 1 and mapped[cut] & 0xC0 == 0x80:
+                        cut -= 1
+                was_cut = True
+                yield start, cut, True
+                start = cut
+
+            yield start, end, was_cut
+            start = end + 1
+
+    def _stat(self, target: Path | os.DirEntry) -> os.stat_result:
+        """Stat a path or directory entry, counting the call."""
+        self.io_stats.stat_calls += 1
+        if isinstance(target, os.DirEntry):
+            return target.stat()
+        return os.stat(target)
+
+    def _read_bytes(self, filepath: Path) -> bytes:
+        """Read a whole file with a single open, counting the IO."""
+        self.io_stats.open_calls += 1
+        with open(filepath, "rb") as f:
+            data = f.read()
+        self.io_stats.bytes_read += len(data)
+        return data
+
+    def _validate_file_path(
+        self, filepath: Path, resolved_file: Optional[Path] = None
+    ) -> None:
         """Validate that file is within knowledge base directory.
 
+        Args:
+            filepath: Path as given by the caller.
+            resolved_file: Already resolved path, to avoid resolving twice.
+
         Raises:
             ValueError: If path traversal or symlink detected.
         """
         # Ensure file is resolved (resolves symlinks)
-        resolved_file = filepath.resolve()
+        if resolved_file is None:
+            resolved_file = filepath.resolve()
 
         # Check that resolved file is under knowledge base
         try:
@@ -241,45 +883,92 @@ class DocumentLoader:
             - Only includes .md files
             - Validates recursion depth
         """
-        for root, dirs, files in os.walk(self.knowledge_base_dir):
-            # Check recursion depth
-            depth = len(Path(root).relative_to(self.knowledge_base_dir).parts)
-            if depth > self.MAX_RECURSION_DEPTH:
-                logger.warning(f"Max recursion depth reached: {root}")
-                dirs.clear()
-                continue
+        for entry in self.scan_markdown_files():
+            yield Path(entry.path)
 
-            # Skip hidden directories (in-place modification of dirs list)
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
+    def scan_markdown_files(
+        self, directory: Optional[str] = None, depth: int = 0
+    ) -> Generator[os.DirEntry, None, None]:
+        """Walk the knowledge base yielding directory entries of .md files.
 
-            for filename in files:
-                # Skip hidden and system files
-                if filename.startswith(".") or filename in self.SYSTEM_FILES:
-                    continue
+        Same traversal order and filters as os.walk (files of a directory
+        first, then its subdirectories), but the DirEntry objects are kept
+        so callers can stat and symlink-check without extra syscalls.
 
-                # Only process .md files
-                if not filename.endswith(".md"):
-                    continue
+        Args:
+            directory: Directory to scan. Defaults to the knowledge base root.
+            depth: Depth of directory relative to the root.
+
+        Yields:
+            os.DirEntry: Regular (non-symlink) markdown files.
+        """
+        directory = directory or str(self.knowledge_base_dir)
 
-                yield Path(root) / filename
+        # Check recursion depth
+        if depth > self.MAX_RECURSION_DEPTH:
+            logger.warning(f"Max recursion depth reached: {directory}")
+            return
 
-    def _extract_metadata(self, filepath: Path) -> DocumentMetadata:
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Skip hidden files and directories
+                    if entry.name.startswith("."):
+                        continue
+
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+
+                    # Skip system files
+                    if entry.name in self.SYSTEM_FILES:
+                        continue
+
+                    # Only process .md files
+                    if not entry.name.endswith(".md"):
+                        continue
+
+                    # Security: never follow symlinked files
+                    if self.validate_security and entry.is_symlink():
+                        logger.warning(f"Skipping symlink: {entry.path}")
+                        continue
+
+                    # Symlinks to directories are not traversed (as os.walk)
+                    if entry.is_symlink() and entry.is_dir():
+                        continue
+
+                    yield entry
+        except OSError as e:
+            logger.error(f"Cannot scan {directory}: {e}")
+            return
+
+        for subdir in subdirs:
+            yield from self.scan_markdown_files(subdir, depth + 1)
+
+    def _extract_metadata(
+        self,
+        filepath: Path,
+        relative_path: Path,
+        stat: os.stat_result,
+        content: str,
+    ) -> DocumentMetadata:
         """Extract metadata from a markdown file.
 
         Args:
             filepath: Path to document.
+            relative_path: Path relative to the knowledge base root.
+            stat: Stat result of the file.
+            content: Decoded file content.
 
         Returns:
             DocumentMetadata object.
         """
-        # Get basic file info
-        stat = filepath.stat()
-        relative_path = filepath.relative_to(self.knowledge_base_dir)
         depth = len(relative_path.parts)
-        category = relative_path.parts[0] if relative_path.parts else None
+        category = sys.intern(relative_path.parts[0]) if relative_path.parts else None
 
         # Extract title from H1 or filename
-        title = self._extract_title(filepath)
+        title = self._extract_title(content, filepath)
 
         return DocumentMetadata(
             title=title,
@@ -289,55 +978,82 @@ class DocumentLoader:
             modified_at=datetime.fromtimestamp(stat.st_mtime),
             depth=depth,
             category=category,
-            tags=self._extract_tags(filepath),
+            tags=self._extract_tags(relative_path),
+            language=self._detect_language(content),
         )
 
-    def _extract_title(self, filepath: Path) -> str:
+    def _extract_title(self, content: str, filepath: Path) -> str:
         """Extract title from document.
 
         Priority:
         1. H1 header (# Title)
         2. Filename without extension
+
+        Only the leading lines of content are scanned.
         """
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith("# "):
-                        # Extract title from H1 and clean it
-                        title = line[2:].strip()
-                        return MarkdownCleaner.clean_header(title)
-                    if line and not line.startswith("#"):
-                        # Stop at first non-header content
-                        break
-        except Exception as e:
-            logger.debug(f"Could not extract title from {filepath}: {e}")
+        start = 0
+        length = len(content)
+        while start < length:
+            end = content.find("\n", start)
+            if end == -1:
+                end = length
+            line = content[start:end].strip()
+            start = end + 1
+
+            if line.startswith("# "):
+                # Extract title from H1 and clean it
+                title = line[2:].strip()
+                return MarkdownCleaner.clean_header(title)
+            if line and not line.startswith("#"):
+                # Stop at first non-header content
+                break
 
         # Fallback to filename
         return filepath.stem.replace("_", " ").replace("-", " ").title()
 
-    def _extract_tags(self, filepath: Path) -> list[str]:
+    def _detect_language(self, content: str) -> Optional[str]:
+        """Guess the language of a document from its function words.
+
+        Args:
+            content: Document content (only the start is read).
+
+        Returns:
+            Language code, or None if the sample is too short or ambiguous.
+        """
+        words = WORD_PATTERN.findall(content[:LANGUAGE_SAMPLE_CHARS].lower())
+        hits = {
+            language: sum(word in stopwords for word in words)
+            for language, stopwords in LANGUAGE_STOPWORDS.items()
+        }
+        (best, count), (_, runner_up) = sorted(
+            hits.items(), key=lambda item: item[1], reverse=True
+        )[:2]
+        if count < LANGUAGE_MIN_HITS or count < 1.5 * runner_up:
+            return None
+        return best
+
+    def _extract_tags(self, relative_path: Path) -> tuple[str, ...]:
         """Extract tags from document metadata or filename.
 
         Args:
-            filepath: Path to document.
+            relative_path: Path relative to the knowledge base root.
 
         Returns:
-            List of tag strings.
+            Tuple of tag strings.
         """
         tags = []
 
         # Tags from folder structure
-        relative_path = filepath.relative_to(self.knowledge_base_dir)
         if relative_path.parts:
             tags.append(relative_path.parts[0])
 
         # Tags from filename patterns (e.g., "backend_coding_standards.md")
-        filename = filepath.stem.lower()
+        filename = relative_path.stem.lower()
         if "_" in filename:
             tags.extend(filename.split("_"))
 
-        return list(set(tags))  # Remove duplicates
+        # Remove duplicates, keep order; intern values shared across documents
+        return tuple(sys.intern(tag) for tag in dict.fromkeys(tags))
 
     def _semantic_split(
         self, content: str, metadata: DocumentMetadata
@@ -346,9 +1062,12 @@ class DocumentLoader:
 
         Strategy:
         1. Split by H2 headers (semantic boundaries)
-        2. If sections too large, split by H3
-        3. If still too large, split by paragraphs
-        4. Ensure min/max chunk sizes
+        2. If sections too large, split by paragraphs
+        3. Drop pieces below min_chunk_size
+
+        Runs in time linear in the document length: headers are located with
+        one precompiled scan and total_chunks is set once, for the whole
+        document, after all chunks are known.
 
         Args:
             content: Raw document content.
@@ -357,55 +1076,22 @@ class DocumentLoader:
         Returns:
             List of DocumentChunk objects.
         """
-        chunks = []
+        if self.tokenizer is not None:
+            return self._token_split(content, metadata)
+
+        chunks: list[DocumentChunk] = []
 
         # First pass: Split by H2 headers
         sections = self._split_by_header(content, level=2)
 
-        if not sections:
-            # No H2 headers, try H3
-            sections = self._split_by_header(content, level=3)
-
         if not sections:
             # No semantic structure, use whole document
             sections = [content] if content else []
 
-        chunk_index = 0
         for section in sections:
-            # Check if section needs further splitting
-            if len(section) > self.max_chunk_size:
-                # Split by paragraphs
-                sub_chunks = self._split_by_paragraphs(section)
-            else:
-                sub_chunks = [section]
-
-            # Create chunks, filtering by size
-            for sub_chunk in sub_chunks:
-                sub_chunk = sub_chunk.strip()
-
-                if len(sub_chunk) < self.min_chunk_size:
-                    continue
-
-                # Detect header level in chunk
-                header_level = self._detect_header_level(sub_chunk)
-
-                chunks.append(
-                    DocumentChunk(
-                        content=sub_chunk,
-                        metadata=metadata,
-                        chunk_index=chunk_index,
-                        total_chunks=len(
-                            [
-                                x
-                                for x in sub_chunks
-                                if len(x.strip()) >= self.min_chunk_size
-                            ]
-                        ),
-                        char_count=len(sub_chunk),
-                        header_level=header_level,
-                    )
-                )
-                chunk_index += 1
+            for piece in self._section_pieces(section):
+                # total_chunks is set below, once the count is known
+                chunks.append(self._make_chunk(piece, metadata, len(chunks)))
 
         # If no chunks were created, return the whole content as one chunk
         if not chunks and len(content.strip()) > 0:
@@ -420,11 +1106,168 @@ class DocumentLoader:
                 )
             )
 
+        total_chunks = len(chunks)
+        for chunk in chunks:
+            chunk.total_chunks = total_chunks
+
         return chunks
 
+    def _section_pieces(self, section: str, by_paragraphs: bool = False) -> list[str]:
+        """Split one section into chunk texts, dropping undersized ones.
+
+        Args:
+            section: Section content.
+            by_paragraphs: Always split by paragraphs (for slices of a
+                section too large to stream at once).
+        """
+        if by_paragraphs or len(section) > self.max_chunk_size:
+            # Split by paragraphs
+            sub_chunks = self._split_by_paragraphs(section)
+        else:
+            sub_chunks = [section.strip()]
+
+        return [p for p in sub_chunks if len(p) >= self.min_chunk_size]
+
+    def _make_chunk(
+        self, content: str, metadata: DocumentMetadata, chunk_index: int
+    ) -> DocumentChunk:
+        """Build a character-mode chunk; total_chunks is filled in later."""
+        return DocumentChunk(
+            content=content,
+            metadata=metadata,
+            chunk_index=chunk_index,
+            total_chunks=0,
+            char_count=len(content),
+            header_level=self._detect_header_level(content),
+        )
+
+    def _token_split(
+        self, content: str, metadata: DocumentMetadata
+    ) -> list[DocumentChunk]:
+        """Pack document content into chunks that fit the token budget.
+
+        Strategy:
+        1. Split by H2 headers; sections over budget are split by
+           paragraphs, and paragraphs over budget by lines
+        2. Greedily pack consecutive pieces into chunks of at most
+           max_chunk_tokens, so small sibling sections share a chunk
+        3. Repeat up to chunk_overlap_tokens of trailing pieces at the start
+           of the next chunk
+        4. Merge a final chunk below min_chunk_tokens into its predecessor
+           when the budget allows; nothing is dropped
+
+        A single line larger than the budget is kept as one oversized chunk.
+        Each piece is tokenized once; chunk token counts are the sums.
+
+        Args:
+            content: Cleaned document content.
+            metadata: Document metadata.
+
+        Returns:
+            List of DocumentChunk objects with token_count set.
+        """
+        pieces = self._token_pieces(content)
+
+        groups: list[list[tuple[str, int]]] = []
+        current: list[tuple[str, int]] = []
+        current_tokens = 0
+        carried = 0  # Leading pieces of current repeated from the last group
+
+        for piece in pieces:
+            if current and current_tokens + piece[1] > self.max_chunk_tokens:
+                groups.append(current)
+                current = self._overlap_tail(current, piece[1])
+                carried = len(current)
+                current_tokens = sum(tokens for _, tokens in current)
+            current.append(piece)
+            current_tokens += piece[1]
+
+        if len(current) > carried:
+            previous_tokens = (
+                sum(tokens for _, tokens in groups[-1]) if groups else None
+            )
+            new_pieces = current[carried:]
+            new_tokens = sum(tokens for _, tokens in new_pieces)
+            if (
+                previous_tokens is not None
+                and current_tokens < self.min_chunk_tokens
+                and previous_tokens + new_tokens <= self.max_chunk_tokens
+            ):
+                groups[-1] = groups[-1] + new_pieces
+            else:
+                groups.append(current)
+
+        chunks = []
+        for group in groups:
+            text = "\n\n".join(piece for piece, _ in group)
+            chunks.append(
+                DocumentChunk(
+                    content=text,
+                    metadata=metadata,
+                    chunk_index=len(chunks),
+                    total_chunks=len(groups),
+                    char_count=len(text),
+                    header_level=self._detect_header_level(text),
+                    token_count=sum(tokens for _, tokens in group),
+                )
+            )
+
+        return chunks
+
+    def _token_pieces(self, content: str) -> list[tuple[str, int]]:
+        """Split content into (text, token count) pieces within the budget."""
+        count = self.tokenizer.count
+        budget = self.max_chunk_tokens
+        pieces = []
+
+        for section in self._split_by_header(content, level=2):
+            section = section.strip()
+            tokens = count(section)
+            if tokens <= budget:
+                pieces.append((section, tokens))
+                continue
+
+            for paragraph in self._split_by_paragraphs(section):
+                tokens = count(paragraph)
+                if tokens <= budget:
+                    pieces.append((paragraph, tokens))
+                    continue
+
+                for line in paragraph.split("\n"):
+                    line = line.strip()
+                    if line:
+                        pieces.append((line, count(line)))
+
+        return pieces
+
+    def _overlap_tail(
+        self, group: list[tuple[str, int]], next_tokens: int
+    ) -> list[tuple[str, int]]:
+        """Trailing pieces of group to repeat before the next piece.
+
+        Never carries the whole group, and never so much that the next
+        piece would no longer fit in the budget.
+        """
+        if self.chunk_overlap_tokens == 0:
+            return []
+
+        limit = min(self.chunk_overlap_tokens, self.max_chunk_tokens - next_tokens)
+        tail: list[tuple[str, int]] = []
+        tail_tokens = 0
+        for piece in reversed(group[1:]):
+            if tail_tokens + piece[1] > limit:
+                break
+            tail.insert(0, piece)
+            tail_tokens += piece[1]
+        return tail
+
     def _split_by_header(self, content: str, level: int) -> list[str]:
         """Split content by header level.
 
+        A section boundary is every line that starts with the header marker,
+        except the very first line of the document and, with
+        preserve_code_blocks, lines inside fenced code blocks.
+
         Args:
             content: Document content.
             level: Header level (1-6, where 1 is H1 #).
@@ -432,22 +1275,29 @@ class DocumentLoader:
         Returns:
             List of sections, each starting with the header.
         """
-        header_marker = "#" * level
-        pattern = f"^{re.escape(header_marker)} "
-
         sections = []
-        current_section = []
+        section_start = 0
+        fences = (
+            MarkdownCleaner.find_code_fences(content)
+            if self.preserve_code_blocks
+            else []
+        )
+        fence_index = 0
 
-        for line in content.split("\n"):
-            if re.match(pattern, line) and current_section:
-                # Start new section
-                sections.append("\n".join(current_section))
-                current_section = [line]
-            else:
-                current_section.append(line)
+        for match in HEADER_LINE_PATTERNS[level].finditer(content):
+            header_start = match.start()
+            if header_start == 0:
+                continue
+            # Headers come in order, so fences ending before them are done
+            while fence_index < len(fences) and fences[fence_index][1] <= header_start:
+                fence_index += 1
+            if fence_index < len(fences) and fences[fence_index][0] <= header_start:
+                continue
+            # Exclude the newline that terminates the previous section
+            sections.append(content[section_start : header_start - 1])
+            section_start = header_start
 
-        if current_section:
-            sections.append("\n".join(current_section))
+        sections.append(content[section_start:])
 
         return [s for s in sections if s.strip()]
 
@@ -462,7 +1312,7 @@ class DocumentLoader:
         """
         # Split by double newlines (paragraph breaks)
         paragraphs = content.split("\n\n")
-        return [p.strip() for p in paragraphs if p.strip()]
+        return [p for p in map(str.strip, paragraphs) if p]
 
     def _detect_header_level(self, chunk: str) -> Optional[int]:
         """Detect header level of chunk (if starts with header).
@@ -473,8 +1323,39 @@ class DocumentLoader:
         Returns:
             Header level (1-6) or None if no header.
         """
-        first_line = chunk.split("\n")[0]
-        match = re.match(r"^(#+)\s", first_line)
+        first_line = chunk.partition("\n")[0]
+        match = HEADER_LEVEL_PATTERN.match(first_line)
         if match:
             return len(match.group(1))
         return None
+
+
+# Per-process loader used by the parallel ingestion mode
+_worker_loader: Optional[DocumentLoader] = None
+
+
+def _init_worker(loader: DocumentLoader) -> None:
+    """Install the parent's loader configuration in a pool worker."""
+    global _worker_loader
+    _worker_loader = loader
+    _worker_loader.io_stats = IOStats()
+
+
+def _load_entry_in_worker(
+    filepath: Path, stat: os.stat_result
+) -> tuple[Path, list[DocumentChunk], Optional[str], IOStats]:
+    """Load one scanned file inside a pool worker.
+
+    Runs the sequential path's loading code on the path and stat result
+    of the parent's scan entry (DirEntry objects cannot be pickled), so no
+    path is resolved, validated or stat'ed again. Errors are returned
+    instead of raised so that a single bad file never tears down the pool
+    or the other in-flight files. The IO counters for this file are
+    returned so the parent loader can aggregate them.
+    """
+    _worker_loader.io_stats = IOStats()
+    try:
+        chunks = list(_worker_loader._load_scanned(filepath, stat))
+        return filepath, chunks, None, _worker_loader.io_stats
+    except Exception as e:
+        return filepath, [], str(e), _worker_loader.io_stats
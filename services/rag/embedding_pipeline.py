@@ -0,0 +1,320 @@
+"""Batched, concurrent embedding of chunks through Ollama.
+
+Embedding one chunk per request leaves the model idle between round trips.
+EmbeddingPipeline consumes DocumentLoader output (sync or async) and:
+
+- skips chunks whose embedding is already in an EmbeddingCache
+- groups the rest into batches by token budget, so a batch of long chunks
+  costs about as much as a batch of short ones
+- keeps up to ``max_concurrency`` requests in flight over one pooled
+  keep-alive HTTP client
+- adapts the token budget to observed latency: batches shrink when a
+  request takes longer than ``target_latency`` and grow while requests
+  stay well under it
+
+Results are yielded as batches complete, so the output order is not the
+input order. EmbeddingStats counts throughput (chunks/s, tokens/s).
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+import httpx
+import numpy as np
+
+from core.config import settings
+from services.vectors.embedding_cache import EmbeddingCache
+
+from .document_loader import DocumentChunk
+from .tokenizers import RegexTokenizer, Tokenizer
+
+logger = logging.getLogger(__name__)
+
+# A chunk and its embedding
+EmbeddedChunk = tuple[DocumentChunk, np.ndarray]
+
+
+@dataclass
+class EmbeddingStats:
+    """Throughput counters of an EmbeddingPipeline."""
+
+    chunks: int = 0  # Chunks yielded, embedded or cached
+    cache_hits: int = 0
+    embedded_chunks: int = 0
+    embedded_tokens: int = 0
+    requests: int = 0
+    request_seconds: float = 0.0  # Summed latency of embed requests
+    elapsed_seconds: float = 0.0  # Wall clock spent in embed_chunks
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Embedded (not cached) tokens per second of wall clock."""
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.embedded_tokens / self.elapsed_seconds
+
+    @property
+    def mean_latency(self) -> float:
+        return self.request_seconds / self.requests if self.requests else 0.0
+
+
+class EmbeddingPipeline:
+    """Embed chunks in token-budgeted, concurrent batches.
+
+    Example:
+        >>> async with EmbeddingPipeline(cache=EmbeddingCache()) as pipeline:
+        ...     async for chunk, vector in pipeline.embed_chunks(chunks):
+        ...         index.add([chunk.chunk_id], vector[np.newaxis])
+        >>> pipeline.stats.chunks_per_second
+    """
+
+    EMBED_PATH = "/api/embed"
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_BATCH_TOKENS = 4096
+    MIN_BATCH_TOKENS = 256
+    MAX_BATCH_TOKENS = 65536
+    DEFAULT_TARGET_LATENCY = 1.0  # seconds per request
+    DEFAULT_TIMEOUT = 120.0  # seconds
+    CACHE_LOOKUP_SIZE = 256  # chunks per bulk cache lookup
+    GROWTH_FACTOR = 1.25
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        tokenizer: Optional[Tokenizer] = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        batch_tokens: int = DEFAULT_BATCH_TOKENS,
+        min_batch_tokens: int = MIN_BATCH_TOKENS,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            base_url: Ollama server URL. If None, uses settings.OLLAMA_BASE_URL.
+            model: Embedding model. If None, uses the cache's model, else
+                settings.OLLAMA_EMBED_MODEL.
+            cache: Embedding cache consulted before and filled after requests.
+            tokenizer: Counts tokens of chunks without a token_count.
+                Defaults to RegexTokenizer.
+            max_concurrency: Requests in flight at once.
+            batch_tokens: Initial token budget per request.
+            min_batch_tokens: Lower bound of the adaptive budget.
+            max_batch_tokens: Upper bound of the adaptive budget.
+            target_latency: Request latency (seconds) the budget aims for.
+            timeout: HTTP timeout in seconds.
+            client: Shared HTTP client. If None, a pooled client is created
+                (and closed by aclose).
+
+        Raises:
+            ValueError: If a limit is out of range or the model differs from
+                the cache's model.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        if not 1 <= min_batch_tokens <= batch_tokens <= max_batch_tokens:
+            raise ValueError(
+                "Expected 1 <= min_batch_tokens <= batch_tokens <= max_batch_tokens"
+            )
+        if target_latency <= 0:
+            raise ValueError(f"target_latency must be > 0, got {target_latency}")
+        if cache is not None and model and model != cache.model:
+            raise ValueError(f"Model {model} does not match cache model {cache.model}")
+
+        self.base_url = base_url or settings.OLLAMA_BASE_URL
+        self.model = model or (cache.model if cache else settings.OLLAMA_EMBED_MODEL)
+        self.cache = cache
+        self.tokenizer = tokenizer or RegexTokenizer()
+        self.max_concurrency = max_concurrency
+        self.min_batch_tokens = min_batch_tokens
+        self.max_batch_tokens = max_batch_tokens
+        self.target_latency = target_latency
+        self.stats = EmbeddingStats()
+
+        self._batch_tokens = batch_tokens
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def __aenter__(self) -> EmbeddingPipeline:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if the pipeline created it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    @property
+    def batch_tokens(self) -> int:
+        """Current (adaptive) token budget per request."""
+        return self._batch_tokens
+
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in a single request, bypassing the cache.
+
+        Returns:
+            Array of shape (len(texts), dim).
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            ValueError: If the response does not hold one vector per text.
+        """
+        response = await self._client.post(
+            self.EMBED_PATH, json={"model": self.model, "input": texts}
+        )
+        response.raise_for_status()
+        vectors = np.asarray(response.json()["embeddings"], dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError(
+                f"Expected {len(texts)} embeddings, got shape {vectors.shape}"
+            )
+        return vectors
+
+    async def embed_chunks(
+        self, chunks: Union[Iterable[DocumentChunk], AsyncIterable[DocumentChunk]]
+    ) -> AsyncIterator[EmbeddedChunk]:
+        """Embed chunks, yielding (chunk, vector) pairs as batches complete.
+
+        Args:
+            chunks: DocumentLoader or AsyncDocumentLoader output.
+
+        Yields:
+            (chunk, vector) pairs; cached chunks first, then in completion
+            order.
+
+        Raises:
+            httpx.HTTPError: If a request fails (in-flight ones are cancelled).
+        """
+        started = time.perf_counter()
+        pending: set[asyncio.Task] = set()
+        batch: list[tuple[DocumentChunk, int]] = []
+        batch_tokens = 0
+        try:
+            async for group in _grouped(chunks, self.CACHE_LOOKUP_SIZE):
+                misses = []
+                for chunk, vector in zip(group, self._lookup(group)):
+                    if vector is None:
+                        misses.append(chunk)
+                        continue
+                    self.stats.cache_hits += 1
+                    self.stats.chunks += 1
+                    yield chunk, vector
+
+                for chunk in misses:
+                    tokens = chunk.token_count or self.tokenizer.count(chunk.content)
+                    if batch and batch_tokens + tokens > self._batch_tokens:
+                        pending.add(asyncio.create_task(self._embed_batch(batch)))
+                        batch, batch_tokens = [], 0
+                        while len(pending) >= self.max_concurrency:
+                            for pair in await _next_completed(pending):
+                                yield pair
+                    batch.append((chunk, tokens))
+                    batch_tokens += tokens
+
+            if batch:
+                pending.add(asyncio.create_task(self._embed_batch(batch)))
+            while pending:
+                for pair in await _next_completed(pending):
+                    yield pair
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.stats.elapsed_seconds += time.perf_counter() - started
+
+    def _lookup(self, chunks: list[DocumentChunk]) -> list[Optional[np.ndarray]]:
+        if self.cache is None:
+            return [None] * len(chunks)
+        return self.cache.get_many([chunk.content for chunk in chunks])
+
+    async def _embed_batch(
+        self, batch: list[tuple[DocumentChunk, int]]
+    ) -> list[EmbeddedChunk]:
+        chunks = [chunk for chunk, _ in batch]
+        texts = [chunk.content for chunk in chunks]
+        tokens = sum(count for _, count in batch)
+
+        start = time.perf_counter()
+        vectors = await self.embed_texts(texts)
+        latency = time.perf_counter() - start
+
+        self._adapt(tokens, latency)
+        self.stats.requests += 1
+        self.stats.request_seconds += latency
+        self.stats.embedded_chunks += len(chunks)
+        self.stats.embedded_tokens += tokens
+        self.stats.chunks += len(chunks)
+        if self.cache is not None:
+            self.cache.put_many(texts, vectors)
+        return list(zip(chunks, vectors))
+
+    def _adapt(self, tokens: int, latency: float) -> None:
+        """Resize the token budget from one request's latency."""
+        if latency > self.target_latency:
+            # Aim the next batches at the target, assuming cost ~ tokens
+            budget = min(self._batch_tokens, tokens * self.target_latency / latency)
+        elif latency < self.target_latency / 2 and tokens >= self._batch_tokens / 2:
+            budget = self._batch_tokens * self.GROWTH_FACTOR
+        else:
+            return
+
+        budget = int(min(max(budget, self.min_batch_tokens), self.max_batch_tokens))
+        if budget != self._batch_tokens:
+            logger.debug(
+                f"Embedding batch budget {self._batch_tokens} -> {budget} tokens "
+                f"({latency:.3f}s for {tokens} tokens)"
+            )
+            self._batch_tokens = budget
+
+
+async def _grouped(
+    chunks: Union[Iterable[DocumentChunk], AsyncIterable[DocumentChunk]], size: int
+) -> AsyncIterator[list[DocumentChunk]]:
+    """Yield lists of up to size chunks from a sync or async iterable."""
+    group: list[DocumentChunk] = []
+    if isinstance(chunks, AsyncIterable):
+        async for chunk in chunks:
+            group.append(chunk)
+            if len(group) == size:
+                yield group
+                group = []
+    else:
+        for chunk in chunks:
+            group.append(chunk)
+            if len(group) == size:
+                yield group
+                group = []
+    if group:
+        yield group
+
+
+async def _next_completed(pending: set[asyncio.Task]) -> list[EmbeddedChunk]:
+    """Wait for at least one batch to finish and return its results."""
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    pending.difference_update(done)
+    results: list[EmbeddedChunk] = []
+    for task in done:
+        results.extend(task.result())
+    return results
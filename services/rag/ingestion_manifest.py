@@ -0,0 +1,166 @@
+"""Persistent ingestion manifest for incremental re-indexing.
+
+This module records, for every ingested Markdown file, the file signature
+(mtime, size and content digest), the fingerprint of the loader settings
+that chunked it and the chunk IDs it produced. The DocumentLoader uses it to
+skip unchanged files, to re-chunk files whose settings changed and to report
+tombstones for chunks that no longer exist.
+
+Storage: a single SQLite file, next to the application database by default.
+"""
+
+from __future__ import annotations
+
+import json
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Optional
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """Signature and chunk IDs of one ingested file."""
+
+    filepath: str  # Relative to the knowledge base root
+    mtime_ns: int
+    size_bytes: int
+    digest: str  # BLAKE2b hex digest of the raw file bytes
+    chunk_ids: list[str] = field(default_factory=list)
+    fingerprint: str = ""  # DocumentLoader.cache_fingerprint at ingestion
+
+
+@dataclass
+class ChunkTombstone:
+    """Chunks that must be removed from downstream indexes."""
+
+    filepath: str
+    chunk_ids: list[str]
+    file_deleted: bool = False  # True when the whole file is gone
+
+
+class IngestionManifest:
+    """SQLite-backed record of what the last ingestion run produced.
+
+    Example:
+        >>> with IngestionManifest() as manifest:
+        ...     for item in loader.load_incremental(manifest):
+        ...         ...
+    """
+
+    DEFAULT_PATH = Path("./data/ingestion_manifest.db")
+    DIGEST_SIZE = 16  # bytes
+    READ_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, path: Optional[Path] = None):
+        """Open (or create) the manifest database.
+
+        Args:
+            path: SQLite file path. If None, uses DEFAULT_PATH.
+        """
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                filepath TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                fingerprint TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if "fingerprint" not in columns:
+            # Manifests written before fingerprints: every entry re-chunks once
+            self._conn.execute(
+                "ALTER TABLE files ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.commit()
+
+        logger.debug(f"IngestionManifest opened: {self.path}")
+
+    def __enter__(self) -> IngestionManifest:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def digest_bytes(cls, data: bytes) -> str:
+        """Return the content digest used by the manifest."""
+        return hashlib.blake2b(data, digest_size=cls.DIGEST_SIZE).hexdigest()
+
+    @classmethod
+    def digest_file(cls, filepath: Path) -> str:
+        """Return the content digest of a file, read in blocks."""
+        hasher = hashlib.blake2b(digest_size=cls.DIGEST_SIZE)
+        with open(filepath, "rb") as f:
+            while block := f.read(cls.READ_BLOCK_SIZE):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def get(self, filepath: str) -> Optional[ManifestEntry]:
+        """Return the entry for a relative file path, if recorded."""
+        row = self._conn.execute(
+            "SELECT filepath, mtime_ns, size_bytes, digest, chunk_ids, fingerprint "
+            "FROM files WHERE filepath = ?",
+            (filepath,),
+        ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def entries(self) -> dict[str, ManifestEntry]:
+        """Return all recorded entries keyed by relative file path."""
+        rows = self._conn.execute(
+            "SELECT filepath, mtime_ns, size_bytes, digest, chunk_ids, fingerprint "
+            "FROM files"
+        )
+        return {row[0]: self._row_to_entry(row) for row in rows}
+
+    def upsert(self, entry: ManifestEntry) -> None:
+        """Insert or replace the entry for a file."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files "
+            "(filepath, mtime_ns, size_bytes, digest, chunk_ids, fingerprint) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                entry.filepath,
+                entry.mtime_ns,
+                entry.size_bytes,
+                entry.digest,
+                json.dumps(entry.chunk_ids),
+                entry.fingerprint,
+            ),
+        )
+
+    def remove(self, filepath: str) -> None:
+        """Forget a file (e.g. after it was deleted)."""
+        self._conn.execute("DELETE FROM files WHERE filepath = ?", (filepath,))
+
+    def commit(self) -> None:
+        """Persist pending changes."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Commit pending changes and close the database."""
+        self._conn.commit()
+        self._conn.close()
+
+    @staticmethod
+    def _row_to_entry(row: tuple) -> ManifestEntry:
+        return ManifestEntry(
+            filepath=row[0],
+            mtime_ns=row[1],
+            size_bytes=row[2],
+            digest=row[3],
+            chunk_ids=json.loads(row[4]),
+            fingerprint=row[5],
+        )
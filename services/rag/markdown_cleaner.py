@@ -7,7 +7,42 @@ before semantic chunking, ensuring consistent quality and security.
 from __future__ import annotations
 
 import re
+import time
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+
+@dataclass
+class CleaningStats:
+    """Time spent in each cleaning stage, to see which one dominates."""
+
+    html_seconds: float = 0.0
+    whitespace_seconds: float = 0.0
+    suspicious_seconds: float = 0.0
+    unicode_seconds: float = 0.0
+    texts_cleaned: int = 0
+    chars_cleaned: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        """Time spent in all stages."""
+        return (
+            self.html_seconds
+            + self.whitespace_seconds
+            + self.suspicious_seconds
+            + self.unicode_seconds
+        )
+
+    def merge(self, other: CleaningStats) -> None:
+        """Add the counters of another CleaningStats (e.g. from a pool worker)."""
+        self.html_seconds += other.html_seconds
+        self.whitespace_seconds += other.whitespace_seconds
+        self.suspicious_seconds += other.suspicious_seconds
+        self.unicode_seconds += other.unicode_seconds
+        self.texts_cleaned += other.texts_cleaned
+        self.chars_cleaned += other.chars_cleaned
 
 
 class MarkdownCleaner:
@@ -17,10 +52,14 @@ class MarkdownCleaner:
     - Remove HTML tags and comments
     - Normalize whitespace and line breaks
     - Remove or escape suspicious patterns
-    - Preserve code blocks and important formatting
+    - Preserve code blocks and important formatting (fenced blocks are
+      left untouched with preserve_code_blocks=True)
     - Handle special characters safely
     """
 
+    # Bump whenever clean() output changes (invalidates ChunkCache entries)
+    VERSION = 1
+
     # Patterns to remove
     HTML_TAG_PATTERN = re.compile(r"<[^>]+>", re.IGNORECASE | re.MULTILINE)
     HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL | re.MULTILINE)
@@ -28,12 +67,30 @@ class MarkdownCleaner:
     MULTIPLE_SPACES_PATTERN = re.compile(r"  +")
     TRAILING_WHITESPACE_PATTERN = re.compile(r"[ \t]+$", re.MULTILINE)
 
+    # Suspicious patterns
+    JAVASCRIPT_PATTERN = re.compile(r"javascript:\s*", re.IGNORECASE)
+    DATA_URI_PATTERN = re.compile(r"data:[^,]*,", re.IGNORECASE)
+    # Non-ASCII characters IGNORECASE matches to letters of "javascript:" or
+    # "data:" that str.lower() does not map onto them
+    CASE_FOLD_VARIANTS = ("\u0130", "\u0131", "\u017f")  # İ ı ſ
+
+    # Opening/closing line of a fenced code block (CommonMark)
+    CODE_FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})", re.MULTILINE)
+
     @staticmethod
-    def clean(text: str) -> str:
+    def clean(
+        text: str,
+        preserve_code_blocks: bool = False,
+        stats: Optional[CleaningStats] = None,
+    ) -> str:
         """Apply all cleaning steps to text.
 
         Args:
             text: Raw Markdown text.
+            preserve_code_blocks: Clean only the prose between fenced code
+                blocks; the blocks themselves (fence lines included) are
+                copied through untouched.
+            stats: If given, the time spent in each stage is added to it.
 
         Returns:
             Cleaned text.
@@ -41,6 +98,44 @@ class MarkdownCleaner:
         if not text or not isinstance(text, str):
             return ""
 
+        if stats is not None:
+            stats.texts_cleaned += 1
+            stats.chars_cleaned += len(text)
+
+        if preserve_code_blocks and ("```" in text or "~~~" in text):
+            spans = MarkdownCleaner.find_code_fences(text)
+            if spans:
+                parts = []
+                position = 0
+                for start, end in spans:
+                    parts.append(
+                        MarkdownCleaner._clean_prose(text[position:start], stats)
+                    )
+                    parts.append(text[start:end])
+                    position = end
+                parts.append(MarkdownCleaner._clean_prose(text[position:], stats))
+                return "".join(parts).strip()
+
+        # Step 5: Final strip
+        return MarkdownCleaner._clean_prose(text, stats).strip()
+
+    @staticmethod
+    def _clean_prose(text: str, stats: Optional[CleaningStats] = None) -> str:
+        """Apply cleaning steps 1-4 (everything but the final strip).
+
+        Args:
+            text: Markdown text, or a prose segment between code blocks.
+            stats: If given, the time spent in each stage is added to it.
+
+        Returns:
+            Cleaned text.
+        """
+        if not text:
+            return text
+
+        if stats is not None:
+            return MarkdownCleaner._clean_prose_timed(text, stats)
+
         # Step 1: Remove HTML comments and tags
         text = MarkdownCleaner._remove_html_elements(text)
 
@@ -53,11 +148,137 @@ class MarkdownCleaner:
         # Step 4: Normalize unicode
         text = MarkdownCleaner._normalize_unicode(text)
 
-        # Step 5: Final strip
-        text = text.strip()
+        return text
+
+    @staticmethod
+    def _clean_prose_timed(text: str, stats: CleaningStats) -> str:
+        """Same steps as _clean_prose, timing each one into stats."""
+        start = time.perf_counter()
+        text = MarkdownCleaner._remove_html_elements(text)
+        html_done = time.perf_counter()
+        text = MarkdownCleaner._normalize_whitespace(text)
+        whitespace_done = time.perf_counter()
+        text = MarkdownCleaner._remove_suspicious_patterns(text)
+        suspicious_done = time.perf_counter()
+        text = MarkdownCleaner._normalize_unicode(text)
+        unicode_done = time.perf_counter()
+
+        stats.html_seconds += html_done - start
+        stats.whitespace_seconds += whitespace_done - html_done
+        stats.suspicious_seconds += suspicious_done - whitespace_done
+        stats.unicode_seconds += unicode_done - suspicious_done
 
         return text
 
+    @staticmethod
+    def clean_many(
+        texts: Iterable[str],
+        workers: int = 1,
+        chunksize: Optional[int] = None,
+        preserve_code_blocks: bool = False,
+        stats: Optional[CleaningStats] = None,
+    ) -> list[str]:
+        """Clean a batch of texts, optionally across a process pool.
+
+        The regex work is CPU-bound and serialized by the GIL, so threads do
+        not help; with ``workers > 1`` the batch is split into chunks of
+        ``chunksize`` texts that are cleaned in separate processes.
+
+        Args:
+            texts: Raw Markdown texts.
+            workers: Number of worker processes. 1 cleans in this process.
+            chunksize: Texts per task sent to a worker. Defaults to an even
+                split into four tasks per worker.
+            preserve_code_blocks: Passed to clean.
+            stats: If given, per-stage timings of all workers are added to it.
+
+        Returns:
+            Cleaned texts, in input order.
+
+        Raises:
+            ValueError: If workers or chunksize is lower than 1.
+
+        Example:
+            >>> stats = CleaningStats()
+            >>> cleaned = MarkdownCleaner.clean_many(texts, workers=4, stats=stats)
+            >>> print(stats.html_seconds, stats.whitespace_seconds)
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError(f"chunksize must be >= 1, got {chunksize}")
+
+        texts = list(texts)
+        if workers == 1 or len(texts) < 2:
+            return [
+                MarkdownCleaner.clean(text, preserve_code_blocks, stats)
+                for text in texts
+            ]
+
+        chunksize = chunksize or max(1, -(-len(texts) // (workers * 4)))
+        batches = [
+            texts[start : start + chunksize]
+            for start in range(0, len(texts), chunksize)
+        ]
+
+        cleaned: list[str] = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            for batch_cleaned, batch_stats in pool.map(
+                _clean_batch,
+                batches,
+                [preserve_code_blocks] * len(batches),
+                [stats is not None] * len(batches),
+            ):
+                cleaned.extend(batch_cleaned)
+                if stats is not None:
+                    stats.merge(batch_stats)
+        return cleaned
+
+    @staticmethod
+    def find_code_fences(text: str) -> list[tuple[int, int]]:
+        """Locate fenced code blocks.
+
+        A block opens with a line of three or more backticks or tildes
+        (indented at most three spaces) and closes with a line of the same
+        character, at least as long and with nothing after it. An unclosed
+        block runs to the end of the text.
+
+        Args:
+            text: Markdown text.
+
+        Returns:
+            (start, end) offsets of each block, from the start of the opening
+            fence line to the end of the closing fence line (newline
+            excluded), in document order.
+        """
+        spans = []
+        opening: Optional[tuple[int, str]] = None
+
+        for match in MarkdownCleaner.CODE_FENCE_PATTERN.finditer(text):
+            fence = match.group(1)
+            line_end = text.find("\n", match.end())
+            if line_end == -1:
+                line_end = len(text)
+            rest = text[match.end() : line_end]
+
+            if opening is None:
+                # The info string of a backtick fence cannot contain backticks
+                if fence[0] == "`" and "`" in rest:
+                    continue
+                opening = (match.start(), fence)
+            elif (
+                fence[0] == opening[1][0]
+                and len(fence) >= len(opening[1])
+                and not rest.strip()
+            ):
+                spans.append((opening[0], line_end))
+                opening = None
+
+        if opening is not None:
+            spans.append((opening[0], len(text)))
+
+        return spans
+
     @staticmethod
     def _remove_html_elements(text: str) -> str:
         """Remove HTML comments and tags.
@@ -68,8 +289,13 @@ class MarkdownCleaner:
         Returns:
             Text without HTML elements.
         """
+        # Both patterns need a "<"; most documents have none
+        if "<" not in text:
+            return text
+
         # Remove HTML comments
-        text = MarkdownCleaner.HTML_COMMENT_PATTERN.sub("", text)
+        if "<!--" in text:
+            text = MarkdownCleaner.HTML_COMMENT_PATTERN.sub("", text)
 
         # Remove HTML tags (but keep their content if it's text)
         text = MarkdownCleaner.HTML_TAG_PATTERN.sub("", text)
@@ -83,6 +309,10 @@ class MarkdownCleaner:
         Preserves intentional line breaks in lists and code blocks,
         but normalizes excessive blank lines.
 
+        Trailing whitespace removal and space collapsing share a single
+        split/join over the lines; each step is skipped when a substring
+        check shows it cannot apply.
+
         Args:
             text: Text to normalize.
 
@@ -90,56 +320,60 @@ class MarkdownCleaner:
             Normalized text.
         """
         # Replace multiple newlines with double newline
-        text = MarkdownCleaner.MULTIPLE_NEWLINES_PATTERN.sub("\n\n", text)
+        if "\n\n\n" in text:
+            text = MarkdownCleaner.MULTIPLE_NEWLINES_PATTERN.sub("\n\n", text)
+
+        has_double_spaces = "  " in text
+        if not (
+            has_double_spaces
+            or " \n" in text
+            or "\t\n" in text
+            or text.endswith((" ", "\t"))
+        ):
+            return text
 
         # Remove trailing whitespace on each line
-        text = MarkdownCleaner.TRAILING_WHITESPACE_PATTERN.sub("", text)
-
-        # Normalize multiple spaces (except in code blocks)
-        # Simple approach: replace 2+ spaces with single space
-        # This is safe for Markdown since meaningful spacing uses newlines
-        lines = text.split("\n")
-        normalized_lines = []
-
-        for line in lines:
-            # Preserve lines that start with spaces (code blocks)
-            if line.startswith("    ") or line.startswith("\t"):
-                normalized_lines.append(line)
-            else:
-                # Normalize spaces in regular content
-                normalized_lines.append(
-                    MarkdownCleaner.MULTIPLE_SPACES_PATTERN.sub(" ", line)
-                )
-
-        text = "\n".join(normalized_lines)
+        lines = [line.rstrip(" \t") for line in text.split("\n")]
 
-        return text
+        # Normalize multiple spaces, except on indented (code) lines
+        if has_double_spaces:
+            lines = [
+                MarkdownCleaner.MULTIPLE_SPACES_PATTERN.sub(" ", line)
+                if "  " in line and line[:4] != "    " and line[:1] != "\t"
+                else line
+                for line in lines
+            ]
+
+        return "\n".join(lines)
 
     @staticmethod
     def _remove_suspicious_patterns(text: str) -> str:
         """Remove or escape potentially dangerous patterns.
 
+        Script and iframe elements are already gone at this point: tag
+        removal leaves no "<" that is followed by a ">".
+
         Args:
             text: Text to sanitize.
 
         Returns:
             Sanitized text.
         """
+        # Cheap case-insensitive pre-check; rare folding variants fall
+        # through to the regexes
+        lowered = text.lower()
+        if (
+            "javascript:" not in lowered
+            and "data:" not in lowered
+            and not any(c in text for c in MarkdownCleaner.CASE_FOLD_VARIANTS)
+        ):
+            return text
+
         # Remove javascript: protocol links
-        text = re.sub(r"javascript:\s*", "", text, flags=re.IGNORECASE)
+        text = MarkdownCleaner.JAVASCRIPT_PATTERN.sub("", text)
 
         # Remove data: URIs (can contain scripts)
-        text = re.sub(r"data:[^,]*,", "", text, flags=re.IGNORECASE)
-
-        # Remove iframe tags and content
-        text = re.sub(
-            r"<iframe[^>]*>.*?</iframe>", "", text, flags=re.IGNORECASE | re.DOTALL
-        )
-
-        # Remove script tags and content
-        text = re.sub(
-            r"<script[^>]*>.*?</script>", "", text, flags=re.IGNORECASE | re.DOTALL
-        )
+        text = MarkdownCleaner.DATA_URI_PATTERN.sub("", text)
 
         return text
 
@@ -156,6 +390,10 @@ class MarkdownCleaner:
         Returns:
             Normalized text.
         """
+        # ASCII is invariant under NFKC, and most text is already normalized
+        if text.isascii() or unicodedata.is_normalized("NFKC", text):
+            return text
+
         # Use NFKC normalization (compatible composition)
         # This converts things like ﬁ (ligature) to fi
         text = unicodedata.normalize("NFKC", text)
@@ -258,3 +496,14 @@ class MarkdownCleaner:
             return False
 
         return True
+
+
+def _clean_batch(
+    texts: list[str], preserve_code_blocks: bool, with_stats: bool
+) -> tuple[list[str], Optional[CleaningStats]]:
+    """Clean one chunk of a clean_many batch (runs in a pool worker)."""
+    stats = CleaningStats() if with_stats else None
+    cleaned = [
+        MarkdownCleaner.clean(text, preserve_code_blocks, stats) for text in texts
+    ]
+    return cleaned, stats
@@ -0,0 +1,434 @@
+"""Watch mode: keep an index in sync with the knowledge base as it changes.
+
+KnowledgeBaseWatcher watches the knowledge base directory and re-chunks only
+the files that were touched, emitting add/update/delete events to
+subscribers. Bursts of filesystem events (editors often write a file several
+times, or write a temp file and rename it) are debounced into one event per
+file.
+
+Backends:
+- inotify (Linux), called through ctypes, so no extra dependency
+- polling fallback: stat-only snapshots of the tree, diffed every interval
+
+Both apply the same filters as DocumentLoader.scan_markdown_files (hidden
+and system files, .md only, symlinks, MAX_RECURSION_DEPTH).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+from pathlib import Path
+from stat import S_ISREG
+from typing import Callable, Optional
+from dataclasses import dataclass, field
+
+from .document_loader import DocumentChunk, DocumentLoader
+
+logger = logging.getLogger(__name__)
+
+# Returned by a backend when it lost track of changes and a full diff is needed
+RESCAN = "<rescan>"
+
+EVENT_ADDED = "added"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+
+
+@dataclass
+class KnowledgeBaseEvent:
+    """A change of one knowledge base file."""
+
+    kind: str  # EVENT_ADDED, EVENT_UPDATED or EVENT_DELETED
+    filepath: str  # Relative to the knowledge base root
+    chunks: list[DocumentChunk] = field(default_factory=list)  # Current chunks
+    removed_chunk_ids: list[str] = field(default_factory=list)  # No longer exist
+
+
+@dataclass
+class _FileState:
+    mtime_ns: int
+    size_bytes: int
+    chunk_ids: list[str]
+
+
+class _PollingBackend:
+    """Detect changes by diffing stat-only snapshots of the tree."""
+
+    def __init__(self, watcher: KnowledgeBaseWatcher):
+        self.watcher = watcher
+        self.snapshot = watcher._snapshot()
+
+    def read_events(self, timeout: float) -> set[str]:
+        if self.watcher._stop_event.wait(timeout):
+            return set()
+        current = self.watcher._snapshot()
+        previous, self.snapshot = self.snapshot, current
+        return {
+            path
+            for path in previous.keys() | current.keys()
+            if previous.get(path) != current.get(path)
+        }
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """Detect changes with Linux inotify, one watch per directory."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = (
+        IN_MODIFY
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+    )
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, watcher: KnowledgeBaseWatcher):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self.watcher = watcher
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: dict[int, str] = {}
+        self._watch_tree()
+
+    def _watch_tree(self) -> None:
+        """Add a watch to every directory the loader would traverse."""
+        for directory in self.watcher._watched_directories():
+            wd = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), self.WATCH_MASK
+            )
+            if wd < 0:
+                logger.warning(
+                    f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}"
+                )
+                continue
+            self.watches[wd] = directory
+
+    def read_events(self, timeout: float) -> set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, self.READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+            elif mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+            elif mask & self.IN_ISDIR or mask & self.IN_DELETE_SELF:
+                # Directory created, moved or removed: files may have
+                # appeared or vanished without individual events
+                changed.add(RESCAN)
+            elif wd in self.watches and name:
+                changed.add(os.path.join(self.watches[wd], name))
+
+        if RESCAN in changed:
+            self._watch_tree()
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class KnowledgeBaseWatcher:
+    """Live-update subscribers as knowledge base files change.
+
+    Example:
+        >>> watcher = KnowledgeBaseWatcher(DocumentLoader())
+        >>> watcher.subscribe(index.apply_event)
+        >>> with watcher:  # starts the background thread
+        ...     serve_forever()
+    """
+
+    DEFAULT_DEBOUNCE = 0.5  # seconds of quiet before a burst is processed
+    DEFAULT_POLL_INTERVAL = 1.0  # seconds (polling backend)
+
+    def __init__(
+        self,
+        loader: DocumentLoader,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: Optional[bool] = None,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            loader: Loader used to chunk changed files.
+            debounce: Quiet period that ends a burst of events.
+            poll_interval: Seconds between snapshots (polling backend) or
+                the longest blocking wait for events (inotify backend).
+            use_inotify: True forces inotify, False forces polling, None
+                uses inotify when available.
+
+        Raises:
+            ValueError: If debounce is negative or poll_interval not positive.
+        """
+        if debounce < 0:
+            raise ValueError(f"debounce must be >= 0, got {debounce}")
+        if poll_interval <= 0:
+            raise ValueError(f"poll_interval must be > 0, got {poll_interval}")
+
+        self.loader = loader
+        self.root = loader.knowledge_base_dir
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self._subscribers: list[Callable[[KnowledgeBaseEvent], None]] = []
+        self._files: dict[str, _FileState] = {}
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def __enter__(self) -> KnowledgeBaseWatcher:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        """'inotify' or 'polling' once started, None before."""
+        if isinstance(self._backend, _InotifyBackend):
+            return "inotify"
+        if isinstance(self._backend, _PollingBackend):
+            return "polling"
+        return None
+
+    def subscribe(
+        self, callback: Callable[[KnowledgeBaseEvent], None]
+    ) -> Callable[[], None]:
+        """Register a callback for change events.
+
+        Callbacks run on the watcher thread, one event at a time.
+
+        Returns:
+            A function that removes the subscription.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def start(self, emit_initial: bool = True) -> None:
+        """Load the current tree and start watching in a background thread.
+
+        Args:
+            emit_initial: Emit an 'added' event for every existing file, so
+                a subscriber can build its index from the event stream alone.
+        """
+        if self._thread is not None:
+            raise RuntimeError("Watcher already started")
+
+        self._stop_event.clear()
+        self._backend = self._open_backend()
+        for dir_entry in self.loader.scan_markdown_files():
+            self._refresh(dir_entry.path, emit=emit_initial)
+
+        self._thread = threading.Thread(
+            target=self._run, name="kb-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Watching {self.root} ({self.backend_name})")
+
+    def stop(self) -> None:
+        """Stop the background thread and release the backend."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    def _open_backend(self):
+        if self.use_inotify is not False and sys.platform.startswith("linux"):
+            try:
+                return _InotifyBackend(self)
+            except OSError as e:
+                if self.use_inotify:
+                    raise
+                logger.warning(f"inotify unavailable, falling back to polling: {e}")
+        elif self.use_inotify:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        return _PollingBackend(self)
+
+    def _run(self) -> None:
+        """Collect events, debounce bursts, then apply them."""
+        while not self._stop_event.is_set():
+            changed = self._backend.read_events(self.poll_interval)
+            if not changed:
+                continue
+
+            # Trailing-edge debounce: wait until the tree is quiet
+            deadline = time.monotonic() + self.debounce
+            while not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                more = self._backend.read_events(remaining)
+                if more:
+                    changed |= more
+                    deadline = time.monotonic() + self.debounce
+
+            try:
+                self._apply(changed)
+            except Exception as e:
+                logger.error(f"Error applying knowledge base changes: {e}")
+
+    def _apply(self, changed: set[str]) -> None:
+        """Re-chunk touched files and emit their events."""
+        if RESCAN in changed:
+            changed = {str(self.root / relative) for relative in self._files}
+            changed.update(e.path for e in self.loader.scan_markdown_files())
+        for path in sorted(changed):
+            self._refresh(path)
+
+    def _refresh(self, path: str, emit: bool = True) -> None:
+        """Bring the state of one file up to date and emit its event."""
+        relative = os.path.relpath(path, self.root)
+        previous = self._files.get(relative)
+        stat = self._stat_if_watched(path, relative)
+
+        if stat is None:
+            if previous is not None:
+                del self._files[relative]
+                self._emit(
+                    KnowledgeBaseEvent(
+                        kind=EVENT_DELETED,
+                        filepath=relative,
+                        removed_chunk_ids=previous.chunk_ids,
+                    ),
+                )
+            return
+
+        if (
+            previous is not None
+            and previous.mtime_ns == stat.st_mtime_ns
+            and previous.size_bytes == stat.st_size
+        ):
+            return
+
+        try:
+            chunks = self.loader.load_document(Path(path))
+        except Exception as e:
+            logger.error(f"Error processing {path}: {e}")
+            return
+
+        chunk_ids = [chunk.chunk_id for chunk in chunks]
+        self._files[relative] = _FileState(
+            mtime_ns=stat.st_mtime_ns, size_bytes=stat.st_size, chunk_ids=chunk_ids
+        )
+        if not emit:
+            return
+        current = set(chunk_ids)
+        self._emit(
+            KnowledgeBaseEvent(
+                kind=EVENT_ADDED if previous is None else EVENT_UPDATED,
+                filepath=relative,
+                chunks=chunks,
+                removed_chunk_ids=(
+                    [cid for cid in previous.chunk_ids if cid not in current]
+                    if previous is not None
+                    else []
+                ),
+            )
+        )
+
+    def _emit(self, event: KnowledgeBaseEvent) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Subscriber failed on {event.filepath}: {e}")
+
+    def _stat_if_watched(self, path: str, relative: str) -> Optional[os.stat_result]:
+        """Return the stat of path if the loader would load it, else None.
+
+        Mirrors the filters of DocumentLoader.scan_markdown_files.
+        """
+        parts = Path(relative).parts
+        if (
+            not parts
+            or parts[0] == ".."
+            or any(part.startswith(".") for part in parts)
+            or parts[-1] in self.loader.SYSTEM_FILES
+            or not parts[-1].endswith(".md")
+            or len(parts) - 1 > self.loader.MAX_RECURSION_DEPTH
+        ):
+            return None
+        try:
+            stat = os.stat(path, follow_symlinks=not self.loader.validate_security)
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+        return stat
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} of every watched file."""
+        snapshot = {}
+        for dir_entry in self.loader.scan_markdown_files():
+            try:
+                stat = dir_entry.stat()
+            except OSError:
+                continue
+            snapshot[dir_entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _watched_directories(self) -> list[str]:
+        """Directories traversed by the loader (same depth and hidden rules)."""
+        directories = []
+        stack = [(str(self.root), 0)]
+        while stack:
+            directory, depth = stack.pop()
+            if depth > self.loader.MAX_RECURSION_DEPTH:
+                continue
+            directories.append(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith(".") and entry.is_dir(
+                            follow_symlinks=False
+                        ):
+                            stack.append((entry.path, depth + 1))
+            except OSError as e:
+                logger.error(f"Cannot scan {directory}: {e}")
+        return directories
@@ -1 +1,37 @@
-# services.vectors package
+"""Vector search service module.
+
+In-process vector indexes used for retrieval, as an alternative to a round
+trip to the ChromaDB container for knowledge bases of our size, and the
+writer of the ChromaDB collection the backend server searches.
+
+Main components:
+- FlatIndex: Exact cosine top-k over a memory-mapped float32 matrix
+- HNSWIndex: Approximate top-k over an HNSW graph, for large vector sets
+- QuantizedIndex: int8 / product-quantized codes in RAM, exact re-scoring
+- EmbeddingCache: Persistent embeddings keyed by model and content hash
+- ChromaCollection: Bulk upserts into a ChromaDB collection (REST API)
+- MetadataIndex: Roaring bitmaps per category, tag, language and depth, used
+  by the indexes to score only the rows matching a MetadataFilter
+"""
+
+from .chroma_collection import ChromaCollection
+from .embedding_cache import EmbeddingCache
+from .flat_index import FlatIndex, SearchResult
+from .hnsw_index import HNSWIndex
+from .bitmap import RoaringBitmap
+from .metadata_index import MetadataFilter, MetadataIndex
+from .quantization import ProductQuantizer, QuantizedIndex, ScalarQuantizer
+
+__all__ = [
+    "ChromaCollection",
+    "EmbeddingCache",
+    "FlatIndex",
+    "HNSWIndex",
+    "MetadataFilter",
+    "MetadataIndex",
+    "ProductQuantizer",
+    "QuantizedIndex",
+    "RoaringBitmap",
+    "ScalarQuantizer",
+    "SearchResult",
+]
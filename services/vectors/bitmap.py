@@ -0,0 +1,229 @@
+"""Compressed bitmap of row numbers (roaring layout).
+
+Row numbers (uint32) are split into a 16-bit high key and a 16-bit low
+value. Each key owns one container holding the low values of its chunk:
+- array container: sorted uint16 array, for up to ARRAY_MAX_SIZE values
+  (2 bytes per value)
+- bitmap container: 1024 uint64 words, one bit per possible value (8 KB)
+
+so sparse sets cost 2 bytes per row and dense ones 1 bit per row, and
+intersections of a selective bitmap with a dense one only touch the
+values of the selective side (Chambi et al., "Better bitmap performance
+with Roaring bitmaps", 2016).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Iterable, Iterator, Union
+
+import numpy as np
+
+ARRAY_MAX_SIZE = 4096  # Above this a bitmap container is smaller
+BITMAP_WORDS = 1 << 10  # 65536 bits
+
+Container = np.ndarray  # uint16 (array container) or uint64 (bitmap container)
+
+
+def _is_bitmap(container: Container) -> bool:
+    return container.dtype == np.uint64
+
+
+def _to_bitmap(values: np.ndarray) -> np.ndarray:
+    bits = np.zeros(BITMAP_WORDS * 64, dtype=bool)
+    bits[values] = True
+    return np.packbits(bits, bitorder="little").view(np.uint64)
+
+
+def _to_values(container: Container) -> np.ndarray:
+    """Return the sorted uint16 values of a container."""
+    if not _is_bitmap(container):
+        return container
+    bits = np.unpackbits(container.view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _bitmap_contains(words: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Test each uint16 value against a bitmap container."""
+    values = values.astype(np.uint64)
+    bits = words[values >> np.uint64(6)] >> (values & np.uint64(63))
+    return (bits & np.uint64(1)).astype(bool)
+
+
+def _normalize(container: Container) -> Union[Container, None]:
+    """Pick the smaller representation; None for an empty container."""
+    if _is_bitmap(container):
+        count = int(np.bitwise_count(container).sum())
+        if count == 0:
+            return None
+        return _to_values(container) if count <= ARRAY_MAX_SIZE else container
+    if not len(container):
+        return None
+    return _to_bitmap(container) if len(container) > ARRAY_MAX_SIZE else container
+
+
+def _and(a: Container, b: Container) -> Union[Container, None]:
+    if _is_bitmap(a) and _is_bitmap(b):
+        return _normalize(a & b)
+    if _is_bitmap(a):
+        a, b = b, a
+    if _is_bitmap(b):
+        return _normalize(a[_bitmap_contains(b, a)])
+    return _normalize(np.intersect1d(a, b, assume_unique=True))
+
+
+def _or(a: Container, b: Container) -> Container:
+    if _is_bitmap(a) or _is_bitmap(b):
+        a = a if _is_bitmap(a) else _to_bitmap(a)
+        b = b if _is_bitmap(b) else _to_bitmap(b)
+        return a | b
+    return _normalize(np.union1d(a, b))
+
+
+class RoaringBitmap:
+    """Set of uint32 row numbers stored as roaring containers.
+
+    Example:
+        >>> rows = RoaringBitmap.from_values([1, 5, 70000])
+        >>> (rows & RoaringBitmap.from_values([5, 6])).to_array()
+        array([5], dtype=uint32)
+    """
+
+    __slots__ = ("_keys", "_containers")
+
+    def __init__(self) -> None:
+        self._keys: list[int] = []  # Sorted high 16 bits
+        self._containers: list[Container] = []
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> RoaringBitmap:
+        """Build a bitmap from row numbers in any order (duplicates allowed)."""
+        values = np.unique(np.fromiter(values, dtype=np.uint32))
+        bitmap = cls()
+        highs = values >> 16
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        for chunk in np.split(values, bounds) if len(values) else []:
+            bitmap._keys.append(int(chunk[0]) >> 16)
+            bitmap._containers.append(_normalize((chunk & 0xFFFF).astype(np.uint16)))
+        return bitmap
+
+    def __len__(self) -> int:
+        return sum(
+            int(np.bitwise_count(c).sum()) if _is_bitmap(c) else len(c)
+            for c in self._containers
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._keys)
+
+    def __contains__(self, value: int) -> bool:
+        position = self._find(value >> 16)
+        if position < 0:
+            return False
+        container, low = self._containers[position], value & 0xFFFF
+        if _is_bitmap(container):
+            return bool((int(container[low >> 6]) >> (low & 63)) & 1)
+        index = int(np.searchsorted(container, low))
+        return index < len(container) and container[index] == low
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_array().tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RoaringBitmap):
+            return NotImplemented
+        return np.array_equal(self.to_array(), other.to_array())
+
+    def __repr__(self) -> str:
+        return f"RoaringBitmap({len(self)} rows, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the containers."""
+        return sum(container.nbytes for container in self._containers)
+
+    def add(self, value: int) -> None:
+        """Insert one row number."""
+        key, low = value >> 16, value & 0xFFFF
+        position = self._find(key)
+        if position < 0:
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._containers.insert(position, np.array([low], dtype=np.uint16))
+            return
+        container = self._containers[position]
+        if _is_bitmap(container):
+            container[low >> 6] |= np.uint64(1 << (low & 63))
+            return
+        index = int(np.searchsorted(container, low))
+        if index < len(container) and container[index] == low:
+            return
+        self._containers[position] = _normalize(np.insert(container, index, low))
+
+    def discard(self, value: int) -> None:
+        """Remove one row number if present."""
+        key, low = value >> 16, value & 0xFFFF
+        position = self._find(key)
+        if position < 0:
+            return
+        container = self._containers[position]
+        if _is_bitmap(container):
+            container = container.copy()
+            container[low >> 6] &= ~np.uint64(1 << (low & 63))
+        else:
+            container = container[container != low]
+        container = _normalize(container)
+        if container is None:
+            del self._keys[position], self._containers[position]
+        else:
+            self._containers[position] = container
+
+    def to_array(self) -> np.ndarray:
+        """Return the row numbers as a sorted uint32 array."""
+        if not self._keys:
+            return np.empty(0, dtype=np.uint32)
+        return np.concatenate(
+            [
+                (key << 16) | _to_values(container).astype(np.uint32)
+                for key, container in zip(self._keys, self._containers)
+            ]
+        ).astype(np.uint32)
+
+    def __and__(self, other: RoaringBitmap) -> RoaringBitmap:
+        result = RoaringBitmap()
+        i = j = 0
+        while i < len(self._keys) and j < len(other._keys):
+            key, other_key = self._keys[i], other._keys[j]
+            if key < other_key:
+                i += 1
+            elif key > other_key:
+                j += 1
+            else:
+                container = _and(self._containers[i], other._containers[j])
+                if container is not None:
+                    result._keys.append(key)
+                    result._containers.append(container)
+                i += 1
+                j += 1
+        return result
+
+    def __or__(self, other: RoaringBitmap) -> RoaringBitmap:
+        result = RoaringBitmap()
+        # Copies: add() updates bitmap containers in place
+        merged = {key: c.copy() for key, c in zip(self._keys, self._containers)}
+        for key, container in zip(other._keys, other._containers):
+            if key in merged:
+                merged[key] = _or(merged[key], container)
+            else:
+                merged[key] = container.copy()
+        for key in sorted(merged):
+            result._keys.append(key)
+            result._containers.append(merged[key])
+        return result
+
+    def _find(self, key: int) -> int:
+        """Position of key in _keys, or -1."""
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return position
+        return -1
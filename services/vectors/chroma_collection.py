@@ -0,0 +1,163 @@
+"""Writer for a collection of the ChromaDB server (REST API v2).
+
+The backend server reads its search corpus from the ChromaDB collection
+CHROMA_COLLECTION_NAME: BM25 and the chunk store are filled from the
+records' texts and metadata, and vector search queries their embeddings.
+ChromaCollection is the ingestion side of that contract: it creates the
+collection if needed and upserts records (id, text, metadata, embedding)
+in bulk over one keep-alive HTTP client.
+
+Endpoints used:
+    - POST /api/v2/tenants/{tenant}/databases/{database}/collections
+    - POST /api/v2/tenants/{tenant}/databases/{database}/collections/{id}/upsert
+    - GET  /api/v2/tenants/{tenant}/databases/{database}/collections/{id}/count
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional, Sequence, Union
+
+import httpx
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Chroma metadata values: scalars, or arrays of one scalar type
+MetadataValue = Union[str, int, float, bool, list[str]]
+
+
+class ChromaCollection:
+    """Create and fill one ChromaDB collection.
+
+    Example:
+        >>> async with ChromaCollection() as collection:
+        ...     await collection.upsert(ids, texts, metadatas, vectors)
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        base_url: Optional[str] = None,
+        tenant: str = "default_tenant",
+        database: str = "default_database",
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 60.0,
+    ):
+        """Create a writer; the collection is created on first use.
+
+        Args:
+            name: Collection name. If None, uses settings.CHROMA_COLLECTION_NAME.
+            base_url: ChromaDB server URL. If None, uses
+                http://CHROMADB_HOST:CHROMADB_PORT.
+            tenant: ChromaDB tenant.
+            database: ChromaDB database.
+            client: HTTP client to use instead of creating one (not closed).
+            timeout: Request timeout in seconds, for a created client.
+        """
+        default_url = f"http://{settings.CHROMADB_HOST}:{settings.CHROMADB_PORT}"
+        self.name = name or settings.CHROMA_COLLECTION_NAME
+        self.base_url = (base_url or default_url).rstrip("/")
+        self.database_path = f"/api/v2/tenants/{tenant}/databases/{database}"
+        self._id: Optional[str] = None
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            base_url=self.base_url, timeout=timeout
+        )
+
+    async def __aenter__(self) -> ChromaCollection:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if the writer created it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def collection_id(self) -> str:
+        """Return the collection id, creating the collection if it is missing.
+
+        Raises:
+            httpx.HTTPError: If the server is unreachable or rejects the call.
+        """
+        if self._id is None:
+            response = await self._client.post(
+                f"{self.database_path}/collections",
+                json={"name": self.name, "get_or_create": True},
+            )
+            response.raise_for_status()
+            self._id = response.json()["id"]
+            logger.debug(f"Chroma collection {self.name}: {self._id}")
+        return self._id
+
+    async def upsert(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict[str, MetadataValue]],
+        embeddings: np.ndarray,
+    ) -> None:
+        """Insert or replace records in one request.
+
+        Args:
+            ids: Record ids (chunk ids).
+            documents: Record texts.
+            metadatas: Record metadata; None values are not allowed.
+            embeddings: Array of shape (len(ids), dim).
+
+        Raises:
+            ValueError: If the arguments do not describe the same records.
+            httpx.HTTPError: If the server is unreachable or rejects the call.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not len(ids) == len(documents) == len(metadatas) == len(embeddings):
+            raise ValueError(
+                f"Expected one text, metadata and embedding per id, got "
+                f"{len(ids)} ids, {len(documents)} texts, {len(metadatas)} "
+                f"metadatas and {len(embeddings)} embeddings"
+            )
+        if not ids:
+            return
+        collection_id = await self.collection_id()
+        response = await self._client.post(
+            f"{self.database_path}/collections/{collection_id}/upsert",
+            json={
+                "ids": list(ids),
+                "documents": list(documents),
+                "metadatas": list(metadatas),
+                "embeddings": embeddings.tolist(),
+            },
+        )
+        response.raise_for_status()
+
+    async def count(self) -> int:
+        """Return the number of records in the collection.
+
+        Raises:
+            httpx.HTTPError: If the server is unreachable or rejects the call.
+        """
+        collection_id = await self.collection_id()
+        response = await self._client.get(
+            f"{self.database_path}/collections/{collection_id}/count"
+        )
+        response.raise_for_status()
+        return int(response.json())
+
+
+def chroma_metadata(fields: dict[str, Any]) -> dict[str, MetadataValue]:
+    """Drop the fields Chroma cannot store (None, empty arrays).
+
+    Tuples become lists, the array type of Chroma metadata.
+    """
+    metadata: dict[str, MetadataValue] = {}
+    for key, value in fields.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        if value is None or value == []:
+            continue
+        metadata[key] = value
+    return metadata
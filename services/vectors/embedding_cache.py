@@ -0,0 +1,206 @@
+"""Persistent cache of chunk embeddings keyed by model and content hash.
+
+Embedding through Ollama is the most expensive ingestion step, and most
+chunks are byte-identical between two ingestions of a knowledge base.
+Entries are keyed by (model name, BLAKE2b digest of the chunk text), so a
+re-index after small edits only embeds the chunks that changed, and
+switching OLLAMA_EMBED_MODEL never returns vectors of another model.
+
+Storage: a single SQLite file holding raw float32 vectors, with bulk
+lookup/insert and size-bounded LRU eviction (same layout as ChunkCache).
+"""
+
+from __future__ import annotations
+
+import time
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Persistent, size-bounded LRU cache of embeddings.
+
+    Example:
+        >>> cache = EmbeddingCache()
+        >>> vectors = cache.get_many(texts)  # None for misses
+        >>> missing = [t for t, v in zip(texts, vectors) if v is None]
+        >>> cache.put_many(missing, embed(missing))
+    """
+
+    DEFAULT_PATH = Path("./data/embedding_cache.db")
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB of vectors
+    DIGEST_SIZE = 20  # bytes
+    BATCH_SIZE = 500  # Keys per query (below SQLite's variable limit)
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        model: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path. If None, uses DEFAULT_PATH.
+            model: Embedding model name. If None, uses
+                settings.OLLAMA_EMBED_MODEL.
+            max_bytes: Vector budget; least recently used entries (of any
+                model) are evicted beyond it.
+
+        Raises:
+            ValueError: If max_bytes is lower than 1.
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be >= 1, got {max_bytes}")
+
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.model = model or settings.OLLAMA_EMBED_MODEL
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access INTEGER NOT NULL,
+                PRIMARY KEY (model, hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access "
+            "ON embeddings (last_access)"
+        )
+
+        logger.debug(f"EmbeddingCache opened: {self.path} (model {self.model})")
+
+    def __enter__(self) -> EmbeddingCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def content_hash(cls, text: str) -> str:
+        """Return the cache key of a chunk text."""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=cls.DIGEST_SIZE)
+        return digest.hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Look up the embeddings of many texts at once.
+
+        Returns:
+            One float32 vector (read-only) per text, None on a miss.
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        found: dict[str, bytes] = {}
+        for start in range(0, len(hashes), self.BATCH_SIZE):
+            batch = list(set(hashes[start : start + self.BATCH_SIZE]))
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings "  # noqa: S608
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    (self.model, *batch),
+                )
+            )
+
+        if found:
+            now = time.time_ns()
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE model = ? AND hash = ?",
+                [(now, self.model, key) for key in found],
+            )
+
+        vectors = [
+            np.frombuffer(found[key], dtype=np.float32) if key in found else None
+            for key in hashes
+        ]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """Store the embeddings of many texts, evicting old entries if needed.
+
+        Args:
+            texts: Chunk texts.
+            vectors: Array of shape (len(texts), dim).
+
+        Raises:
+            ValueError: If texts and vectors do not match.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError(
+                f"Expected {len(texts)} vectors, got array of shape {vectors.shape}"
+            )
+
+        now = time.time_ns()
+        with self._conn:  # One transaction for the whole batch
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                [
+                    (self.model, self.content_hash(text), vector.tobytes(), now)
+                    for text, vector in zip(texts, vectors)
+                ],
+            )
+        self._evict()
+
+    def size_bytes(self) -> int:
+        """Return the total size of stored vectors."""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(length(vector)), 0) FROM embeddings"
+        ).fetchone()
+        return total
+
+    def __len__(self) -> int:
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model,)
+        ).fetchone()
+        return count
+
+    def clear(self) -> None:
+        """Remove every entry of this cache's model."""
+        self._conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model,))
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_bytes."""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = []
+        for model, key, size in self._conn.execute(
+            "SELECT model, hash, length(vector) FROM embeddings ORDER BY last_access"
+        ):
+            evicted.append((model, key))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany(
+            "DELETE FROM embeddings WHERE model = ? AND hash = ?", evicted
+        )
+        logger.debug(f"EmbeddingCache evicted {len(evicted)} entries")
@@ -0,0 +1,377 @@
+"""Embedded exact vector index backed by a memory-mapped float32 matrix.
+
+For a knowledge base of a few hundred thousand chunks an exact in-process
+search is faster than a round trip to the ChromaDB container: one matrix
+multiply scores every vector and ``argpartition`` picks the top-k without a
+full sort.
+
+Storage (one directory per index, under settings.CHROMADB_PATH by default):
+- vectors.f32: raw float32 rows, L2-normalized so dot product is cosine
+- meta.json: dimension, row count, the id of every row (null = deleted) and
+  the metadata fields of every row (see MetadataIndex)
+
+Searches can be filtered by metadata (category, tags, language, depth): the
+filter is resolved to candidate rows with bitmaps first, and only those
+rows are scored.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.config import settings
+
+from .metadata_index import MetadataFilter, MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """One hit of a vector search."""
+
+    id: str
+    score: float  # Cosine similarity, higher is closer
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Return float32 copies of vectors scaled to unit L2 norm.
+
+    Zero vectors are left as zeros (they score 0 against everything).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the columns and values of the k best scores of each row.
+
+    Uses argpartition, so only the k winners are sorted (best first).
+    """
+    count = scores.shape[1]
+    if k < count:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(count), (len(scores), count))
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+class FlatIndex:
+    """Exact cosine-similarity index with memory-mapped persistence.
+
+    Example:
+        >>> index = FlatIndex(dim=768)
+        >>> index.add(["doc.md#0", "doc.md#1"], embeddings)
+        >>> index.search(query_embeddings, k=5)
+        [[SearchResult(id='doc.md#1', score=0.83), ...]]
+        >>> index.search(query_embeddings, k=5, where=MetadataFilter(language="es"))
+    """
+
+    DEFAULT_DIR = Path(settings.CHROMADB_PATH) / "flat_index"
+    VECTORS_FILE = "vectors.f32"
+    META_FILE = "meta.json"
+    INITIAL_CAPACITY = 1024  # rows
+    # Filters matching more than this share of rows scan everything and mask
+    # the rest: gathering most rows into a copy costs more than scoring them
+    FILTER_SCAN_RATIO = 0.25
+
+    def __init__(self, dim: int, path: Optional[Path] = None):
+        """Open (or create) an index.
+
+        Args:
+            dim: Embedding dimension.
+            path: Index directory. If None, uses DEFAULT_DIR.
+
+        Raises:
+            ValueError: If dim is lower than 1 or does not match an existing
+                index at path.
+        """
+        if dim < 1:
+            raise ValueError(f"dim must be >= 1, got {dim}")
+
+        self.dim = dim
+        self.path = Path(path) if path else self.DEFAULT_DIR
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._ids: list[Optional[str]] = []  # Row -> id, None if deleted
+        self._rows: dict[str, int] = {}  # id -> row
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        self._dead_mask: Optional[np.ndarray] = None  # Cached for search
+        self.metadata = MetadataIndex()
+
+        meta_path = self.path / self.META_FILE
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta["dim"] != dim:
+                raise ValueError(
+                    f"Index at {self.path} has dim {meta['dim']}, expected {dim}"
+                )
+            self._ids = meta["ids"]
+            self._rows = {id_: row for row, id_ in enumerate(self._ids) if id_}
+            self.metadata = MetadataIndex.from_state(meta.get("metadata", []))
+
+        self._open_matrix(max(len(self._ids), self.INITIAL_CAPACITY))
+        logger.debug(f"FlatIndex opened: {self.path} ({len(self)} vectors)")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._rows
+
+    def __enter__(self) -> FlatIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def deleted_rows(self) -> int:
+        """Rows still occupied by deleted vectors (reclaimed by compact)."""
+        return len(self._ids) - len(self._rows)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[object]] = None,
+    ) -> None:
+        """Insert vectors, replacing existing ones with the same id.
+
+        Args:
+            ids: One unique id per vector.
+            vectors: Array of shape (len(ids), dim).
+            metadata: Optional DocumentMetadata (or dict with category, tags,
+                language and depth) per vector, for filtered search. If None,
+                replaced vectors keep their previous metadata.
+
+        Raises:
+            ValueError: If shapes do not match or ids repeat.
+        """
+        vectors = self._check_vectors(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if metadata is not None and len(metadata) != len(ids):
+            raise ValueError(f"Got {len(metadata)} metadata for {len(ids)} ids")
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must be unique within one add() call")
+
+        vectors = normalize_rows(vectors)
+        new_ids = [id_ for id_ in ids if id_ not in self._rows]
+        self._reserve(len(self._ids) + len(new_ids))
+
+        for id_ in new_ids:
+            self._rows[id_] = len(self._ids)
+            self._ids.append(id_)
+        rows = np.fromiter((self._rows[id_] for id_ in ids), dtype=np.int64)
+        self._matrix[rows] = vectors
+        if metadata is not None:
+            self.metadata.add_many(rows.tolist(), metadata)
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove vectors by id; unknown ids are ignored.
+
+        Rows are only tombstoned; call compact() to reclaim them.
+
+        Returns:
+            Number of vectors removed.
+        """
+        removed = 0
+        for id_ in ids:
+            row = self._rows.pop(id_, None)
+            if row is None:
+                continue
+            self._ids[row] = None
+            self._matrix[row] = 0.0
+            self.metadata.remove_many([row])
+            removed += 1
+        if removed:
+            self._dead_mask = None
+        return removed
+
+    def compact(self) -> None:
+        """Move live rows to the front and shrink the file."""
+        live = [row for row, id_ in enumerate(self._ids) if id_ is not None]
+        if len(live) == len(self._ids):
+            return
+
+        count = len(live)
+        self._matrix[:count] = self._matrix[np.asarray(live, dtype=np.int64)]
+        self._ids = [self._ids[row] for row in live]
+        self.metadata = MetadataIndex.from_state(
+            [self.metadata.fields(row) for row in live]
+        )
+        self._rows = {id_: row for row, id_ in enumerate(self._ids)}
+        self._dead_mask = None
+        self._open_matrix(max(count, self.INITIAL_CAPACITY), shrink=True)
+        self.flush()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        where: Optional[MetadataFilter] = None,
+    ) -> list[list[SearchResult]]:
+        """Return the k most similar vectors for each query.
+
+        Args:
+            queries: Array of shape (dim,) or (n_queries, dim).
+            k: Results per query.
+            where: Only return vectors whose metadata matches. Only the
+                matching rows are scored.
+
+        Returns:
+            One list of results per query, best first.
+
+        Raises:
+            ValueError: If k is lower than 1 or queries have the wrong shape.
+        """
+        if k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        queries = normalize_rows(self._check_vectors(queries))
+
+        candidates = self._candidates(where)
+        if not self._rows or (candidates is not None and not len(candidates)):
+            return [[] for _ in range(len(queries))]
+
+        if not self._gather(candidates):
+            scores = queries @ self._matrix[: len(self._ids)].T
+            live = self._mask_rows(scores, candidates)
+            top, top_scores = top_k_rows(scores, min(k, live))
+        else:
+            scores = queries @ self._matrix[candidates].T
+            top, top_scores = top_k_rows(scores, min(k, len(candidates)))
+            top = candidates[top]
+
+        return [
+            self._results(rows, row_scores)
+            for rows, row_scores in zip(top.tolist(), top_scores.tolist())
+        ]
+
+    def get(self, id_: str) -> np.ndarray:
+        """Return a copy of the (normalized) vector stored for id.
+
+        Raises:
+            KeyError: If id is not in the index.
+        """
+        return np.array(self._matrix[self._rows[id_]])
+
+    def flush(self) -> None:
+        """Persist vectors and metadata."""
+        self._matrix.flush()
+        meta_path = self.path / self.META_FILE
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "dim": self.dim,
+                    "ids": self._ids,
+                    "metadata": self.metadata.state(len(self._ids)),
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, meta_path)
+
+    def close(self) -> None:
+        """Flush and release the memory map."""
+        if self._matrix is not None:
+            self.flush()
+            self._matrix = None
+
+    def _results(self, rows: list[int], scores: list[float]) -> list[SearchResult]:
+        return [
+            SearchResult(id=self._ids[row], score=float(score))
+            for row, score in zip(rows, scores)
+        ]
+
+    def _candidates(self, where: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        """Return the rows matching where (sorted), or None for all rows."""
+        if where is None:
+            return None
+        rows = self.metadata.select(where)
+        return None if rows is None else rows.to_array().astype(np.int64)
+
+    def _gather(self, candidates: Optional[np.ndarray]) -> bool:
+        """True if only the candidate rows should be scored."""
+        if candidates is None:
+            return False
+        return len(candidates) <= self.FILTER_SCAN_RATIO * len(self._ids)
+
+    def _mask_rows(self, scores: np.ndarray, candidates: Optional[np.ndarray]) -> int:
+        """Mask deleted rows, and rows outside candidates if given.
+
+        Returns:
+            Number of rows left unmasked.
+        """
+        if candidates is None:
+            self._mask_deleted(scores)
+            return len(self._rows)
+        excluded = np.ones(scores.shape[-1], dtype=bool)
+        excluded[candidates] = False
+        scores[..., excluded] = -np.inf
+        return len(candidates)
+
+    def _mask_deleted(self, scores: np.ndarray) -> None:
+        """Set the scores of deleted rows (last axis) to -inf in place."""
+        if not self.deleted_rows:
+            return
+        count = len(self._ids)
+        if self._dead_mask is None or len(self._dead_mask) != count:
+            self._dead_mask = np.fromiter(
+                (id_ is None for id_ in self._ids), dtype=bool, count=count
+            )
+        scores[..., self._dead_mask] = -np.inf
+
+    def _check_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected vectors of shape (n, {self.dim}), got {vectors.shape}"
+            )
+        return vectors
+
+    def _reserve(self, rows: int) -> None:
+        """Grow the file (doubling) so it holds at least rows rows."""
+        if rows <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < rows:
+            capacity *= 2
+        self._open_matrix(capacity)
+
+    def _open_matrix(self, capacity: int, shrink: bool = False) -> None:
+        """(Re)map vectors.f32 with room for capacity rows."""
+        vectors_path = self.path / self.VECTORS_FILE
+        size = capacity * self.dim * np.dtype(np.float32).itemsize
+
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+
+        with open(vectors_path, "ab") as f:
+            current = f.tell()
+            if current < size or (shrink and current > size):
+                f.truncate(size)
+
+        self._matrix = np.memmap(
+            vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        self._capacity = capacity
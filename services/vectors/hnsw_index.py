@@ -0,0 +1,463 @@
+"""Approximate nearest-neighbour index (HNSW) for large vector sets.
+
+Hierarchical Navigable Small World graphs (Malkov & Yashunin): every vector
+is a node linked to its closest neighbours on layer 0, and a geometrically
+shrinking subset of nodes is also linked on upper layers. A search greedily
+descends the sparse upper layers to a good entry point, then runs a
+best-first search of width ef_search on layer 0. Cost grows roughly with
+log(n) instead of n, at the price of a small loss of recall.
+
+Tuning:
+- M: links per node on upper layers (2 * M on layer 0). Higher M gives
+  better recall and a bigger index.
+- ef_construction: search width while inserting. Higher builds slower and
+  gives a better graph.
+- ef_search: search width while querying; trades latency for recall and
+  can be changed at any time.
+
+Deletes are soft: deleted nodes stay in the graph for navigation and are
+filtered out of results.
+
+Storage (one directory per index, under settings.CHROMADB_PATH by default):
+- vectors.npy, levels.npy, links0.npy, upper_offsets.npy, upper_links.npy:
+  graph arrays, loaded copy-on-write with mmap
+- meta.json: parameters, entry point and the id of every node (null = deleted)
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import math
+import heapq
+import random
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from core.config import settings
+
+from .flat_index import SearchResult, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+NO_LINK = -1  # Padding of neighbour rows
+
+
+class HNSWIndex:
+    """Approximate cosine-similarity index (HNSW graph) with mmap loading.
+
+    Example:
+        >>> index = HNSWIndex(dim=768, M=16, ef_search=64)
+        >>> index.add(chunk_ids, embeddings)
+        >>> index.search(query_embeddings, k=5)
+        [[SearchResult(id='doc.md#1', score=0.83), ...]]
+        >>> index.flush()
+    """
+
+    DEFAULT_DIR = Path(settings.CHROMADB_PATH) / "hnsw_index"
+    DEFAULT_M = 16
+    DEFAULT_EF_CONSTRUCTION = 200
+    DEFAULT_EF_SEARCH = 50
+    INITIAL_CAPACITY = 1024  # nodes
+    META_FILE = "meta.json"
+    ARRAYS = ("vectors", "levels", "links0", "upper_offsets", "upper_links")
+
+    def __init__(
+        self,
+        dim: int,
+        path: Optional[Path] = None,
+        M: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        ef_search: int = DEFAULT_EF_SEARCH,
+        seed: Optional[int] = None,
+    ):
+        """Open (or create) an index.
+
+        Args:
+            dim: Embedding dimension.
+            path: Index directory. If None, uses DEFAULT_DIR.
+            M: Links per node on upper layers (layer 0 keeps 2 * M).
+            ef_construction: Search width used when inserting.
+            ef_search: Default search width used when querying.
+            seed: Seed of the level generator, for reproducible graphs.
+
+        Raises:
+            ValueError: If a parameter is out of range, or dim or M do not
+                match an existing index at path.
+        """
+        if dim < 1:
+            raise ValueError(f"dim must be >= 1, got {dim}")
+        if M < 2:
+            raise ValueError(f"M must be >= 2, got {M}")
+        if ef_construction < 1 or ef_search < 1:
+            raise ValueError("ef_construction and ef_search must be >= 1")
+
+        self.dim = dim
+        self.path = Path(path) if path else self.DEFAULT_DIR
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+
+        self._level_mult = 1.0 / math.log(M)
+        self._random = random.Random(seed)
+        self._ids: list[Optional[str]] = []  # Node -> id, None if deleted
+        self._nodes: dict[str, int] = {}  # id -> node
+        self._entry = NO_LINK
+        self._max_level = -1
+        self._upper_count = 0  # Rows used in upper_links
+        self._dirty = False
+
+        meta_path = self.path / self.META_FILE
+        if meta_path.exists():
+            self._load(json.loads(meta_path.read_text(encoding="utf-8")))
+        else:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+            self._levels = np.zeros(0, dtype=np.int8)
+            self._links0 = np.full((0, self.M0), NO_LINK, dtype=np.int32)
+            self._upper_offsets = np.full(0, NO_LINK, dtype=np.int64)
+            self._upper_links = np.full((0, M), NO_LINK, dtype=np.int32)
+
+        logger.debug(f"HNSWIndex opened: {self.path} ({len(self)} vectors)")
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._nodes
+
+    def __enter__(self) -> HNSWIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def deleted_rows(self) -> int:
+        """Nodes kept in the graph for deleted vectors."""
+        return len(self._ids) - len(self._nodes)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert vectors one by one into the graph.
+
+        Re-adding an existing id soft-deletes its old node and inserts the
+        new vector as a fresh node.
+
+        Args:
+            ids: One unique id per vector.
+            vectors: Array of shape (len(ids), dim).
+
+        Raises:
+            ValueError: If shapes do not match or ids repeat.
+        """
+        vectors = self._check_vectors(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must be unique within one add() call")
+
+        self.delete([id_ for id_ in ids if id_ in self._nodes])
+        self._reserve(len(self._ids) + len(ids))
+        for id_, vector in zip(ids, normalize_rows(vectors)):
+            node = len(self._ids)
+            self._ids.append(id_)
+            self._nodes[id_] = node
+            self._vectors[node] = vector
+            self._insert(node)
+        self._dirty = True
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Soft-delete vectors by id; unknown ids are ignored.
+
+        Returns:
+            Number of vectors removed.
+        """
+        removed = 0
+        for id_ in ids:
+            node = self._nodes.pop(id_, None)
+            if node is None:
+                continue
+            self._ids[node] = None
+            removed += 1
+        if removed:
+            self._dirty = True
+        return removed
+
+    def search(
+        self, queries: np.ndarray, k: int = 10, ef: Optional[int] = None
+    ) -> list[list[SearchResult]]:
+        """Return (approximately) the k most similar vectors for each query.
+
+        Args:
+            queries: Array of shape (dim,) or (n_queries, dim).
+            k: Results per query.
+            ef: Search width. If None, uses ef_search. Always at least k.
+
+        Returns:
+            One list of results per query, best first.
+
+        Raises:
+            ValueError: If k is lower than 1 or queries have the wrong shape.
+        """
+        if k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        queries = normalize_rows(self._check_vectors(queries))
+        if not self._nodes:
+            return [[] for _ in range(len(queries))]
+
+        k = min(k, len(self._nodes))
+        ef = max(ef or self.ef_search, k)
+        return [self._search_one(query, k, ef) for query in queries]
+
+    def get(self, id_: str) -> np.ndarray:
+        """Return a copy of the (normalized) vector stored for id.
+
+        Raises:
+            KeyError: If id is not in the index.
+        """
+        return np.array(self._vectors[self._nodes[id_]])
+
+    def flush(self) -> None:
+        """Persist the graph if it changed since it was loaded or flushed."""
+        if not self._dirty:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        count = len(self._ids)
+        arrays = {
+            "vectors": self._vectors[:count],
+            "levels": self._levels[:count],
+            "links0": self._links0[:count],
+            "upper_offsets": self._upper_offsets[:count],
+            "upper_links": self._upper_links[: self._upper_count],
+        }
+        for name, array in arrays.items():
+            array_path = self.path / f"{name}.npy"
+            tmp_path = array_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, array_path)
+
+        meta = {
+            "dim": self.dim,
+            "M": self.M,
+            "entry": self._entry,
+            "max_level": self._max_level,
+            "ids": self._ids,
+        }
+        meta_path = self.path / self.META_FILE
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+        self._dirty = False
+
+    def close(self) -> None:
+        """Flush pending changes."""
+        self.flush()
+
+    def _load(self, meta: dict) -> None:
+        """Map the stored arrays copy-on-write and restore the id tables."""
+        if meta["dim"] != self.dim:
+            raise ValueError(
+                f"Index at {self.path} has dim {meta['dim']}, expected {self.dim}"
+            )
+        if meta["M"] != self.M:
+            raise ValueError(
+                f"Index at {self.path} was built with M={meta['M']}, got {self.M}"
+            )
+
+        for name in self.ARRAYS:
+            # Copy-on-write: pages load lazily, writes never touch the file
+            array = np.load(self.path / f"{name}.npy", mmap_mode="c")
+            setattr(self, f"_{name}", array)
+
+        self._ids = meta["ids"]
+        self._nodes = {id_: node for node, id_ in enumerate(self._ids) if id_}
+        self._entry = meta["entry"]
+        self._max_level = meta["max_level"]
+        self._upper_count = len(self._upper_links)
+
+    def _check_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[np.newaxis, :]
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected vectors of shape (n, {self.dim}), got {vectors.shape}"
+            )
+        return vectors
+
+    def _reserve(self, nodes: int) -> None:
+        """Grow the per-node arrays (doubling) to hold at least nodes nodes."""
+        capacity = len(self._vectors)
+        if nodes <= capacity:
+            return
+        capacity = max(capacity, self.INITIAL_CAPACITY)
+        while capacity < nodes:
+            capacity *= 2
+
+        self._vectors = _grown(self._vectors, capacity, 0.0)
+        self._levels = _grown(self._levels, capacity, 0)
+        self._links0 = _grown(self._links0, capacity, NO_LINK)
+        self._upper_offsets = _grown(self._upper_offsets, capacity, NO_LINK)
+
+    def _links(self, node: int, level: int) -> np.ndarray:
+        """Return the (writable) neighbour row of node on level."""
+        if level == 0:
+            return self._links0[node]
+        return self._upper_links[self._upper_offsets[node] + level - 1]
+
+    def _insert(self, node: int) -> None:
+        """Link an already stored vector into the graph."""
+        level = int(-math.log(1.0 - self._random.random()) * self._level_mult)
+        self._levels[node] = level
+        if level > 0:
+            needed = self._upper_count + level
+            if needed > len(self._upper_links):
+                capacity = max(len(self._upper_links), self.INITIAL_CAPACITY)
+                while capacity < needed:
+                    capacity *= 2
+                self._upper_links = _grown(self._upper_links, capacity, NO_LINK)
+            self._upper_offsets[node] = self._upper_count
+            self._upper_count = needed
+
+        if self._entry == NO_LINK:
+            self._entry, self._max_level = node, level
+            return
+
+        query = self._vectors[node]
+        entry = [self._entry]
+        for lvl in range(self._max_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+
+        for lvl in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(query, entry, self.ef_construction, lvl)
+            neighbors = self._select_neighbors(found, self.M)
+            links = self._links(node, lvl)
+            links[: len(neighbors)] = neighbors
+            max_links = self.M0 if lvl == 0 else self.M
+            for neighbor in neighbors:
+                self._connect(neighbor, node, lvl, max_links)
+            entry = [n for _, n in found]
+
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+
+    def _connect(self, node: int, new: int, level: int, max_links: int) -> None:
+        """Add a back link node -> new, pruning node's links if full."""
+        links = self._links(node, level)
+        current = [n for n in links.tolist() if n != NO_LINK]
+        if len(current) < max_links:
+            links[len(current)] = new
+            return
+
+        current.append(new)
+        distances = 1.0 - self._vectors[current] @ self._vectors[node]
+        candidates = sorted(zip(distances.tolist(), current))
+        kept = self._select_neighbors(candidates, max_links)
+        links[:] = NO_LINK
+        links[: len(kept)] = kept
+
+    def _select_neighbors(
+        self, candidates: list[tuple[float, int]], m: int
+    ) -> list[int]:
+        """Pick up to m diverse neighbours from candidates sorted by distance.
+
+        A candidate is skipped when it is closer to an already selected
+        neighbour than to the base node (the HNSW heuristic), which keeps
+        links spread over clusters. Slots left are filled with the closest
+        skipped candidates.
+        """
+        if len(candidates) <= m:
+            return [n for _, n in candidates]
+
+        nodes = [n for _, n in candidates]
+        distances = np.fromiter((d for d, _ in candidates), dtype=np.float32)
+        vectors = self._vectors[nodes]
+        blocked = np.zeros(len(nodes), dtype=bool)
+        selected: list[int] = []
+        for i in range(len(nodes)):
+            if blocked[i]:
+                continue
+            selected.append(i)
+            if len(selected) == m:
+                break
+            # Block every candidate closer to this neighbour than to the base
+            blocked |= 1.0 - vectors @ vectors[i] < distances
+
+        if len(selected) < m:
+            chosen = set(selected)
+            selected += [i for i in range(len(nodes)) if i not in chosen]
+        return [nodes[i] for i in selected[:m]]
+
+    def _search_layer(
+        self, query: np.ndarray, entry: list[int], ef: int, level: int
+    ) -> list[tuple[float, int]]:
+        """Best-first search of one layer.
+
+        Returns:
+            Up to ef (distance, node) pairs, closest first. Deleted nodes are
+            included; they still route the search.
+        """
+        vectors = self._vectors
+        visited = set(entry)
+        distances = (1.0 - vectors[entry] @ query).tolist()
+        candidates = list(zip(distances, entry))
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]  # Max-heap of the best ef
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        heappush, heapreplace = heapq.heappush, heapq.heapreplace
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if distance > -results[0][0]:
+                break
+            neighbors = [
+                n
+                for n in self._links(node, level).tolist()
+                if n != NO_LINK and n not in visited
+            ]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            distances = (1.0 - vectors[neighbors] @ query).tolist()
+            worst = -results[0][0]
+            for d, n in zip(distances, neighbors):
+                if d < worst or len(results) < ef:
+                    heappush(candidates, (d, n))
+                    if len(results) < ef:
+                        heappush(results, (-d, n))
+                    else:
+                        heapreplace(results, (-d, n))
+                    worst = -results[0][0]
+
+        return sorted((-d, n) for d, n in results)
+
+    def _search_one(self, query: np.ndarray, k: int, ef: int) -> list[SearchResult]:
+        entry = [self._entry]
+        for lvl in range(self._max_level, 0, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+
+        while True:
+            found = self._search_layer(query, entry, ef, 0)
+            hits = [
+                SearchResult(id=self._ids[n], score=1.0 - d)
+                for d, n in found
+                if self._ids[n] is not None
+            ]
+            # Deleted nodes can crowd live ones out of the beam: widen it
+            if len(hits) >= k or ef >= len(self._ids):
+                return hits[:k]
+            ef *= 2
+
+
+def _grown(array: np.ndarray, capacity: int, fill) -> np.ndarray:
+    """Return a copy of array with capacity rows, new rows set to fill."""
+    grown = np.full((capacity, *array.shape[1:]), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
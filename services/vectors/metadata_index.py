@@ -0,0 +1,199 @@
+"""Bitmap index of chunk metadata, for filtered vector search.
+
+Keeps one RoaringBitmap of row numbers per (field, value) pair: category,
+each tag, language and depth. A MetadataFilter is resolved by intersecting
+(and, for depth ranges, uniting) those bitmaps, so the vector index only
+scores the candidate rows instead of scanning everything and dropping the
+rows that do not match afterwards.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Sequence
+
+from .bitmap import RoaringBitmap
+
+Key = tuple[str, Any]  # (field, value)
+
+
+@dataclass(frozen=True, slots=True)
+class MetadataFilter:
+    """Conditions a row must all meet; unset conditions match anything.
+
+    Example:
+        >>> MetadataFilter(category="02-TECH-PACKS", tags=("python",), max_depth=2)
+    """
+
+    category: Optional[str] = None
+    tags: tuple[str, ...] = ()  # Every tag must be present
+    language: Optional[str] = None
+    min_depth: Optional[int] = None
+    max_depth: Optional[int] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the filter matches every row."""
+        return (
+            self.category is None
+            and not self.tags
+            and self.language is None
+            and self.min_depth is None
+            and self.max_depth is None
+        )
+
+
+def metadata_fields(metadata: Any) -> dict[str, Any]:
+    """Return the indexed fields of a DocumentMetadata (or similar object)."""
+    if isinstance(metadata, dict):
+        get = metadata.get
+    else:
+
+        def get(name: str) -> Any:
+            return getattr(metadata, name, None)
+
+    return {
+        "category": get("category"),
+        "tags": list(dict.fromkeys(get("tags") or ())),
+        "language": get("language"),
+        "depth": get("depth"),
+    }
+
+
+class MetadataIndex:
+    """Row bitmaps per category, tag, language and depth value.
+
+    Example:
+        >>> index = MetadataIndex()
+        >>> index.add_many([0, 1], [chunk.metadata for chunk in chunks])
+        >>> index.select(MetadataFilter(language="es")).to_array()
+        array([1], dtype=uint32)
+    """
+
+    def __init__(self) -> None:
+        self._bitmaps: dict[Key, RoaringBitmap] = {}
+        self._fields: dict[int, dict[str, Any]] = {}  # Row -> indexed fields
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, row: int) -> bool:
+        return row in self._fields
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the bitmaps."""
+        return sum(bitmap.nbytes for bitmap in self._bitmaps.values())
+
+    def values(self, field: str) -> dict[Any, int]:
+        """Return the indexed values of a field with their row counts."""
+        return {
+            value: len(bitmap)
+            for (name, value), bitmap in self._bitmaps.items()
+            if name == field
+        }
+
+    def fields(self, row: int) -> Optional[dict[str, Any]]:
+        """Return the indexed fields of a row, or None if it has none."""
+        return self._fields.get(row)
+
+    def add_many(self, rows: Sequence[int], metadata: Sequence[Any]) -> None:
+        """Index the metadata of rows, replacing what they had before.
+
+        Args:
+            rows: Row numbers in the vector index.
+            metadata: One DocumentMetadata (or dict with the same fields) per row.
+
+        Raises:
+            ValueError: If lengths differ.
+        """
+        if len(rows) != len(metadata):
+            raise ValueError(f"Got {len(rows)} rows for {len(metadata)} metadata")
+        self.remove_many(rows)
+
+        grouped: dict[Key, list[int]] = defaultdict(list)
+        for row, item in zip(rows, metadata):
+            row = int(row)
+            fields = metadata_fields(item)
+            self._fields[row] = fields
+            for key in _keys(fields):
+                grouped[key].append(row)
+
+        for key, key_rows in grouped.items():
+            added = RoaringBitmap.from_values(key_rows)
+            current = self._bitmaps.get(key)
+            self._bitmaps[key] = added if current is None else current | added
+
+    def remove_many(self, rows: Iterable[int]) -> None:
+        """Drop rows from every bitmap; rows without metadata are ignored."""
+        for row in rows:
+            fields = self._fields.pop(int(row), None)
+            if fields is None:
+                continue
+            for key in _keys(fields):
+                bitmap = self._bitmaps[key]
+                bitmap.discard(int(row))
+                if not bitmap:
+                    del self._bitmaps[key]
+
+    def select(self, where: MetadataFilter) -> Optional[RoaringBitmap]:
+        """Return the rows matching a filter.
+
+        Returns:
+            Matching rows, or None if the filter has no conditions (every
+            row matches, including rows indexed without metadata).
+        """
+        if where.is_empty:
+            return None
+
+        bitmaps = []
+        if where.category is not None:
+            bitmaps.append(self._bitmaps.get(("category", where.category)))
+        bitmaps.extend(self._bitmaps.get(("tags", tag)) for tag in where.tags)
+        if where.language is not None:
+            bitmaps.append(self._bitmaps.get(("language", where.language)))
+        if where.min_depth is not None or where.max_depth is not None:
+            bitmaps.append(self._depth_range(where.min_depth, where.max_depth))
+
+        if any(bitmap is None for bitmap in bitmaps):
+            return RoaringBitmap()
+        # Smallest first: each intersection is bounded by its smaller side
+        bitmaps.sort(key=len)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result
+
+    def state(self, rows: int) -> list[Optional[dict[str, Any]]]:
+        """Return the fields of rows 0..rows-1 (None where unindexed), for JSON."""
+        return [self._fields.get(row) for row in range(rows)]
+
+    @classmethod
+    def from_state(cls, state: Sequence[Optional[dict[str, Any]]]) -> MetadataIndex:
+        """Rebuild an index from state(), row i taking state[i]."""
+        index = cls()
+        rows = [row for row, fields in enumerate(state) if fields is not None]
+        index.add_many(rows, [state[row] for row in rows])
+        return index
+
+    def _depth_range(
+        self, low: Optional[int], high: Optional[int]
+    ) -> Optional[RoaringBitmap]:
+        result = None
+        for (name, depth), bitmap in self._bitmaps.items():
+            if name != "depth":
+                continue
+            if (low is None or depth >= low) and (high is None or depth <= high):
+                result = bitmap if result is None else result | bitmap
+        return result
+
+
+def _keys(fields: dict[str, Any]) -> list[Key]:
+    keys = [("tags", tag) for tag in fields["tags"]]
+    for name in ("category", "language", "depth"):
+        if fields[name] is not None:
+            keys.append((name, fields[name]))
+    return keys
@@ -0,0 +1,463 @@
+"""Quantized vector storage with exact re-scoring.
+
+Keeping every embedding as float32 in RAM costs 4 bytes per dimension per
+chunk. QuantizedIndex keeps only compact codes in memory and leaves the
+exact vectors in the memory-mapped file of FlatIndex, which it extends:
+
+1. Every live vector is scored against the query from its codes with
+   asymmetric distance computation (ADC): the query stays float32, only
+   the stored side is quantized.
+2. The best k * rescore candidates are re-scored with their exact vectors,
+   read from the mmap'd file, so only those pages are touched.
+
+Quantizers (trained on a sample of vectors, see QuantizedIndex.train):
+- ScalarQuantizer ("int8"): one byte per dimension, per-dimension range
+- ProductQuantizer ("pq"): one byte per sub-vector, k-means codebooks
+
+Storage: the FlatIndex files plus codes.npy and quantizer.npz.
+"""
+
+from __future__ import annotations
+
+import os
+import logging
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from .flat_index import FlatIndex, SearchResult, normalize_rows, top_k_rows
+from .metadata_index import MetadataFilter
+
+logger = logging.getLogger(__name__)
+
+# Rows converted at once while scoring: small enough for the block to stay
+# in cache, large enough to amortize the per-block overhead
+ADC_BLOCK_ROWS = 8192
+
+
+class ScalarQuantizer:
+    """Per-dimension 8-bit scalar quantization (4x smaller than float32).
+
+    Each dimension is mapped linearly from its trained [min, max] range onto
+    256 levels and stored as one unsigned byte.
+    """
+
+    kind = "int8"
+
+    def __init__(self, dim: int):
+        """Create an untrained quantizer.
+
+        Args:
+            dim: Vector dimension.
+        """
+        self.dim = dim
+        self.offset: Optional[np.ndarray] = None  # Per-dimension minimum
+        self.scale: Optional[np.ndarray] = None  # Per-dimension step
+
+    @property
+    def trained(self) -> bool:
+        return self.scale is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.dim
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the trained parameters."""
+        return 0 if not self.trained else self.offset.nbytes + self.scale.nbytes
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Learn the per-dimension ranges from a sample of vectors."""
+        low, high = vectors.min(axis=0), vectors.max(axis=0)
+        scale = (high - low) / 255.0
+        scale[scale == 0] = 1.0
+        self.offset = low.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return one uint8 code per dimension, shape (n, dim)."""
+        levels = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(levels, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the float32 approximation of encoded vectors."""
+        return codes.astype(np.float32) * self.scale + self.offset
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Return approximate dot products, shape (n_queries, n_codes).
+
+        query . decode(code) = code . (query * scale) + query . offset, so
+        the query is scaled once and codes are never fully decoded.
+        """
+        scaled = (queries * self.scale).T
+        bias = queries @ self.offset
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        buffer = np.empty((min(len(codes), ADC_BLOCK_ROWS), self.dim), np.float32)
+        for start in range(0, len(codes), ADC_BLOCK_ROWS):
+            block = codes[start : start + ADC_BLOCK_ROWS]
+            converted = buffer[: len(block)]
+            np.copyto(converted, block, casting="unsafe")
+            scores[:, start : start + len(block)] = (converted @ scaled).T
+        scores += bias[:, np.newaxis]
+        return scores
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Return the trained parameters, for saving."""
+        return {"offset": self.offset, "scale": self.scale}
+
+    @classmethod
+    def from_state(cls, dim: int, state: dict[str, np.ndarray]) -> ScalarQuantizer:
+        """Rebuild a trained quantizer from state()."""
+        quantizer = cls(dim)
+        quantizer.offset = state["offset"]
+        quantizer.scale = state["scale"]
+        return quantizer
+
+
+class ProductQuantizer:
+    """Product quantization: one byte per sub-vector.
+
+    Vectors are split into n_subvectors contiguous slices; each slice is
+    replaced by the index of its nearest centroid in a per-slice k-means
+    codebook. With dim=768 and 48 sub-vectors a vector takes 48 bytes
+    instead of 3072.
+    """
+
+    kind = "pq"
+    MAX_CENTROIDS = 256  # Codes are single bytes
+
+    def __init__(
+        self,
+        dim: int,
+        n_subvectors: int = 16,
+        n_centroids: int = MAX_CENTROIDS,
+        iterations: int = 20,
+        seed: int = 0,
+    ):
+        """Create an untrained quantizer.
+
+        Args:
+            dim: Vector dimension; must be divisible by n_subvectors.
+            n_subvectors: Slices per vector (bytes per code).
+            n_centroids: Codebook size per slice, at most 256.
+            iterations: k-means iterations when training.
+            seed: Seed of the k-means initialization.
+
+        Raises:
+            ValueError: If the parameters are inconsistent.
+        """
+        if n_subvectors < 1 or dim % n_subvectors:
+            raise ValueError(
+                f"dim ({dim}) must be divisible by n_subvectors ({n_subvectors})"
+            )
+        if not 1 <= n_centroids <= self.MAX_CENTROIDS:
+            raise ValueError(
+                f"n_centroids must be in [1, {self.MAX_CENTROIDS}], got {n_centroids}"
+            )
+
+        self.dim = dim
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.iterations = iterations
+        self.seed = seed
+        self.sub_dim = dim // n_subvectors
+        # (n_subvectors, n_centroids, sub_dim) once trained
+        self.centroids: Optional[np.ndarray] = None
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.n_subvectors
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the codebooks."""
+        return 0 if not self.trained else self.centroids.nbytes
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Run k-means on every slice of a sample of vectors."""
+        rng = np.random.default_rng(self.seed)
+        k = min(self.n_centroids, len(vectors))
+        self.centroids = np.stack(
+            [
+                _kmeans(subvectors, k, self.iterations, rng)
+                for subvectors in self._split(vectors)
+            ]
+        )
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return one uint8 centroid index per slice, shape (n, n_subvectors)."""
+        codes = np.empty((len(vectors), self.n_subvectors), dtype=np.uint8)
+        for j, subvectors in enumerate(self._split(vectors)):
+            codes[:, j] = _nearest(subvectors, self.centroids[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the float32 approximation of encoded vectors."""
+        parts = [self.centroids[j][codes[:, j]] for j in range(self.n_subvectors)]
+        return np.concatenate(parts, axis=1)
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Return approximate dot products, shape (n_queries, n_codes).
+
+        For each query a (n_subvectors, n_centroids) table of slice dot
+        products is computed once; a code's score is the sum of its table
+        entries.
+        """
+        sub_queries = queries.reshape(len(queries), self.n_subvectors, self.sub_dim)
+        tables = np.einsum("qmd,mkd->qmk", sub_queries, self.centroids)
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), ADC_BLOCK_ROWS):
+            block = codes[start : start + ADC_BLOCK_ROWS]
+            target = scores[:, start : start + len(block)]
+            for j in range(self.n_subvectors):
+                target += tables[:, j, block[:, j]]
+        return scores
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Return the trained codebooks, for saving."""
+        return {"centroids": self.centroids}
+
+    @classmethod
+    def from_state(cls, dim: int, state: dict[str, np.ndarray]) -> ProductQuantizer:
+        """Rebuild a trained quantizer from state()."""
+        n_subvectors, n_centroids, _ = state["centroids"].shape
+        quantizer = cls(dim, n_subvectors=n_subvectors, n_centroids=n_centroids)
+        quantizer.centroids = state["centroids"]
+        return quantizer
+
+    def _split(self, vectors: np.ndarray) -> list[np.ndarray]:
+        return np.split(np.asarray(vectors, dtype=np.float32), self.n_subvectors, 1)
+
+
+Quantizer = Union[ScalarQuantizer, ProductQuantizer]
+
+
+class QuantizedIndex(FlatIndex):
+    """FlatIndex that searches compact codes and re-scores exactly.
+
+    Example:
+        >>> index = QuantizedIndex(768, ProductQuantizer(768, n_subvectors=48))
+        >>> index.train(sample_embeddings)
+        >>> index.add(chunk_ids, embeddings)
+        >>> index.search(query_embeddings, k=5)
+        [[SearchResult(id='doc.md#1', score=0.83), ...]]
+    """
+
+    CODES_FILE = "codes.npy"
+    QUANTIZER_FILE = "quantizer.npz"
+    DEFAULT_RESCORE = 4  # Candidates re-scored per requested result
+
+    def __init__(
+        self,
+        dim: int,
+        quantizer: Optional[Quantizer] = None,
+        path: Optional[Path] = None,
+        rescore: int = DEFAULT_RESCORE,
+    ):
+        """Open (or create) an index.
+
+        Args:
+            dim: Embedding dimension.
+            quantizer: Quantizer for a new index. If None, uses a stored
+                quantizer, or a ScalarQuantizer for a new index.
+            path: Index directory. If None, uses DEFAULT_DIR.
+            rescore: Candidates re-scored with exact vectors per requested
+                result. 0 returns the approximate (ADC) ranking as is.
+
+        Raises:
+            ValueError: If rescore is negative, the quantizer dimension is
+                wrong, or a quantizer is given for an index that has one.
+        """
+        if rescore < 0:
+            raise ValueError(f"rescore must be >= 0, got {rescore}")
+        super().__init__(dim, path)
+        self.rescore = rescore
+
+        quantizer_path = self.path / self.QUANTIZER_FILE
+        if quantizer_path.exists():
+            if quantizer is not None:
+                raise ValueError(f"Index at {self.path} already has a quantizer")
+            with np.load(quantizer_path) as stored:
+                state = dict(stored)
+            quantizer = _QUANTIZERS[str(state.pop("kind"))].from_state(dim, state)
+        elif quantizer is None:
+            quantizer = ScalarQuantizer(dim)
+        if quantizer.dim != dim:
+            raise ValueError(f"Quantizer has dim {quantizer.dim}, expected {dim}")
+        self.quantizer = quantizer
+
+        codes_path = self.path / self.CODES_FILE
+        if codes_path.exists():
+            self._codes = np.load(codes_path)
+        else:
+            self._codes = np.zeros((0, quantizer.code_size), dtype=np.uint8)
+
+    @property
+    def memory_bytes(self) -> int:
+        """RAM used by codes and quantizer (exact vectors stay mmap'd)."""
+        return len(self._ids) * self.quantizer.code_size + self.quantizer.nbytes
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Train the quantizer on a representative sample and re-encode.
+
+        Vectors already in the index are re-encoded from their exact copies,
+        so the quantizer can be retrained as the corpus grows.
+
+        Raises:
+            ValueError: If vectors have the wrong shape.
+        """
+        self.quantizer.train(normalize_rows(self._check_vectors(vectors)))
+        count = len(self._ids)
+        self._codes = np.zeros((count, self.quantizer.code_size), dtype=np.uint8)
+        for start in range(0, count, ADC_BLOCK_ROWS):
+            rows = self._matrix[start : min(start + ADC_BLOCK_ROWS, count)]
+            self._codes[start : start + len(rows)] = self.quantizer.encode(rows)
+        logger.info(
+            f"Trained {self.quantizer.kind} quantizer on {len(vectors)} vectors"
+        )
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[object]] = None,
+    ) -> None:
+        """Insert vectors (exact copy on disk, codes in memory).
+
+        Raises:
+            ValueError: If the quantizer is not trained, or see FlatIndex.add.
+        """
+        if not self.quantizer.trained:
+            raise ValueError("Quantizer is not trained; call train() first")
+        super().add(ids, vectors, metadata)
+
+        if len(self._codes) < len(self._ids):
+            codes = np.zeros((self._capacity, self.quantizer.code_size), np.uint8)
+            codes[: len(self._codes)] = self._codes
+            self._codes = codes
+        rows = np.fromiter((self._rows[id_] for id_ in ids), dtype=np.int64)
+        self._codes[rows] = self.quantizer.encode(self._matrix[rows])
+
+    def compact(self) -> None:
+        """Move live rows (vectors and codes) to the front."""
+        live = [row for row, id_ in enumerate(self._ids) if id_ is not None]
+        if len(live) < len(self._ids):
+            self._codes = self._codes[np.asarray(live, dtype=np.int64)]
+        super().compact()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        where: Optional[MetadataFilter] = None,
+        rescore: Optional[int] = None,
+    ) -> list[list[SearchResult]]:
+        """Return the k most similar vectors for each query.
+
+        Args:
+            queries: Array of shape (dim,) or (n_queries, dim).
+            k: Results per query.
+            where: Only return vectors whose metadata matches. Only the
+                codes of matching rows are scored.
+            rescore: Overrides the index's rescore factor for this call.
+
+        Returns:
+            One list of results per query, best first. Scores are exact
+            cosine similarities unless rescore is 0.
+
+        Raises:
+            ValueError: If k is lower than 1 or queries have the wrong shape.
+        """
+        if k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        queries = normalize_rows(self._check_vectors(queries))
+        filtered = self._candidates(where)
+        if not self._rows or (filtered is not None and not len(filtered)):
+            return [[] for _ in range(len(queries))]
+
+        rescore = self.rescore if rescore is None else rescore
+        if self._gather(filtered):
+            live = len(filtered)
+            scores = self.quantizer.scores(queries, self._codes[filtered])
+        else:
+            scores = self.quantizer.scores(queries, self._codes[: len(self._ids)])
+            live = self._mask_rows(scores, filtered)
+            filtered = None  # Scores are indexed by row already
+        k = min(k, live)
+        if not rescore:
+            top, top_scores = top_k_rows(scores, k)
+            if filtered is not None:
+                top = filtered[top]
+            return [
+                self._results(rows, row_scores)
+                for rows, row_scores in zip(top.tolist(), top_scores.tolist())
+            ]
+
+        candidates, _ = top_k_rows(scores, min(k * rescore, live))
+        if filtered is not None:
+            candidates = filtered[candidates]
+        results = []
+        for query, rows in zip(queries, candidates):
+            rows = np.sort(rows)  # Sequential reads of the mapped file
+            exact = self._matrix[rows] @ query
+            top, top_scores = top_k_rows(exact[np.newaxis, :], k)
+            results.append(
+                self._results(rows[top[0]].tolist(), top_scores[0].tolist())
+            )
+        return results
+
+    def flush(self) -> None:
+        """Persist vectors, metadata, codes and the quantizer."""
+        super().flush()
+        codes_path = self.path / self.CODES_FILE
+        tmp_path = codes_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, self._codes[: len(self._ids)])
+        os.replace(tmp_path, codes_path)
+
+        if self.quantizer.trained:
+            quantizer_path = self.path / self.QUANTIZER_FILE
+            tmp_path = quantizer_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, kind=self.quantizer.kind, **self.quantizer.state())
+            os.replace(tmp_path, quantizer_path)
+
+
+_QUANTIZERS = {
+    ScalarQuantizer.kind: ScalarQuantizer,
+    ProductQuantizer.kind: ProductQuantizer,
+}
+
+
+def _kmeans(
+    points: np.ndarray, k: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Return k centroids of points (Lloyd's algorithm, random init)."""
+    centroids = points[rng.choice(len(points), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest(points, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, np.newaxis]
+        # Re-seed empty clusters on random points
+        centroids[empty] = points[rng.choice(len(points), empty.sum())]
+    return centroids
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the closest centroid (L2) of every point."""
+    distances = (
+        np.einsum("kd,kd->k", centroids, centroids)[np.newaxis, :]
+        - 2.0 * points @ centroids.T
+    )
+    return distances.argmin(axis=1)
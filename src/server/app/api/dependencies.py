@@ -2,9 +2,21 @@
 Shared dependencies for API endpoints.
 """
 
+import logging
+from functools import lru_cache
+
+import httpx
 from fastapi import HTTPException, status
 
+from ..core.config import settings
 from ..core.security import TokenValidator
+from ..domain.services.chat_service import ChatService
+from ..domain.services.hybrid_search import HybridSearchService
+from ..infrastructure.llm import OllamaClient
+from ..infrastructure.search import BM25Index, ChunkStore
+from ..infrastructure.vector_store import ChromaHttpClient, ChromaVectorSearcher
+
+logger = logging.getLogger(__name__)
 
 
 async def verify_api_key(x_api_key: str | None = None) -> str:
@@ -27,3 +39,90 @@ async def verify_api_key(x_api_key: str | None = None) -> str:
             headers={"WWW-Authenticate": "Bearer"},
         )
     return x_api_key
+
+
+@lru_cache
+def get_bm25_index() -> BM25Index:
+    """
+    Return the process-wide BM25 index of the knowledge base chunks.
+
+    Filled at startup by load_knowledge_base.
+
+    Returns:
+        BM25Index: Shared keyword index
+    """
+    return BM25Index()
+
+
+@lru_cache
+def get_search_service() -> HybridSearchService:
+    """
+    Return the process-wide knowledge base search service.
+
+    Fuses the BM25 index with vector search over the ChromaDB collection
+    (queries embedded by Ollama); while either service is unreachable,
+    results are keyword-only.
+
+    Returns:
+        HybridSearchService: Shared search service
+    """
+    vector = ChromaVectorSearcher(
+        ChromaHttpClient(), OllamaClient(), settings.CHROMA_COLLECTION_NAME
+    )
+    return HybridSearchService(lexical=get_bm25_index(), vector=vector)
+
+
+@lru_cache
+def get_chunk_store() -> ChunkStore:
+    """
+    Return the process-wide store of chunk texts.
+
+    Filled at startup alongside the BM25 index, so every chunk the search
+    can return has its text available for the chat context.
+
+    Returns:
+        ChunkStore: Shared chunk store
+    """
+    return ChunkStore()
+
+
+async def load_knowledge_base(chroma: ChromaHttpClient | None = None) -> int:
+    """
+    Fill the BM25 index and the chunk store from the ChromaDB collection.
+
+    The collection is what the ingestion pipeline writes (chunk texts,
+    metadata and embeddings; services.rag.chroma_ingestion at the
+    repository root), so the server indexes exactly the chunks vector
+    search can return. If ChromaDB is unreachable or the
+    collection does not exist yet, the server starts with an empty index.
+
+    Args:
+        chroma: ChromaDB client (default: the pooled one)
+
+    Returns:
+        int: Number of chunks loaded
+    """
+    chroma = chroma or ChromaHttpClient()
+    index, store = get_bm25_index(), get_chunk_store()
+    count = 0
+    try:
+        async for chunk in chroma.iter_chunks(settings.CHROMA_COLLECTION_NAME):
+            index.add(chunk.chunk_id, chunk.content, chunk.metadata)
+            store.add(chunk.chunk_id, chunk.content)
+            count += 1
+    except httpx.HTTPError as exc:
+        logger.warning(f"Knowledge base not loaded from ChromaDB: {exc}")
+    return count
+
+
+@lru_cache
+def get_chat_service() -> ChatService:
+    """
+    Return the process-wide chat service.
+
+    Returns:
+        ChatService: Knowledge base search + Ollama streaming chat
+    """
+    return ChatService(
+        search=get_search_service(), llm=OllamaClient(), chunks=get_chunk_store()
+    )
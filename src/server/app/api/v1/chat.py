@@ -1,17 +1,140 @@
 """
-Placeholder for chat endpoint.
-Will be implemented in next phase.
+Chat endpoint: knowledge base answers streamed as Server-Sent Events.
+
+Endpoints:
+    - POST /api/v1/chat/message: Answer a message, streamed token by token
+    - GET /api/v1/chat/metrics: Streaming counters, TTFT, tokens/s and
+      coalescing hit ratios
+
+The context is retrieved and the prompt assembled before the response
+starts, so a bad message or filter is a plain 400 and the stream begins
+with the reply itself. The stream is a text/event-stream of:
+
+    event: context
+    data: {"sources": ["01-BASE/ARCH.md#3", ...]}
+
+    event: token
+    data: {"text": "Hex"}
+
+    event: done
+    data: {"tokens": 42, "retrieval_ms": 3.1, "ttft_ms": 180.4,
+           "tokens_per_second": 38.2}
+
+or, if the model fails mid-reply, a final "error" event with a detail.
+When the client disconnects, the model generation is cancelled (unless
+other clients asking the same question at the same time still follow it:
+concurrent identical messages share one retrieval and one generation).
+
+Request Models:
+    ChatRequest: Message and optional metadata filter
 """
 
-from fastapi import APIRouter
+import json
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ...core.security import InputSanitizer
+from ...domain.services.chat_service import ChatPrompt, ChatService, ChatStreamStats
+from ...domain.services.hybrid_search import parse_search_filter
+from ..dependencies import get_chat_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["chat"])
 
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+class ChatRequest(BaseModel):
+    """
+    Chat message request model.
+
+    Attributes:
+        message: User message
+        filter: Metadata filter for the context (see /knowledge/search)
+    """
+
+    message: str = Field(..., min_length=1, max_length=5000)
+    filter: str | None = Field(None, max_length=500)
+
+
+def _event(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def _sse_events(service: ChatService, prompt: ChatPrompt) -> AsyncIterator[bytes]:
+    stats = ChatStreamStats()
+    yield _event("context", {"sources": prompt.sources})
+    try:
+        async for token in service.stream(prompt, stats):
+            yield _event("token", {"text": token})
+    except Exception as exc:
+        logger.error(f"Chat stream failed: {exc}")
+        yield _event("error", {"detail": "Model stream failed"})
+        return
+    yield _event(
+        "done",
+        {
+            "tokens": stats.tokens,
+            "retrieval_ms": round(1000 * prompt.retrieval_seconds, 2),
+            "ttft_ms": None if stats.ttft is None else round(1000 * stats.ttft, 2),
+            "tokens_per_second": stats.tokens_per_second,
+        },
+    )
+
 
 @router.post("/chat/message")
-async def send_chat_message():
+async def send_chat_message(
+    request: ChatRequest,
+    service: ChatService = Depends(get_chat_service),
+) -> StreamingResponse:
+    """
+    Answer a chat message from the knowledge base, streamed as SSE.
+
+    Args:
+        request: Message and optional filter
+        service: Chat service (injected)
+
+    Returns:
+        StreamingResponse: text/event-stream of context, token and done events
+
+    HTTP Status:
+        200 OK: Stream started
+        400 Bad Request: Blank or unsafe message, or invalid filter
+        422 Unprocessable Entity: Missing or oversized fields
     """
-    Send a message to the chat endpoint.
-    Implementation: Phase 2
+    message = InputSanitizer.sanitize_prompt(request.message)
+    filters = parse_search_filter(request.filter or "")
+    prompt = await service.prepare(message, filters)
+    return StreamingResponse(
+        _sse_events(service, prompt),
+        media_type=SSE_MEDIA_TYPE,
+        # No proxy buffering: each event must reach the client when sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/chat/metrics")
+async def chat_metrics(
+    service: ChatService = Depends(get_chat_service),
+) -> dict[str, Any]:
+    """
+    Report chat streaming metrics.
+
+    Returns:
+        dict: Stream counters, TTFT p50/p95 (ms), mean tokens/s, and under
+            "coalescing" the calls, coalesced calls and hit ratio of the
+            retrieval and generation single-flight layers
     """
-    return {"message": "Chat endpoint not yet implemented"}
+    return {
+        **service.metrics.snapshot(),
+        "coalescing": {
+            "retrieval": service.search.flights.stats.snapshot(),
+            "generation": service.replies.stats.snapshot(),
+        },
+    }
@@ -11,6 +11,7 @@ SoftArchitect AI backend. These endpoints are used for:
 Endpoints:
     - GET /api/v1/system/health: Simple health check
     - GET /api/v1/system/health/detailed: Extended health with service status
+    - GET /api/v1/system/http-pool: Connection pool metrics per upstream host
 
 Response Models:
     HealthResponse: Basic health status with version information
@@ -19,6 +20,8 @@ Response Models:
 from fastapi import APIRouter, status
 from pydantic import BaseModel
 
+from ...infrastructure.external import get_http_pool
+
 router = APIRouter(tags=["health"])
 
 
@@ -80,3 +83,33 @@ async def health_check() -> HealthResponse:
         message="SoftArchitect AI backend is running",
         version="0.1.0",
     )
+
+
+@router.get(
+    "/http-pool",
+    status_code=status.HTTP_200_OK,
+    summary="HTTP Pool Metrics",
+    description="Connection pool metrics of the Ollama and ChromaDB clients.",
+)
+async def http_pool_metrics() -> dict[str, dict[str, int | float | None]]:
+    """
+    Report connection pool metrics per upstream host.
+
+    Use under load to size HTTP_MAX_CONNECTIONS_PER_HOST: a sustained
+    "waiting" count or peak_in_use at the limit means requests queue for a
+    connection; a low reuse_ratio means connections are not kept alive
+    between requests (HTTP_KEEPALIVE_EXPIRY too short, or no steady load).
+
+    Returns:
+        dict: Origin -> requests, new_connections, reuse_ratio, in_use,
+            waiting, peak_in_use, peak_waiting
+
+    Example Response:
+        {
+            "http://ollama:11434/": {
+                "requests": 120, "new_connections": 4, "reuse_ratio": 0.967,
+                "in_use": 2, "waiting": 0, "peak_in_use": 4, "peak_waiting": 1
+            }
+        }
+    """
+    return get_http_pool().metrics()
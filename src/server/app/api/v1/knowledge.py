@@ -1,17 +1,160 @@
 """
-Placeholder for knowledge base endpoint.
-Will be implemented in next phase.
+Knowledge base search endpoint.
+
+Hybrid retrieval over the indexed knowledge base chunks: BM25 keyword
+ranking fused with vector search through reciprocal rank fusion (see
+app.domain.services.hybrid_search).
+
+Endpoints:
+    - GET /api/v1/knowledge/search?q=...&k=10&filter=...&cursor=...: One
+      page of ranked chunk ids
+
+Filter syntax (all clauses must hold, see parse_search_filter):
+    category:02-TECH-PACKS tag:python lang:es depth<=3
+
+Pagination:
+    Each page carries an opaque next_cursor; pass it back with the same q
+    and filter to get the next page. Later pages are sliced from the
+    ranking computed for the first one instead of searching again.
+
+Response formats (by Accept header):
+    - application/json (default): SearchResponse
+    - application/x-ndjson: one JSON hit per line, written as soon as it is
+      serialized, then a final {"next_cursor": ...} line. The page is ranked
+      before the first line (fusion needs both complete rankings); cursor
+      pages slice the cached ranking, so their first line follows at once.
+
+Every response has a Server-Timing header with the retrieval, filter,
+fusion and (JSON only, as headers precede a streamed body) serialize
+stages in milliseconds.
+
+Response Models:
+    SearchResponse: Query echo, ranked hits and the next page cursor
 """
 
-from fastapi import APIRouter
+import json
+from collections.abc import Iterator
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from ...core.timing import ServerTiming
+from ...domain.entities import SearchHit
+from ...domain.services.hybrid_search import (
+    HybridSearchService,
+    parse_search_filter,
+)
+from ..dependencies import get_search_service
 
 router = APIRouter(tags=["knowledge"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class SearchHitResponse(BaseModel):
+    """
+    One ranked chunk.
 
-@router.get("/knowledge/search")
-async def search_knowledge():
+    Attributes:
+        chunk_id: Chunk identifier ("<relative path>#<chunk index>")
+        score: Reciprocal rank fusion score
+        lexical_rank: Rank in the BM25 results, if present there
+        vector_rank: Rank in the vector results, if present there
     """
-    Search the knowledge base.
-    Implementation: Phase 2
+
+    chunk_id: str
+    score: float
+    lexical_rank: int | None = None
+    vector_rank: int | None = None
+
+
+class SearchResponse(BaseModel):
     """
-    return {"message": "Knowledge search not yet implemented"}
+    Knowledge search response model.
+
+    Attributes:
+        query: The query as received
+        results: Hits of this page, best first
+        next_cursor: Cursor of the next page, or None on the last page
+    """
+
+    query: str
+    results: list[SearchHitResponse]
+    next_cursor: str | None = None
+
+
+def _hit_response(hit: SearchHit) -> SearchHitResponse:
+    return SearchHitResponse(
+        chunk_id=hit.chunk_id,
+        score=hit.score,
+        lexical_rank=hit.lexical_rank,
+        vector_rank=hit.vector_rank,
+    )
+
+
+def _ndjson_lines(hits: list[SearchHit], next_cursor: str | None) -> Iterator[bytes]:
+    for hit in hits:
+        yield _hit_response(hit).model_dump_json().encode() + b"\n"
+    yield json.dumps({"next_cursor": next_cursor}).encode() + b"\n"
+
+
+@router.get("/knowledge/search", response_model=SearchResponse)
+async def search_knowledge(
+    q: str = Query(..., min_length=1, max_length=1000, description="Search query"),
+    k: int = Query(10, ge=1, le=100, description="Results per page"),
+    filter_expression: str | None = Query(
+        None,
+        alias="filter",
+        max_length=500,
+        description="Metadata filter, e.g. 'category:02-TECH-PACKS lang:es depth<=3'",
+    ),
+    cursor: str | None = Query(
+        None, max_length=200, description="next_cursor of the previous page"
+    ),
+    accept: str | None = Header(None),
+    service: HybridSearchService = Depends(get_search_service),
+) -> Response:
+    """
+    Search the knowledge base, one page at a time.
+
+    Args:
+        q: Free-text query; exact terms such as "HU-2.1" are matched by BM25
+        k: Results per page
+        filter_expression: Metadata filter ("filter" query parameter)
+        cursor: Cursor of the page to return; None for the first page
+        accept: Accept header; application/x-ndjson streams the hits
+        service: Hybrid search service (injected)
+
+    Returns:
+        Response: SearchResponse as JSON, or NDJSON lines
+
+    HTTP Status:
+        200 OK: Search ran (results may be empty)
+        400 Bad Request: Blank query, invalid filter or invalid cursor
+        422 Unprocessable Entity: Missing or out-of-range parameters
+    """
+    timing = ServerTiming()
+    with timing.activate():
+        with timing.measure("filter"):
+            filters = parse_search_filter(filter_expression or "")
+        page = await service.search_page(q, k, filters, cursor or None)
+
+    if accept is not None and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            _ndjson_lines(page.hits, page.next_cursor),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Server-Timing": timing.header},
+        )
+
+    with timing.measure("serialize"):
+        body = SearchResponse(
+            query=q,
+            results=[_hit_response(hit) for hit in page.hits],
+            next_cursor=page.next_cursor,
+        ).model_dump_json()
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Server-Timing": timing.header},
+    )
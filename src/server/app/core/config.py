@@ -6,8 +6,9 @@ All environment variables are read from .env file with sensible defaults.
 
 Configuration Categories:
     - App Configuration: APP_NAME, APP_VERSION, DEBUG, API_V1_STR
-    - LLM Configuration: LLM_PROVIDER, OLLAMA_BASE_URL, GROQ_API_KEY
-    - Vector Store: CHROMADB_PATH, CHROMA_COLLECTION_NAME
+    - LLM Configuration: LLM_PROVIDER, OLLAMA_BASE_URL, OLLAMA_MODEL, GROQ_API_KEY
+    - Vector Store: CHROMADB_PATH, CHROMADB_HOST, CHROMADB_PORT, CHROMA_COLLECTION_NAME
+    - HTTP Pool: HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_KEEPALIVE_EXPIRY, HTTP_*_TIMEOUT
     - Logging: LOG_LEVEL
 
 Environment Variables (.env file):
@@ -17,9 +18,18 @@ Environment Variables (.env file):
     API_V1_STR (str): API v1 prefix (default: "/api/v1")
     LLM_PROVIDER (str): Either "local" (Ollama) or "cloud" (Groq)
     OLLAMA_BASE_URL (str): Ollama server URL (default: http://localhost:11434)
+    OLLAMA_MODEL (str): Ollama chat model (default: llama3.2:latest)
+    OLLAMA_EMBED_MODEL (str): Ollama query embedding model (default: nomic-embed-text)
     GROQ_API_KEY (str): Groq API key for cloud inference (default: empty)
     CHROMADB_PATH (str): Local ChromaDB storage path (default: ./data/chromadb)
+    CHROMADB_HOST (str): ChromaDB server host (default: localhost)
+    CHROMADB_PORT (int): ChromaDB server port (default: 8000)
     CHROMA_COLLECTION_NAME (str): Vector collection name (default: softarchitect)
+    HTTP_MAX_CONNECTIONS_PER_HOST (int): Pooled connections per upstream (default: 10)
+    HTTP_KEEPALIVE_EXPIRY (float): Seconds idle connections are kept (default: 30)
+    HTTP_CONNECT_TIMEOUT (float): Seconds to open a connection (default: 5)
+    HTTP_READ_TIMEOUT (float): Seconds between two received chunks (default: 120)
+    HTTP_POOL_TIMEOUT (float): Seconds to wait for a free connection (default: 10)
     LOG_LEVEL (str): Logging level - DEBUG, INFO, WARNING, ERROR (default: INFO)
 
 Security Notes:
@@ -49,11 +59,23 @@ class Settings(BaseSettings):
 
         LLM_PROVIDER: Which LLM backend to use ("local" or "cloud")
         OLLAMA_BASE_URL: HTTP URL to Ollama server for local inference
+        OLLAMA_MODEL: Model used for chat completions on Ollama
+        OLLAMA_EMBED_MODEL: Model embedding search queries (must match the
+            model that embedded the ChromaDB collection, the root
+            OLLAMA_EMBED_MODEL setting)
         GROQ_API_KEY: API key for Groq Cloud (if using cloud provider)
 
         CHROMADB_PATH: Filesystem path where ChromaDB stores vector embeddings
+        CHROMADB_HOST: Host of the ChromaDB server (Docker Compose service)
+        CHROMADB_PORT: Port of the ChromaDB server
         CHROMA_COLLECTION_NAME: Name of the vector collection in ChromaDB
 
+        HTTP_MAX_CONNECTIONS_PER_HOST: Connection limit per upstream service
+        HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept for reuse
+        HTTP_CONNECT_TIMEOUT: Deadline for opening a connection (fail fast)
+        HTTP_READ_TIMEOUT: Deadline between two reads (long: model loading)
+        HTTP_POOL_TIMEOUT: Deadline for a free connection when at the limit
+
         LOG_LEVEL: Verbosity for application logging (DEBUG, INFO, WARNING, ERROR)
     """
 
@@ -66,12 +88,23 @@ class Settings(BaseSettings):
     # LLM Configuration
     LLM_PROVIDER: Literal["local", "cloud"] = "local"
     OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "llama3.2:latest"
+    OLLAMA_EMBED_MODEL: str = "nomic-embed-text"
     GROQ_API_KEY: str = ""
 
     # Vector Store Configuration
     CHROMADB_PATH: str = "./data/chromadb"
+    CHROMADB_HOST: str = "localhost"
+    CHROMADB_PORT: int = 8000
     CHROMA_COLLECTION_NAME: str = "softarchitect"
 
+    # HTTP Client Pool (Ollama, ChromaDB)
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 120.0
+    HTTP_POOL_TIMEOUT: float = 10.0
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -0,0 +1,75 @@
+"""
+Per-request stage timings, reported in a Server-Timing header.
+
+An endpoint activates a ServerTiming for the request it handles; code in
+lower layers records stages with measure() without the timing object being
+passed down (it lives in a context variable, so concurrent requests do not
+mix). Outside an active request, measure() does nothing.
+
+Header format (W3C Server Timing), durations in milliseconds:
+    Server-Timing: retrieval;dur=3.41, filter;dur=0.12, serialize;dur=0.08
+
+Stages may nest (e.g. filter runs inside retrieval); each duration is the
+wall time of its own stage.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import ContextManager
+
+_current: ContextVar["ServerTiming | None"] = ContextVar("server_timing", default=None)
+
+
+class ServerTiming:
+    """
+    Named stage durations of one request.
+
+    Attributes:
+        durations: Seconds per stage, in the order stages first ran
+    """
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def activate(self) -> Iterator["ServerTiming"]:
+        """Make this the timing that measure() records into."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Add the wall time of the enclosed block to stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[stage] = self.durations.get(stage, 0.0) + elapsed
+
+    @property
+    def header(self) -> str:
+        """Server-Timing header value."""
+        return ", ".join(
+            f"{stage};dur={1000 * seconds:.2f}"
+            for stage, seconds in self.durations.items()
+        )
+
+
+def measure(stage: str) -> ContextManager[None]:
+    """
+    Time a stage of the current request, if one is being timed.
+
+    Args:
+        stage: Stage name (a Server-Timing metric name, no spaces)
+
+    Returns:
+        ContextManager: Context manager timing the enclosed block
+    """
+    timing = _current.get()
+    return nullcontext() if timing is None else timing.measure(stage)
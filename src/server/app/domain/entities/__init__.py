@@ -61,3 +61,81 @@ class ChatSession:
         self.messages = messages or []
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
+
+
+class SearchHit:
+    """
+    Represents one knowledge base chunk returned by a search.
+
+    Attributes:
+        chunk_id: Chunk identifier ("<relative path>#<chunk index>")
+        score: Fused relevance score (higher is better)
+        lexical_rank: 1-based rank in the BM25 results, if present there
+        vector_rank: 1-based rank in the vector results, if present there
+    """
+
+    def __init__(
+        self,
+        chunk_id: str,
+        score: float,
+        lexical_rank: int | None = None,
+        vector_rank: int | None = None,
+    ):
+        self.chunk_id = chunk_id
+        self.score = score
+        self.lexical_rank = lexical_rank
+        self.vector_rank = vector_rank
+
+
+class SearchFilter:
+    """
+    Metadata conditions a chunk must all meet to be searched.
+
+    Unset conditions match anything.
+
+    Attributes:
+        category: Top-level knowledge base folder (e.g. "02-TECH-PACKS")
+        tags: Tags that must all be present
+        language: Document language code (e.g. "es")
+        min_depth: Minimum folder depth, inclusive
+        max_depth: Maximum folder depth, inclusive
+    """
+
+    def __init__(
+        self,
+        category: str | None = None,
+        tags: list[str] | None = None,
+        language: str | None = None,
+        min_depth: int | None = None,
+        max_depth: int | None = None,
+    ):
+        self.category = category
+        self.tags = tags or []
+        self.language = language
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the filter matches every chunk."""
+        return (
+            self.category is None
+            and not self.tags
+            and self.language is None
+            and self.min_depth is None
+            and self.max_depth is None
+        )
+
+
+class SearchPage:
+    """
+    One page of a ranked knowledge base search.
+
+    Attributes:
+        hits: Hits of this page, best first
+        next_cursor: Opaque cursor of the next page, or None on the last page
+    """
+
+    def __init__(self, hits: list[SearchHit], next_cursor: str | None = None):
+        self.hits = hits
+        self.next_cursor = next_cursor
@@ -0,0 +1,279 @@
+"""
+Retrieval-augmented chat with streamed replies.
+
+A chat turn runs in two phases:
+    1. prepare(): search the knowledge base and assemble the prompt
+       (instructions, retrieved chunks, user message). The endpoint awaits
+       it before sending anything, so retrieval errors are plain HTTP
+       errors and the first byte on the wire is already part of the reply.
+    2. stream(): relay the model's reply piece by piece as it is generated,
+       timing the first token (TTFT) and the generation speed.
+
+When the consumer stops early (client disconnect cancels the response
+task), stream() closes the model stream, which cancels the generation
+upstream instead of letting it run to the end for nobody.
+
+Concurrent identical messages (same text up to case and whitespace, same
+filter, same model) share one generation: the first starts it, the others
+subscribe to its token stream (see single_flight.FanOut), and it is only
+cancelled when all of them have gone.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Protocol
+
+from app.domain.entities import SearchFilter
+from app.domain.services.hybrid_search import HybridSearchService, query_key
+from app.domain.services.single_flight import FanOut
+
+SYSTEM_PROMPT = (
+    "You are SoftArchitect AI, an assistant for software architecture "
+    "decisions. Answer from the knowledge base excerpts below and cite the "
+    "ids of the excerpts you use in square brackets. If the excerpts do not "
+    "cover the question, say so before answering from general knowledge."
+)
+
+
+class ChatModel(Protocol):
+    """Streaming LLM, e.g. app.infrastructure.llm.OllamaClient."""
+
+    model: str
+
+    def stream_chat(
+        self, messages: list[dict[str, str]], model: str | None = None
+    ) -> AsyncIterator[str]: ...
+
+
+class ChunkSource(Protocol):
+    """Chunk texts by id, e.g. app.infrastructure.search.ChunkStore."""
+
+    def get(self, chunk_id: str) -> str | None: ...
+
+
+class ChatPrompt:
+    """
+    Messages ready to send to the model.
+
+    Attributes:
+        messages: Conversation as {"role": ..., "content": ...} dicts
+        sources: Ids of the chunks included as context, best first
+        retrieval_seconds: Time spent searching and assembling the context
+        key: Identity of the request; equal keys share one generation
+    """
+
+    def __init__(
+        self,
+        messages: list[dict[str, str]],
+        sources: list[str],
+        retrieval_seconds: float = 0.0,
+        key: str | None = None,
+    ):
+        self.messages = messages
+        self.sources = sources
+        self.retrieval_seconds = retrieval_seconds
+        self.key = key
+
+
+class ChatStreamStats:
+    """
+    Timings of one streamed reply.
+
+    Attributes:
+        tokens: Pieces received (Ollama streams about one token per piece)
+        ttft: Seconds from the model request to the first piece, if any
+        duration: Seconds from the model request to the end of the stream
+    """
+
+    def __init__(self) -> None:
+        self.tokens = 0
+        self.ttft: float | None = None
+        self.duration = 0.0
+        self._start = time.perf_counter()
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Generation speed after the first token, if measurable."""
+        if self.ttft is None or self.tokens < 2 or self.duration <= self.ttft:
+            return None
+        return (self.tokens - 1) / (self.duration - self.ttft)
+
+    def record_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+        self.tokens += 1
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+
+class ChatMetrics:
+    """
+    Aggregated streaming metrics, over the last WINDOW finished streams.
+
+    Attributes:
+        streams: Streams started
+        completed: Streams that reached the end of the reply
+        cancelled: Streams abandoned by the client
+        failed: Streams that ended with an upstream error
+    """
+
+    WINDOW = 1000
+
+    def __init__(self) -> None:
+        self.streams = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self._ttft: deque[float] = deque(maxlen=self.WINDOW)
+        self._rates: deque[float] = deque(maxlen=self.WINDOW)
+
+    def record(self, stats: ChatStreamStats, outcome: str) -> None:
+        """Count a finished stream ("completed", "cancelled" or "failed")."""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        if stats.ttft is not None:
+            self._ttft.append(stats.ttft)
+        if stats.tokens_per_second is not None:
+            self._rates.append(stats.tokens_per_second)
+
+    def snapshot(self) -> dict[str, int | float | None]:
+        """
+        Current counters and recent latency figures.
+
+        Returns:
+            dict: Counters, TTFT p50/p95 in ms and mean tokens/s (None
+                until a stream has produced them)
+        """
+        ttft = sorted(self._ttft)
+        p50 = p95 = rate = None
+        if ttft:
+            p50 = 1000 * statistics.median(ttft)
+            p95 = 1000 * ttft[int(0.95 * (len(ttft) - 1))]
+        if self._rates:
+            rate = statistics.fmean(self._rates)
+        return {
+            "streams": self.streams,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "ttft_p50_ms": p50,
+            "ttft_p95_ms": p95,
+            "tokens_per_second": rate,
+        }
+
+
+class ChatService:
+    """
+    Answer chat messages from the knowledge base with a streaming LLM.
+
+    Attributes:
+        search: Knowledge base search
+        llm: Streaming chat model
+        chunks: Texts of the indexed chunks
+        context_chunks: Chunks retrieved per message
+        max_context_chars: Budget for the context excerpts in the prompt
+        metrics: Streaming metrics of this service
+        replies: Coalesces concurrent identical generations
+    """
+
+    DEFAULT_CONTEXT_CHUNKS = 4
+    DEFAULT_MAX_CONTEXT_CHARS = 8000
+
+    def __init__(
+        self,
+        search: HybridSearchService,
+        llm: ChatModel,
+        chunks: ChunkSource,
+        context_chunks: int = DEFAULT_CONTEXT_CHUNKS,
+        max_context_chars: int = DEFAULT_MAX_CONTEXT_CHARS,
+    ):
+        self.search = search
+        self.llm = llm
+        self.chunks = chunks
+        self.context_chunks = context_chunks
+        self.max_context_chars = max_context_chars
+        self.metrics = ChatMetrics()
+        self.replies: FanOut[str] = FanOut()
+
+    async def prepare(
+        self, message: str, filters: SearchFilter | None = None
+    ) -> ChatPrompt:
+        """
+        Retrieve context for a message and build the prompt.
+
+        Args:
+            message: User message
+            filters: Only use chunks whose metadata matches
+
+        Returns:
+            ChatPrompt: Messages for the model and the chunks they cite
+
+        Raises:
+            ValueError: If message is blank
+        """
+        start = time.perf_counter()
+        hits = await self.search.search(message, self.context_chunks, filters)
+
+        excerpts, sources, budget = [], [], self.max_context_chars
+        for hit in hits:
+            text = self.chunks.get(hit.chunk_id)
+            if not text or budget <= 0:
+                continue
+            text = text[:budget]
+            budget -= len(text)
+            excerpts.append(f"[{hit.chunk_id}]\n{text}")
+            sources.append(hit.chunk_id)
+
+        system = SYSTEM_PROMPT
+        if excerpts:
+            system += "\n\nKnowledge base excerpts:\n\n" + "\n\n".join(excerpts)
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": message},
+        ]
+        key = query_key(message, filters, self.llm.model)
+        return ChatPrompt(messages, sources, time.perf_counter() - start, key)
+
+    async def stream(
+        self, prompt: ChatPrompt, stats: ChatStreamStats | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the model's reply to a prepared prompt.
+
+        Concurrent streams of prompts with the same key share one model
+        stream. Closing the iterator (or cancelling its consumer) leaves it;
+        the generation is cancelled upstream once no stream follows it.
+
+        Args:
+            prompt: Prompt from prepare()
+            stats: Filled in as the reply streams (e.g. for a final event)
+
+        Yields:
+            str: Pieces of the reply, in order
+        """
+        stats = stats or ChatStreamStats()
+        self.metrics.streams += 1
+
+        def generate() -> AsyncIterator[str]:
+            return self.llm.stream_chat(prompt.messages)
+
+        if prompt.key is None:
+            tokens = generate()
+        else:
+            tokens = self.replies.subscribe(prompt.key, generate)
+        outcome = "failed"
+        try:
+            async for token in tokens:
+                stats.record_token()
+                yield token
+            outcome = "completed"
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            await tokens.aclose()
+            stats.finish()
+            self.metrics.record(stats, outcome)
@@ -0,0 +1,350 @@
+"""
+Hybrid knowledge base search: BM25 and vector results fused by rank.
+
+Vector search understands paraphrases but ranks exact references ("HU-2.1",
+"ADR", "OWASP", framework names) poorly; BM25 is the opposite. Scores of
+the two are not comparable, so results are combined with reciprocal rank
+fusion (Cormack et al., 2009): each chunk scores sum(1 / (k + rank)) over
+the rankings it appears in. Chunks ranked well by both retrievers rise to
+the top without any score calibration.
+
+Searches can be restricted by chunk metadata with a SearchFilter, which
+both retrievers apply before ranking (see parse_search_filter for the
+query string syntax).
+
+Identical searches running at the same time (same query up to case and
+whitespace, same filter) share one retrieval (see single_flight). The
+shared retrieval and fusion stages are timed in the request that started
+them; a request that joins one records its wait as its retrieval stage.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import nullcontext
+from typing import Protocol
+
+from app.core.timing import measure
+from app.domain.entities import SearchFilter, SearchHit, SearchPage
+from app.domain.services.single_flight import SingleFlight
+
+FILTER_CLAUSE = re.compile(r"^(\w+)(:|<=|>=|<|>)(.+)$")
+
+
+class LexicalSearcher(Protocol):
+    """Keyword retriever, e.g. app.infrastructure.search.BM25Index."""
+
+    def search(
+        self, query: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[tuple[str, float]]: ...
+
+
+class VectorSearcher(Protocol):
+    """Embedding retriever (embeds the query and runs a nearest-neighbour search)."""
+
+    async def search(
+        self, query: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[tuple[str, float]]: ...
+
+
+def parse_search_filter(expression: str) -> SearchFilter:
+    """
+    Parse a metadata filter expression.
+
+    Clauses are separated by spaces or commas and must all hold:
+    "category:<folder>", "tag:<tag>" (repeatable), "lang:<code>" and
+    "depth:<n>", "depth<=<n>", "depth>=<n>", "depth<<n>", "depth><n>".
+
+    Example: "category:02-TECH-PACKS tag:python lang:es depth<=3"
+
+    Args:
+        expression: Filter expression
+
+    Returns:
+        SearchFilter: Parsed conditions
+
+    Raises:
+        ValueError: If a clause is malformed or names an unknown field
+    """
+    conditions = SearchFilter()
+    for clause in expression.replace(",", " ").split():
+        match = FILTER_CLAUSE.match(clause)
+        if match is None:
+            raise ValueError(f"Invalid filter clause: {clause!r}")
+        field, operator, value = match.groups()
+        field = field.lower()
+        if field == "depth":
+            if not value.isdigit():
+                raise ValueError(f"depth must be an integer, got {value!r}")
+            depth = int(value)
+            if operator in (":", ">=", ">"):
+                conditions.min_depth = depth + (operator == ">")
+            if operator in (":", "<=", "<"):
+                conditions.max_depth = depth - (operator == "<")
+        elif operator != ":":
+            raise ValueError(f"{field} only supports ':', got {clause!r}")
+        elif field == "category":
+            conditions.category = value
+        elif field == "tag":
+            conditions.tags.append(value)
+        elif field in ("lang", "language"):
+            conditions.language = value.lower()
+        else:
+            raise ValueError(f"Unknown filter field: {field!r}")
+    return conditions
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> list[tuple[str, float]]:
+    """
+    Fuse several rankings of ids into one.
+
+    Args:
+        rankings: Lists of ids, best first
+        k: Damping constant; higher values flatten the rank contributions
+
+    Returns:
+        list[tuple[str, float]]: (id, fused score) pairs, best first. Ties
+            keep the order in which ids were first seen.
+
+    Raises:
+        ValueError: If k is lower than 1
+    """
+    if k < 1:
+        raise ValueError(f"k must be >= 1, got {k}")
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+
+class HybridSearchService:
+    """
+    Search the knowledge base with BM25 and, when configured, vectors.
+
+    Paged searches (search_page) rank up to RANKING_DEPTH results once and
+    keep the ranking for ranking_ttl seconds: the cursor of a later page
+    points into it, so deep pages cost a slice instead of a new search.
+    Pages of one cursor chain therefore come from one snapshot of the
+    index. An expired ranking is recomputed from the query.
+
+    Attributes:
+        lexical: Keyword retriever
+        vector: Embedding retriever, or None for keyword-only search
+        rrf_k: Reciprocal rank fusion constant
+        ranking_ttl: Seconds a ranking serves the pages of its cursors
+        max_rankings: Rankings kept at once (least recently used go first)
+        flights: Coalesces concurrent identical retrievals
+    """
+
+    DEFAULT_RRF_K = 60
+    CANDIDATES_PER_RESULT = 3  # Each retriever over-fetches before fusion
+    RANKING_DEPTH = 300  # Results reachable by paging through one query
+    DEFAULT_RANKING_TTL = 300.0
+    DEFAULT_MAX_RANKINGS = 256
+
+    def __init__(
+        self,
+        lexical: LexicalSearcher,
+        vector: VectorSearcher | None = None,
+        rrf_k: int = DEFAULT_RRF_K,
+        ranking_ttl: float = DEFAULT_RANKING_TTL,
+        max_rankings: int = DEFAULT_MAX_RANKINGS,
+    ):
+        self.lexical = lexical
+        self.vector = vector
+        self.rrf_k = rrf_k
+        self.ranking_ttl = ranking_ttl
+        self.max_rankings = max_rankings
+        # Ranking key -> (expiry on the monotonic clock, fused hits)
+        self._rankings: OrderedDict[str, tuple[float, list[SearchHit]]] = (
+            OrderedDict()
+        )
+        self.flights: SingleFlight[list[SearchHit]] = SingleFlight()
+
+    async def search(
+        self, query: str, limit: int = 10, filters: SearchFilter | None = None
+    ) -> list[SearchHit]:
+        """
+        Run both retrievers and fuse their rankings.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+            filters: Only search chunks whose metadata matches
+
+        Returns:
+            list[SearchHit]: Hits, best first
+
+        Raises:
+            ValueError: If query is blank or limit is lower than 1
+        """
+        _check_query(query, limit)
+        hits = await self._rank(query, limit * self.CANDIDATES_PER_RESULT, filters)
+        return hits[:limit]
+
+    async def search_page(
+        self,
+        query: str,
+        k: int = 10,
+        filters: SearchFilter | None = None,
+        cursor: str | None = None,
+    ) -> SearchPage:
+        """
+        Return one page of results.
+
+        Args:
+            query: Free-text query
+            k: Hits per page
+            filters: Only search chunks whose metadata matches
+            cursor: next_cursor of the previous page, None for the first page
+
+        Returns:
+            SearchPage: Hits of the page and the cursor of the next one
+
+        Raises:
+            ValueError: If query is blank, k is lower than 1, or the cursor
+                is malformed or belongs to another query or filter
+        """
+        _check_query(query, k)
+        key = query_key(query, filters)
+        offset = 0
+        hits = None
+        if cursor is not None:
+            cursor_key, offset = _decode_cursor(cursor)
+            if cursor_key != key:
+                raise ValueError("cursor belongs to another query or filter")
+            hits = self._cached_ranking(key)
+        if hits is None:
+            hits = await self._rank(query, self.RANKING_DEPTH, filters)
+            hits = hits[: self.RANKING_DEPTH]
+            self._store_ranking(key, hits)
+
+        end = offset + k
+        next_cursor = _encode_cursor(key, end) if end < len(hits) else None
+        return SearchPage(hits=hits[offset:end], next_cursor=next_cursor)
+
+    async def _rank(
+        self, query: str, candidates: int, filters: SearchFilter | None
+    ) -> list[SearchHit]:
+        """Fuse the top candidates of each retriever, best first."""
+        if filters is not None and filters.is_empty:
+            filters = None
+        key = f"{query_key(query, filters)}:{candidates}"
+        # A shared run is timed in the request that started it; a request
+        # joining it records its wait as retrieval
+        joining = key in self.flights
+        with measure("retrieval") if joining else nullcontext():
+            return await self.flights.do(
+                key, lambda: self._retrieve(query, candidates, filters)
+            )
+
+    async def _retrieve(
+        self, query: str, candidates: int, filters: SearchFilter | None
+    ) -> list[SearchHit]:
+        with measure("retrieval"):
+            lexical = [
+                item for item, _ in self.lexical.search(query, candidates, filters)
+            ]
+            vector = []
+            if self.vector is not None:
+                vector = [
+                    item
+                    for item, _ in await self.vector.search(query, candidates, filters)
+                ]
+
+        with measure("fusion"):
+            lexical_ranks = {item: rank for rank, item in enumerate(lexical, start=1)}
+            vector_ranks = {item: rank for rank, item in enumerate(vector, start=1)}
+            fused = reciprocal_rank_fusion([lexical, vector], k=self.rrf_k)
+            return [
+                SearchHit(
+                    chunk_id=item,
+                    score=score,
+                    lexical_rank=lexical_ranks.get(item),
+                    vector_rank=vector_ranks.get(item),
+                )
+                for item, score in fused
+            ]
+
+    def _cached_ranking(self, key: str) -> list[SearchHit] | None:
+        entry = self._rankings.get(key)
+        if entry is None:
+            return None
+        expires, hits = entry
+        if expires < time.monotonic():
+            del self._rankings[key]
+            return None
+        self._rankings.move_to_end(key)
+        return hits
+
+    def _store_ranking(self, key: str, hits: list[SearchHit]) -> None:
+        self._rankings[key] = (time.monotonic() + self.ranking_ttl, hits)
+        self._rankings.move_to_end(key)
+        while len(self._rankings) > self.max_rankings:
+            self._rankings.popitem(last=False)
+
+
+def _check_query(query: str, limit: int) -> None:
+    if not query.strip():
+        raise ValueError("query must not be empty")
+    if limit < 1:
+        raise ValueError(f"limit must be >= 1, got {limit}")
+
+
+def query_key(
+    query: str, filters: SearchFilter | None = None, model: str | None = None
+) -> str:
+    """
+    Key identifying equivalent requests, for coalescing them.
+
+    Queries differing only in case or whitespace, with the same filter
+    conditions (in any order) and model, get the same key.
+
+    Args:
+        query: Free-text query or chat message
+        filters: Metadata filter
+        model: Model answering the request, if any
+
+    Returns:
+        str: Hex digest key
+    """
+    payload = json.dumps(
+        [" ".join(query.casefold().split()), _filter_conditions(filters), model]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _filter_conditions(filters: SearchFilter | None) -> list | None:
+    if filters is None or filters.is_empty:
+        return None
+    return [
+        filters.category,
+        sorted(filters.tags),
+        filters.language,
+        filters.min_depth,
+        filters.max_depth,
+    ]
+
+
+def _encode_cursor(key: str, offset: int) -> str:
+    raw = f"{key}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """Return (ranking key, offset) of a cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        key, offset = raw.split(":")
+        if not offset.isdigit():
+            raise ValueError(offset)
+    except ValueError:  # Includes binascii.Error and UnicodeDecodeError
+        raise ValueError("Invalid cursor") from None
+    return key, int(offset)
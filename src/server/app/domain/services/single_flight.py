@@ -0,0 +1,221 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+When a team opens the same project, many people ask the same question
+within seconds. Without coalescing each request runs its own retrieval and
+LLM generation; with it, requests for a key already in flight wait for
+that computation instead of starting another:
+
+    - SingleFlight: for awaitables (e.g. a search ranking). Concurrent
+      callers of do(key, fn) share one run of fn and all get its result
+      (or its exception).
+    - FanOut: for async streams (e.g. LLM tokens). Concurrent subscribers
+      of a key share one upstream stream; a subscriber joining late first
+      receives the items already produced, then follows live.
+
+Only work in flight is shared: once it finishes the key is released and
+the next request computes afresh (caching results is a separate concern).
+The shared work runs in its own task, so one caller going away does not
+cancel it for the others; it is cancelled when its last caller leaves.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class FlightStats:
+    """
+    Coalescing counters.
+
+    Attributes:
+        calls: Requests for a result or stream
+        coalesced: Requests that joined work already in flight
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """Share of requests served by another request's work."""
+        return self.coalesced / self.calls if self.calls else None
+
+    def snapshot(self) -> dict[str, int | float | None]:
+        """Current counters as a dict."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class _Flight(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Share one in-flight computation among concurrent callers of a key.
+
+    Attributes:
+        stats: Coalescing counters
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight[T]] = {}
+        self.stats = FlightStats()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a call for key would join work already in flight."""
+        return key in self._flights
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the result of fn, shared with concurrent calls for key.
+
+        Args:
+            key: Identity of the computation
+            fn: Starts the computation; only called if key is not in flight
+
+        Returns:
+            The computation's result
+
+        Raises:
+            Exception: Whatever the shared computation raised
+        """
+        self.stats.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(key, flight))
+        else:
+            self.stats.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller went away (cancelled): nobody needs the result
+                self._release(key, flight)
+                flight.task.cancel()
+
+    def _release(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class _Broadcast(Generic[T]):
+    """Items of one upstream stream, replayable by every subscriber."""
+
+    def __init__(self) -> None:
+        self.items: list[T] = []
+        self.done = False
+        self.error: Exception | None = None
+        self.subscribers = 0
+        self.changed = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class FanOut(Generic[T]):
+    """
+    Share one upstream async stream among concurrent subscribers of a key.
+
+    Attributes:
+        stats: Coalescing counters
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Broadcast[T]] = {}
+        self.stats = FlightStats()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def subscribe(
+        self, key: str, source: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """
+        Iterate the stream for key, shared with concurrent subscribers.
+
+        Closing the iterator unsubscribes; when the last subscriber leaves
+        before the end, the upstream stream is closed.
+
+        Args:
+            key: Identity of the stream
+            source: Opens the upstream stream; only called if key is not
+                in flight
+
+        Yields:
+            Items of the stream, from its first one
+
+        Raises:
+            Exception: Whatever the upstream stream raised
+        """
+        self.stats.calls += 1
+        broadcast = self._flights.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._flights[key] = broadcast
+            broadcast.task = asyncio.create_task(self._pump(key, broadcast, source))
+        else:
+            self.stats.coalesced += 1
+
+        broadcast.subscribers += 1
+        try:
+            position = 0
+            while True:
+                changed = broadcast.changed
+                while position < len(broadcast.items):
+                    yield broadcast.items[position]
+                    position += 1
+                if broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                await changed.wait()
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # Wait for the upstream to be closed, like closing it directly
+                self._release(key, broadcast)
+                broadcast.task.cancel()
+                await asyncio.wait([broadcast.task])
+
+    async def _pump(
+        self, key: str, broadcast: _Broadcast[T], source: Callable[[], AsyncIterator[T]]
+    ) -> None:
+        """Copy the upstream stream into the broadcast until it ends."""
+        items = source()
+        try:
+            async for item in items:
+                broadcast.items.append(item)
+                broadcast.notify()
+        except Exception as exc:
+            broadcast.error = exc
+        finally:
+            try:
+                await items.aclose()
+            finally:
+                broadcast.done = True
+                self._release(key, broadcast)
+                broadcast.notify()
+
+    def _release(self, key: str, broadcast: _Broadcast[T]) -> None:
+        if self._flights.get(key) is broadcast:
+            del self._flights[key]
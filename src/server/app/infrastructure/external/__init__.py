@@ -1,3 +1,19 @@
 """
 Infrastructure layer: External APIs and third-party integrations.
 """
+
+from .http_pool import (
+    HttpClientPool,
+    PoolMetrics,
+    close_http_pool,
+    get_http_pool,
+    open_http_pool,
+)
+
+__all__ = [
+    "HttpClientPool",
+    "PoolMetrics",
+    "close_http_pool",
+    "get_http_pool",
+    "open_http_pool",
+]
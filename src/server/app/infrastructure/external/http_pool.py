@@ -0,0 +1,287 @@
+"""
+Pooled async HTTP clients for the backend's upstream services.
+
+Ollama and ChromaDB are reached over HTTP. Opening a TCP connection per
+request adds a handshake (and slow start) to every call, so the app keeps
+one HttpClientPool for its whole lifetime: opened by the startup handler,
+closed by the shutdown handler. It holds one httpx.AsyncClient per upstream
+origin, which gives each host its own connection limit: a burst of chat
+streams holding Ollama connections cannot starve ChromaDB queries.
+
+Each client:
+    - keeps idle connections alive for keepalive_expiry seconds for reuse
+    - opens at most max_connections_per_host connections; further requests
+      wait up to pool_timeout for one to be released
+    - applies separate deadlines to connecting (connect_timeout, short: a
+      down service should fail fast) and reading (read_timeout, long: the
+      gap between two streamed tokens while a model loads)
+
+Pool metrics (per host, see PoolMetrics) come from httpcore's request
+trace events, so they count what the connection pool actually did:
+    - in_use: connections currently serving a request
+    - waiting: requests queued for a free connection
+    - reuse_ratio: share of requests served on an already open connection
+"""
+
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Connection pool counters of one upstream host.
+
+    Attributes:
+        requests: Requests that obtained a connection
+        new_connections: Connections opened for those requests
+        in_use: Connections serving a request right now
+        waiting: Requests sent but not yet on a connection right now
+            (queued at the limit, or briefly while the pool assigns one)
+        peak_in_use: Highest in_use seen
+        peak_waiting: Highest waiting seen
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.peak_waiting = 0
+
+    @property
+    def reuse_ratio(self) -> float | None:
+        """Share of requests served on a kept-alive connection."""
+        if not self.requests:
+            return None
+        return 1 - self.new_connections / self.requests
+
+    def snapshot(self) -> dict[str, int | float | None]:
+        """Current counters as a dict."""
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_ratio": self.reuse_ratio,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak_in_use": self.peak_in_use,
+            "peak_waiting": self.peak_waiting,
+        }
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Response body that releases its metrics slot when closed."""
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, release: Callable[[], None]
+    ) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class MeteredTransport(httpx.AsyncHTTPTransport):
+    """
+    Connection-pooling transport that records PoolMetrics.
+
+    A request is "waiting" from the moment it is sent until httpcore
+    reports the first event on a connection (opening one, or sending the
+    headers on a kept-alive one), then "in use" until its response is
+    closed.
+    """
+
+    def __init__(self, metrics: PoolMetrics, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self.metrics
+        state = {"acquired": False, "released": False}
+
+        def acquire(new_connection: bool) -> None:
+            state["acquired"] = True
+            metrics.waiting -= 1
+            metrics.in_use += 1
+            metrics.requests += 1
+            metrics.new_connections += int(new_connection)
+            metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+
+        def release() -> None:
+            if state["released"]:
+                return
+            state["released"] = True
+            if state["acquired"]:
+                metrics.in_use -= 1
+            else:
+                metrics.waiting -= 1
+
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event: str, info: dict[str, Any]) -> None:
+            if not state["acquired"]:
+                if event == "connection.connect_tcp.started":
+                    acquire(new_connection=True)
+                elif event.endswith("send_request_headers.started"):
+                    acquire(new_connection=False)
+            if outer_trace is not None:
+                await outer_trace(event, info)
+
+        request.extensions["trace"] = trace
+        metrics.waiting += 1
+        metrics.peak_waiting = max(metrics.peak_waiting, metrics.waiting)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _MeteredStream(response.stream, release)
+        return response
+
+
+class HttpClientPool:
+    """
+    One pooled httpx.AsyncClient per upstream origin.
+
+    Attributes:
+        max_connections_per_host: Connection limit of each client
+        keepalive_expiry: Seconds an idle connection is kept for reuse
+        timeout: Connect/read/write/pool deadlines of every client
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int | None = None,
+        keepalive_expiry: float | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        pool_timeout: float | None = None,
+    ):
+        """
+        Create an empty pool; clients are created on first use.
+
+        Arguments left as None take the setting; explicit values, including
+        0 (e.g. keepalive_expiry=0 disables connection reuse), are kept.
+
+        Args:
+            max_connections_per_host: Default: settings.HTTP_MAX_CONNECTIONS_PER_HOST
+            keepalive_expiry: Default: settings.HTTP_KEEPALIVE_EXPIRY
+            connect_timeout: Default: settings.HTTP_CONNECT_TIMEOUT
+            read_timeout: Default: settings.HTTP_READ_TIMEOUT
+            pool_timeout: Default: settings.HTTP_POOL_TIMEOUT
+        """
+        if max_connections_per_host is None:
+            max_connections_per_host = settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        if keepalive_expiry is None:
+            keepalive_expiry = settings.HTTP_KEEPALIVE_EXPIRY
+        if connect_timeout is None:
+            connect_timeout = settings.HTTP_CONNECT_TIMEOUT
+        if read_timeout is None:
+            read_timeout = settings.HTTP_READ_TIMEOUT
+        if pool_timeout is None:
+            pool_timeout = settings.HTTP_POOL_TIMEOUT
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = httpx.Timeout(
+            read_timeout, connect=connect_timeout, pool=pool_timeout
+        )
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._metrics: dict[str, PoolMetrics] = {}
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Return the shared client for the origin of base_url.
+
+        Args:
+            base_url: Any URL on the upstream host
+
+        Returns:
+            httpx.AsyncClient: Client pooling connections to that origin
+        """
+        origin = str(httpx.URL(base_url).copy_with(path="/", query=None))
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            metrics = self._metrics.setdefault(origin, PoolMetrics())
+            limits = httpx.Limits(
+                max_connections=self.max_connections_per_host,
+                max_keepalive_connections=self.max_connections_per_host,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=MeteredTransport(metrics, limits=limits),
+            )
+            self._clients[origin] = client
+        return client
+
+    def metrics(self) -> dict[str, dict[str, int | float | None]]:
+        """
+        Pool metrics per upstream origin.
+
+        Returns:
+            dict: Origin -> PoolMetrics.snapshot()
+        """
+        return {origin: m.snapshot() for origin, m in self._metrics.items()}
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+_pool: HttpClientPool | None = None
+
+
+def open_http_pool() -> HttpClientPool:
+    """
+    Create the application's HTTP client pool (startup handler).
+
+    Replaces a pool opened on first use before startup: its connections
+    may belong to another event loop.
+
+    Returns:
+        HttpClientPool: The new pool, also returned by get_http_pool()
+    """
+    global _pool
+    _pool = HttpClientPool()
+    return _pool
+
+
+async def close_http_pool() -> None:
+    """Close the application's HTTP client pool (shutdown handler)."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.aclose()
+
+
+def get_http_pool() -> HttpClientPool:
+    """
+    Return the application's HTTP client pool.
+
+    Outside the app lifecycle (scripts, tests) a pool is opened on first
+    use, so clients work without the startup handler having run.
+
+    Returns:
+        HttpClientPool: The current pool
+    """
+    if _pool is None:
+        logger.debug("HTTP client pool opened outside the app lifecycle")
+        return open_http_pool()
+    return _pool
@@ -1,3 +1,7 @@
 """
 Infrastructure layer: LLM provider integrations.
 """
+
+from .ollama_client import OllamaClient, OllamaError
+
+__all__ = ["OllamaClient", "OllamaError"]
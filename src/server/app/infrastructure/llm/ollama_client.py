@@ -0,0 +1,130 @@
+"""
+Client for the Ollama chat (streaming) and embedding APIs.
+
+POST /api/chat with "stream": true answers with one JSON object per line
+as the model generates, each carrying the next piece of the reply
+(roughly one token):
+
+    {"message": {"role": "assistant", "content": "Hex"}, "done": false}
+    {"message": {"role": "assistant", "content": "agonal"}, "done": false}
+    {"done": true, "eval_count": 2, "eval_duration": 41000000}
+
+stream_chat yields those pieces as they arrive. Closing the iterator early
+(or cancelling the task consuming it) closes the HTTP response, and Ollama
+stops generating when its client goes away, so an abandoned chat does not
+keep the GPU busy.
+
+embed returns the vectors of POST /api/embed, used to embed search queries
+with the model that embedded the knowledge base.
+
+Requests go through the application's pooled client for the Ollama host
+(app.infrastructure.external.http_pool), so consecutive chats reuse
+kept-alive connections under the pool's limits and deadlines.
+"""
+
+import json
+from collections.abc import AsyncIterator
+
+import httpx
+
+from app.core.config import settings
+from app.infrastructure.external.http_pool import get_http_pool
+
+
+class OllamaError(RuntimeError):
+    """Ollama answered with an error instead of a completion."""
+
+
+class OllamaClient:
+    """
+    Async client for streamed Ollama chat completions and embeddings.
+
+    Attributes:
+        base_url: Ollama server URL
+        model: Chat model used when a call does not name one
+        embed_model: Embedding model used when a call does not name one
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        model: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        embed_model: str | None = None,
+    ):
+        """
+        Create a client.
+
+        Args:
+            base_url: Ollama server URL (default: settings.OLLAMA_BASE_URL)
+            model: Default chat model (default: settings.OLLAMA_MODEL)
+            client: HTTP client to use instead of the application pool's
+            embed_model: Default embedding model
+                (default: settings.OLLAMA_EMBED_MODEL)
+        """
+        self.base_url = (base_url or settings.OLLAMA_BASE_URL).rstrip("/")
+        self.model = model or settings.OLLAMA_MODEL
+        self.embed_model = embed_model or settings.OLLAMA_EMBED_MODEL
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Given client, else the current pool's client for the Ollama host."""
+        return self._client or get_http_pool().client(self.base_url)
+
+    async def stream_chat(
+        self, messages: list[dict[str, str]], model: str | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion.
+
+        Args:
+            messages: Conversation as {"role": ..., "content": ...} dicts
+            model: Model to use instead of the default
+
+        Yields:
+            str: Pieces of the reply, in order
+
+        Raises:
+            httpx.HTTPStatusError: If Ollama answers with an error status
+            OllamaError: If the stream reports an error
+        """
+        payload = {"model": model or self.model, "messages": messages, "stream": True}
+        async with self.client.stream(
+            "POST", f"{self.base_url}/api/chat", json=payload
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise OllamaError(chunk["error"])
+                content = chunk.get("message", {}).get("content")
+                if content:
+                    yield content
+                # After "done" the body ends; reading to its end (rather than
+                # returning here) lets the pool keep the connection alive
+
+    async def embed(
+        self, texts: list[str], model: str | None = None
+    ) -> list[list[float]]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+            model: Model to use instead of the default embedding model
+
+        Returns:
+            list[list[float]]: One embedding per text, in order
+
+        Raises:
+            httpx.HTTPStatusError: If Ollama answers with an error status
+        """
+        payload = {"model": model or self.embed_model, "input": texts}
+        response = await self.client.post(f"{self.base_url}/api/embed", json=payload)
+        response.raise_for_status()
+        return response.json()["embeddings"]
@@ -0,0 +1,10 @@
+"""
+Infrastructure layer: In-memory lexical search (BM25) with metadata filters,
+and the chunk texts used as chat context.
+"""
+
+from .bm25_index import BM25Index, tokenize
+from .chunk_store import ChunkStore
+from .metadata_bitsets import MetadataBitsets
+
+__all__ = ["BM25Index", "ChunkStore", "MetadataBitsets", "tokenize"]
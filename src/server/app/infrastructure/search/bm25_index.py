@@ -0,0 +1,335 @@
+"""
+In-memory BM25 inverted index with compressed posting lists.
+
+Each term maps to a posting list of (document, term frequency) pairs kept
+in a bytearray: document numbers are delta-encoded against the previous
+posting and both numbers are written as LEB128 varints. Documents are
+numbered in insertion order, so deltas stay small and a typical posting
+takes 2 bytes instead of a tuple of two Python ints (~100 bytes).
+
+Tokenization keeps identifiers such as "HU-2.1", "ADR-004" or "OAuth2.0"
+as single terms (and also indexes their parts), so a query for an exact
+reference ranks the chunks that contain it first, and only falls back to
+the parts when the identifier is not in the index.
+
+Deletes are soft: removed documents leave the document frequencies at
+once, but keep their postings and are skipped while scoring. Once removed
+documents make up COMPACT_RATIO of the numbered ones (e.g. after many
+re-indexed chunks), the index renumbers the live documents and rewrites
+the posting lists without the removed ones.
+
+Searches can be restricted by chunk metadata (category, tags, language,
+depth): the filter is resolved to a bitset of allowed documents first
+(see MetadataBitsets) and postings of other documents are never scored.
+"""
+
+import heapq
+import math
+import re
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from operator import itemgetter
+from typing import Any, Protocol
+
+from app.core.timing import measure
+from app.domain.entities import SearchFilter
+
+from .metadata_bitsets import MetadataBitsets
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+PART_PATTERN = re.compile(r"\w+")
+COMPOUND_SEPARATORS = frozenset("-./")
+
+
+class IndexableChunk(Protocol):
+    """
+    Anything with an id and text, e.g. a DocumentLoader chunk.
+
+    A metadata attribute, when present, is indexed for filtered search.
+    """
+
+    @property
+    def chunk_id(self) -> str: ...
+
+    @property
+    def content(self) -> str: ...
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase terms.
+
+    Compound identifiers ("hu-2.1") are kept whole and followed by their
+    parts ("hu", "2", "1").
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        list[str]: Terms in order of appearance
+    """
+    terms = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        term = match.group()
+        terms.append(term)
+        if not COMPOUND_SEPARATORS.isdisjoint(term):
+            terms.extend(PART_PATTERN.findall(term))
+    return terms
+
+
+class BM25Index:
+    """
+    Okapi BM25 ranking over an in-memory inverted index.
+
+    Attributes:
+        k1: Term frequency saturation
+        b: Document length normalization (0 = none, 1 = full)
+    """
+
+    DEFAULT_K1 = 1.2
+    DEFAULT_B = 0.75
+    COMPACT_RATIO = 0.5  # Share of removed documents that triggers compact()
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        """
+        Create an empty index.
+
+        Args:
+            k1: Term frequency saturation, >= 0
+            b: Length normalization, in [0, 1]
+
+        Raises:
+            ValueError: If k1 or b is out of range
+        """
+        if k1 < 0 or not 0 <= b <= 1:
+            raise ValueError(f"Expected k1 >= 0 and 0 <= b <= 1, got {k1}, {b}")
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, bytearray] = {}
+        self._last_doc: dict[str, int] = {}  # Last document of each posting list
+        self._doc_freq: dict[str, int] = {}
+        self._ids: list[str | None] = []  # Document number -> id, None if removed
+        self._doc_terms: list[tuple[str, ...]] = []  # Distinct terms per document
+        self._numbers: dict[str, int] = {}  # id -> document number
+        self._lengths = array("I")  # Terms per document
+        self._total_length = 0  # Terms in live documents
+        self._metadata = MetadataBitsets()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._numbers
+
+    @property
+    def terms(self) -> int:
+        """Number of distinct terms."""
+        return len(self._postings)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by posting lists and document lengths."""
+        postings = sum(len(data) for data in self._postings.values())
+        lengths = self._lengths.itemsize * len(self._lengths)
+        return postings + lengths + self._metadata.memory_bytes
+
+    def add(self, chunk_id: str, text: str, metadata: Any = None) -> None:
+        """
+        Index a document, replacing any previous version of chunk_id.
+
+        Args:
+            chunk_id: Document identifier
+            text: Document text
+            metadata: Optional mapping or object (e.g. DocumentMetadata) with
+                category, tags, language and depth, for filtered search
+        """
+        self.remove(chunk_id)
+        doc = len(self._ids)
+        self._ids.append(chunk_id)
+        self._numbers[chunk_id] = doc
+        if metadata is not None:
+            self._metadata.add(doc, metadata)
+
+        frequencies = Counter(map(sys.intern, tokenize(text)))
+        length = sum(frequencies.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self._doc_terms.append(tuple(frequencies))
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = bytearray()
+                previous = 0
+            else:
+                previous = self._last_doc[term]
+            _write_varint(postings, doc - previous)
+            _write_varint(postings, frequency)
+            self._last_doc[term] = doc
+            self._doc_freq[term] = self._doc_freq.get(term, 0) + 1
+
+    def add_many(self, chunks: Iterable[IndexableChunk]) -> int:
+        """
+        Index a stream of chunks (e.g. DocumentLoader.load_all_documents()).
+
+        Args:
+            chunks: Objects with chunk_id and content
+
+        Returns:
+            int: Number of chunks indexed
+        """
+        count = 0
+        for chunk in chunks:
+            self.add(chunk.chunk_id, chunk.content, getattr(chunk, "metadata", None))
+            count += 1
+        return count
+
+    def remove(self, chunk_id: str) -> bool:
+        """
+        Remove a document from results.
+
+        Args:
+            chunk_id: Document identifier
+
+        Returns:
+            bool: True if the document was indexed
+        """
+        doc = self._numbers.pop(chunk_id, None)
+        if doc is None:
+            return False
+        self._ids[doc] = None
+        self._total_length -= self._lengths[doc]
+        for term in self._doc_terms[doc]:
+            self._doc_freq[term] -= 1
+            if not self._doc_freq[term]:
+                # Only removed documents left: drop the posting list
+                del self._doc_freq[term], self._postings[term], self._last_doc[term]
+        self._doc_terms[doc] = ()
+
+        if len(self._ids) - len(self._numbers) >= self.COMPACT_RATIO * len(self._ids):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """
+        Drop removed documents from the posting lists.
+
+        Live documents are renumbered in their current order, so posting
+        lists stay sorted and their deltas small.
+        """
+        live = [doc for doc, chunk_id in enumerate(self._ids) if chunk_id is not None]
+        new_numbers = dict(zip(live, range(len(live))))
+        for term, postings in self._postings.items():
+            compacted = bytearray()
+            previous = 0
+            for doc, frequency in _decode_postings(postings):
+                new = new_numbers.get(doc)
+                if new is None:
+                    continue
+                _write_varint(compacted, new - previous)
+                _write_varint(compacted, frequency)
+                previous = new
+            self._postings[term] = compacted
+            self._last_doc[term] = previous
+
+        self._ids = [self._ids[doc] for doc in live]
+        self._numbers = {chunk_id: doc for doc, chunk_id in enumerate(self._ids)}
+        self._doc_terms = [self._doc_terms[doc] for doc in live]
+        self._lengths = array("I", (self._lengths[doc] for doc in live))
+        self._metadata.compact(live)
+
+    def search(
+        self, query: str, limit: int = 10, filters: SearchFilter | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            filters: Only rank documents whose metadata matches
+
+        Returns:
+            list[tuple[str, float]]: (chunk_id, score) pairs, best first
+
+        Raises:
+            ValueError: If limit is lower than 1
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be >= 1, got {limit}")
+        count = len(self._numbers)
+        if not count:
+            return []
+
+        allowed = None
+        if filters is not None and not filters.is_empty:
+            with measure("filter"):
+                allowed = self._metadata.select(filters, len(self._ids))
+            if not allowed.strip(b"\x00"):  # Nothing matches
+                return []
+
+        k1, b = self.k1, self.b
+        average_length = self._total_length / count or 1.0
+        ids, lengths = self._ids, self._lengths
+        scores: dict[int, float] = {}
+        for term in self._query_terms(query):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            doc_freq = self._doc_freq[term]
+            idf = math.log(1.0 + (count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for doc, frequency in _decode_postings(postings):
+                if ids[doc] is None:
+                    continue
+                if allowed is not None and not allowed[doc >> 3] >> (doc & 7) & 1:
+                    continue
+                norm = 1.0 - b + b * lengths[doc] / average_length
+                weight = idf * frequency * (k1 + 1.0) / (frequency + k1 * norm)
+                scores[doc] = scores.get(doc, 0.0) + weight
+
+        top = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [(ids[doc], score) for doc, score in top]
+
+    def _query_terms(self, query: str) -> set[str]:
+        """
+        Terms to score for a query.
+
+        A compound identifier found in the index is scored on its own: its
+        parts ("2", "1") are frequent, add little and cost long posting list
+        scans. Unknown compounds fall back to their parts.
+        """
+        terms = set()
+        for match in TOKEN_PATTERN.finditer(query.lower()):
+            term = match.group()
+            terms.add(term)
+            compound = not COMPOUND_SEPARATORS.isdisjoint(term)
+            if compound and term not in self._postings:
+                terms.update(PART_PATTERN.findall(term))
+        return terms
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append value as a LEB128 varint (7 bits per byte, low bits first)."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(data: bytearray) -> Iterator[tuple[int, int]]:
+    """Yield the (document, frequency) pairs of a posting list."""
+    doc = value = shift = 0
+    is_delta = True
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if is_delta:
+            doc += value
+        else:
+            yield doc, value
+        is_delta = not is_delta
+        value = shift = 0
@@ -0,0 +1,54 @@
+"""
+In-memory store of chunk texts, by chunk id.
+
+The search indexes keep only what ranking needs (postings, vectors); the
+chat endpoint needs the text of the retrieved chunks to build the prompt
+context, which it reads from here.
+"""
+
+from collections.abc import Iterable
+
+from .bm25_index import IndexableChunk
+
+
+class ChunkStore:
+    """
+    Chunk id -> chunk text.
+    """
+
+    def __init__(self) -> None:
+        self._texts: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._texts
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """Store (or replace) the text of a chunk."""
+        self._texts[chunk_id] = text
+
+    def add_many(self, chunks: Iterable[IndexableChunk]) -> int:
+        """
+        Store a stream of chunks.
+
+        Args:
+            chunks: Objects with chunk_id and content
+
+        Returns:
+            int: Number of chunks stored
+        """
+        count = 0
+        for chunk in chunks:
+            self._texts[chunk.chunk_id] = chunk.content
+            count += 1
+        return count
+
+    def remove(self, chunk_id: str) -> bool:
+        """Drop a chunk; returns True if it was stored."""
+        return self._texts.pop(chunk_id, None) is not None
+
+    def get(self, chunk_id: str) -> str | None:
+        """Return the text of a chunk, or None if unknown."""
+        return self._texts.get(chunk_id)
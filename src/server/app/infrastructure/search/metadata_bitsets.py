@@ -0,0 +1,124 @@
+"""
+Uncompressed metadata bitsets for the server's BM25 filtered search.
+
+Keeps one bitset per (field, value) pair - category, each tag, language
+and depth - with bit n set when document n has that value. Bitsets are
+plain Python ints, so AND / OR run in C a machine word at a time. Unlike
+the roaring bitmaps of the ingestion side (services/vectors), which the
+standalone server can neither import nor run without numpy, they are not
+compressed: each costs one bit per document up to its highest one, which
+stays small at knowledge base scale (100k chunks: 12.5 KB per value).
+
+A filter is resolved into the bitset of allowed documents before ranking,
+and the BM25 scoring loop skips every posting outside it with one byte
+lookup instead of scoring all matches and filtering the ranking afterwards.
+
+Bits of removed documents are left set; the index that owns the document
+numbers skips removed documents anyway, and drops them when it renumbers
+its documents (see compact).
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from app.domain.entities import SearchFilter
+
+
+def _field(metadata: Any, name: str) -> Any:
+    """Read a field from a mapping or an object (e.g. DocumentMetadata)."""
+    if isinstance(metadata, Mapping):
+        return metadata.get(name)
+    return getattr(metadata, name, None)
+
+
+class MetadataBitsets:
+    """
+    Document bitsets per category, tag, language and depth value.
+    """
+
+    def __init__(self) -> None:
+        self._bitmaps: dict[tuple[str, Any], int] = {}
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the bitsets."""
+        return sum((bits.bit_length() + 7) // 8 for bits in self._bitmaps.values())
+
+    def add(self, doc: int, metadata: Any) -> None:
+        """
+        Index the metadata of a document.
+
+        Args:
+            doc: Document number
+            metadata: Mapping or object with category, tags, language and
+                depth; missing fields are not indexed
+        """
+        bit = 1 << doc
+        keys = [("tag", tag) for tag in _field(metadata, "tags") or ()]
+        for name in ("category", "language", "depth"):
+            value = _field(metadata, name)
+            if value is not None:
+                keys.append((name, value))
+        for key in keys:
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bit
+
+    def compact(self, live: Sequence[int]) -> None:
+        """
+        Renumber documents: document live[i] becomes document i.
+
+        Args:
+            live: Numbers of the documents to keep, in increasing order;
+                bits of every other document are dropped
+        """
+        new_numbers = dict(zip(live, range(len(live))))
+        size = (len(live) + 7) // 8
+        for key, bits in list(self._bitmaps.items()):
+            compacted = bytearray(size)
+            data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+            for position, byte in enumerate(data):
+                while byte:
+                    low = byte & -byte
+                    new = new_numbers.get(8 * position + low.bit_length() - 1)
+                    if new is not None:
+                        compacted[new >> 3] |= 1 << (new & 7)
+                    byte ^= low
+            bits = int.from_bytes(compacted, "little")
+            if bits:
+                self._bitmaps[key] = bits
+            else:
+                del self._bitmaps[key]
+
+    def select(self, filters: SearchFilter, documents: int) -> bytes:
+        """
+        Resolve a filter into the documents it allows.
+
+        Args:
+            filters: Conditions that must all hold
+            documents: Number of documents (bytes cover documents 0..n-1)
+
+        Returns:
+            bytes: Little-endian bitset; document n is allowed when
+                bitset[n >> 3] >> (n & 7) & 1
+        """
+        bitmaps = []
+        if filters.category is not None:
+            bitmaps.append(self._bitmaps.get(("category", filters.category), 0))
+        bitmaps.extend(self._bitmaps.get(("tag", tag), 0) for tag in filters.tags)
+        if filters.language is not None:
+            bitmaps.append(self._bitmaps.get(("language", filters.language), 0))
+        if filters.min_depth is not None or filters.max_depth is not None:
+            bitmaps.append(self._depth_range(filters.min_depth, filters.max_depth))
+
+        allowed = (1 << documents) - 1
+        for bits in bitmaps:
+            allowed &= bits
+        return allowed.to_bytes((documents + 7) // 8, "little")
+
+    def _depth_range(self, low: int | None, high: int | None) -> int:
+        result = 0
+        for (name, depth), bits in self._bitmaps.items():
+            if name != "depth":
+                continue
+            if (low is None or depth >= low) and (high is None or depth <= high):
+                result |= bits
+        return result
@@ -1,3 +1,8 @@
 """
 Infrastructure layer: ChromaDB vector store implementation.
 """
+
+from .chroma_client import ChromaHttpClient, StoredChunk
+from .chroma_searcher import ChromaVectorSearcher, chroma_where
+
+__all__ = ["ChromaHttpClient", "ChromaVectorSearcher", "StoredChunk", "chroma_where"]
@@ -0,0 +1,197 @@
+"""
+Async client for the ChromaDB server's REST API (v2).
+
+Talks to the ChromaDB service of the Docker Compose stack
+(CHROMADB_HOST:CHROMADB_PORT) through the application's pooled client for
+that host (app.infrastructure.external.http_pool), so queries reuse
+kept-alive connections instead of opening one each.
+
+Endpoints used:
+    - GET  /api/v2/heartbeat
+    - GET  /api/v2/tenants/{tenant}/databases/{database}/collections/{name}
+    - POST /api/v2/tenants/{tenant}/databases/{database}/collections/{id}/query
+    - POST /api/v2/tenants/{tenant}/databases/{database}/collections/{id}/get
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.infrastructure.external.http_pool import get_http_pool
+
+
+class StoredChunk:
+    """
+    A chunk as stored in a collection.
+
+    Attributes:
+        chunk_id: Record id (the loader's chunk id, "path#index")
+        content: Chunk text
+        metadata: Record metadata (category, tags, language, depth, ...)
+    """
+
+    def __init__(self, chunk_id: str, content: str, metadata: dict[str, Any]):
+        self.chunk_id = chunk_id
+        self.content = content
+        self.metadata = metadata
+
+
+class ChromaHttpClient:
+    """
+    Nearest-neighbour queries against a ChromaDB server.
+
+    Attributes:
+        base_url: ChromaDB server URL
+        tenant: ChromaDB tenant
+        database: ChromaDB database
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        tenant: str = "default_tenant",
+        database: str = "default_database",
+        client: httpx.AsyncClient | None = None,
+    ):
+        """
+        Create a client.
+
+        Args:
+            base_url: Server URL (default: http://CHROMADB_HOST:CHROMADB_PORT)
+            tenant: ChromaDB tenant
+            database: ChromaDB database
+            client: HTTP client to use instead of the application pool's
+        """
+        default_url = f"http://{settings.CHROMADB_HOST}:{settings.CHROMADB_PORT}"
+        self.base_url = (base_url or default_url).rstrip("/")
+        self.tenant = tenant
+        self.database = database
+        self._client = client
+        self._collection_ids: dict[str, str] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Given client, else the current pool's client for the Chroma host."""
+        return self._client or get_http_pool().client(self.base_url)
+
+    @property
+    def _database_url(self) -> str:
+        return (
+            f"{self.base_url}/api/v2/tenants/{self.tenant}"
+            f"/databases/{self.database}"
+        )
+
+    async def heartbeat(self) -> bool:
+        """
+        Check that the server answers.
+
+        Returns:
+            bool: True if the heartbeat succeeded
+        """
+        try:
+            response = await self.client.get(f"{self.base_url}/api/v2/heartbeat")
+        except httpx.HTTPError:
+            return False
+        return response.is_success
+
+    async def collection_id(self, name: str) -> str:
+        """
+        Resolve (and cache) the id of a collection.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            str: Collection id
+
+        Raises:
+            httpx.HTTPStatusError: If the collection does not exist
+        """
+        if name not in self._collection_ids:
+            response = await self.client.get(f"{self._database_url}/collections/{name}")
+            response.raise_for_status()
+            self._collection_ids[name] = response.json()["id"]
+        return self._collection_ids[name]
+
+    async def query(
+        self,
+        collection: str,
+        embeddings: list[list[float]],
+        n_results: int,
+        where: dict | None = None,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Find the nearest neighbours of query embeddings.
+
+        Args:
+            collection: Collection name
+            embeddings: One embedding per query
+            n_results: Neighbours per query
+            where: Chroma metadata filter, e.g. {"category": "02-TECH-PACKS"}
+
+        Returns:
+            list: Per query, (id, distance) pairs, nearest first
+
+        Raises:
+            httpx.HTTPStatusError: If the server rejects the query
+        """
+        collection_id = await self.collection_id(collection)
+        payload: dict = {
+            "query_embeddings": embeddings,
+            "n_results": n_results,
+            "include": ["distances"],
+        }
+        if where:
+            payload["where"] = where
+        response = await self.client.post(
+            f"{self._database_url}/collections/{collection_id}/query", json=payload
+        )
+        response.raise_for_status()
+        body = response.json()
+        return [
+            list(zip(ids, distances))
+            for ids, distances in zip(body["ids"], body["distances"])
+        ]
+
+    async def iter_chunks(
+        self, collection: str, page_size: int = 1000
+    ) -> AsyncIterator[StoredChunk]:
+        """
+        Read every record of a collection with its text and metadata.
+
+        Args:
+            collection: Collection name
+            page_size: Records fetched per request
+
+        Yields:
+            StoredChunk: Records in storage order; records without a
+                document text are skipped
+
+        Raises:
+            httpx.HTTPStatusError: If the collection does not exist
+        """
+        collection_id = await self.collection_id(collection)
+        offset = 0
+        while True:
+            response = await self.client.post(
+                f"{self._database_url}/collections/{collection_id}/get",
+                json={
+                    "limit": page_size,
+                    "offset": offset,
+                    "include": ["documents", "metadatas"],
+                },
+            )
+            response.raise_for_status()
+            body = response.json()
+            ids = body["ids"]
+            metadatas = body.get("metadatas") or [None] * len(ids)
+            for chunk_id, document, metadata in zip(
+                ids, body["documents"], metadatas
+            ):
+                if document is not None:
+                    yield StoredChunk(chunk_id, document, metadata or {})
+            if len(ids) < page_size:
+                return
+            offset += page_size
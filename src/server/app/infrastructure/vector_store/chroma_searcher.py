@@ -0,0 +1,98 @@
+"""
+Vector retriever over the ChromaDB collection of the knowledge base.
+
+Embeds the query with the Ollama embedding model that embedded the
+collection and asks ChromaDB for its nearest chunks, with the metadata
+filter translated into a Chroma "where" clause, so the filter applies
+before the nearest-neighbour ranking as it does in BM25.
+
+When Ollama or ChromaDB is unreachable the retriever returns no results
+(and logs a warning), so hybrid search degrades to keyword-only instead
+of failing.
+"""
+
+import logging
+from typing import Any, Protocol
+
+import httpx
+
+from app.domain.entities import SearchFilter
+
+from .chroma_client import ChromaHttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbedder(Protocol):
+    """Text embedding model, e.g. app.infrastructure.llm.OllamaClient."""
+
+    async def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+def chroma_where(filters: SearchFilter | None) -> dict[str, Any] | None:
+    """
+    Translate a metadata filter into a Chroma "where" clause.
+
+    Args:
+        filters: Conditions that must all hold
+
+    Returns:
+        dict | None: Chroma filter, or None when there is no condition
+    """
+    if filters is None or filters.is_empty:
+        return None
+    conditions: list[dict[str, Any]] = []
+    if filters.category is not None:
+        conditions.append({"category": filters.category})
+    conditions.extend({"tags": {"$contains": tag}} for tag in filters.tags)
+    if filters.language is not None:
+        conditions.append({"language": filters.language})
+    if filters.min_depth is not None:
+        conditions.append({"depth": {"$gte": filters.min_depth}})
+    if filters.max_depth is not None:
+        conditions.append({"depth": {"$lte": filters.max_depth}})
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+class ChromaVectorSearcher:
+    """
+    Embedding retriever for HybridSearchService.
+
+    Attributes:
+        chroma: ChromaDB client
+        embedder: Query embedding model
+        collection: Collection holding the knowledge base chunks
+    """
+
+    def __init__(
+        self, chroma: ChromaHttpClient, embedder: QueryEmbedder, collection: str
+    ):
+        self.chroma = chroma
+        self.embedder = embedder
+        self.collection = collection
+
+    async def search(
+        self, query: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Rank chunks by embedding similarity to a query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            filters: Only rank chunks whose metadata matches
+
+        Returns:
+            list[tuple[str, float]]: (chunk_id, score) pairs, best first
+                (score is the negated distance); empty if a service is
+                unavailable
+        """
+        try:
+            (embedding,) = await self.embedder.embed([query])
+            (neighbours,) = await self.chroma.query(
+                self.collection, [embedding], limit, chroma_where(filters)
+            )
+        except httpx.HTTPError as exc:
+            logger.warning(f"Vector search unavailable, keyword results only: {exc}")
+            return []
+        return [(chunk_id, -distance) for chunk_id, distance in neighbours]
@@ -30,9 +30,11 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.api.dependencies import load_knowledge_base
 from app.api.v1 import router as api_v1_router
 from app.core.config import settings
 from app.core.database import init_chromadb, init_sqlite
+from app.infrastructure.external import close_http_pool, open_http_pool
 
 # ═══════════════════════════════════════════════════════════════
 # Logging Setup
@@ -81,6 +83,8 @@ async def startup_event():
     This event handler runs once when the application starts and is responsible
     for:
     - Initializing database connections (ChromaDB, SQLite)
+    - Opening the pooled HTTP clients for Ollama and ChromaDB
+    - Loading the knowledge base chunks from ChromaDB into the search index
     - Logging startup information
     - Verifying LLM provider configuration
 
@@ -97,6 +101,16 @@ async def startup_event():
     sqlite_url = init_sqlite()
     logger.info(f"SQLite initialized at {sqlite_url}")
 
+    # Shared keep-alive connections to Ollama and ChromaDB
+    pool = open_http_pool()
+    logger.info(
+        f"HTTP client pool opened ({pool.max_connections_per_host} connections/host)"
+    )
+
+    # BM25 index and chat context texts, from the ingested collection
+    chunks = await load_knowledge_base()
+    logger.info(f"Knowledge base search index loaded: {chunks} chunks")
+
     # LLM Provider info
     logger.info(f"LLM Provider: {settings.LLM_PROVIDER}")
     if settings.LLM_PROVIDER == "local":
@@ -113,10 +127,12 @@ async def shutdown_event():
     This event handler runs once when the application is shutting down
     and is responsible for:
     - Closing database connections
+    - Closing the pooled HTTP clients (and their kept-alive connections)
     - Flushing logs
     - Cleaning up temporary resources
     """
     logger.info(f"Shutting down {settings.APP_NAME}")
+    await close_http_pool()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,3 @@
+"""
+Tests: Micro-benchmarks (run as modules, not collected by pytest).
+"""
@@ -0,0 +1,147 @@
+"""
+Query latency and index size benchmark for the BM25 index.
+
+Indexes the paragraphs of packages/knowledge_base (optionally replicated to
+simulate several customer knowledge bases on one node), then reports:
+    - index size: compressed posting lists vs. the same postings as Python
+      lists of (document, frequency) tuples
+    - p50 / p95 latency for exact-reference and free-text queries
+    - p50 latency of metadata-filtered queries, with the filter applied
+      while scoring vs. ranking everything and filtering afterwards
+
+Usage (from src/server):
+    python -m app.tests.benchmarks.bench_bm25 [copies]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.domain.entities import SearchFilter
+from app.domain.services.hybrid_search import parse_search_filter
+from app.infrastructure.search import BM25Index
+from app.infrastructure.search.bm25_index import _decode_postings
+
+KNOWLEDGE_BASE = Path(__file__).resolve().parents[5] / "packages" / "knowledge_base"
+QUERIES = [
+    "HU-1.2",
+    "HU-9.9",  # Not in the index: falls back to "hu", "9", "9"
+    "ADR",
+    "OWASP",
+    "FastAPI",
+    "hexagonal architecture ports and adapters",
+    "how do we handle authentication tokens securely",
+    "flutter state management",
+    "docker compose healthcheck",
+]
+FILTERED_QUERY = "how do we handle authentication tokens securely"
+FILTERS = [
+    "category:02-TECH-PACKS",
+    "tag:kb3",
+    "category:00-META tag:kb3",
+    "category:01-TEMPLATES tag:kb3 depth>=3",
+]
+
+
+def load_paragraphs() -> list[tuple[str, str]]:
+    """Return (chunk_id, text) pairs, one per Markdown paragraph."""
+    chunks = []
+    for path in sorted(KNOWLEDGE_BASE.rglob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        paragraphs = [p for p in text.split("\n\n") if p.strip()]
+        relative = path.relative_to(KNOWLEDGE_BASE)
+        chunks.extend((f"{relative}#{i}", p) for i, p in enumerate(paragraphs))
+    return chunks
+
+
+def paragraph_metadata(chunk_id: str, copy: int) -> dict:
+    """Category and depth from the path, one tag per knowledge base copy."""
+    parts = Path(chunk_id.split("#")[0]).parts
+    return {"category": parts[0], "depth": len(parts), "tags": [f"kb{copy}"]}
+
+
+def matches(metadata: dict, filters: SearchFilter) -> bool:
+    """Evaluate a filter against one document, as a post-filter would."""
+    depth = metadata["depth"]
+    return (
+        filters.category in (None, metadata["category"])
+        and all(tag in metadata["tags"] for tag in filters.tags)
+        and (filters.min_depth is None or depth >= filters.min_depth)
+        and (filters.max_depth is None or depth <= filters.max_depth)
+    )
+
+
+def p50_ms(search) -> float:
+    samples = []
+    for _ in range(20):
+        start = time.perf_counter()
+        search()
+        samples.append(time.perf_counter() - start)
+    return 1000 * statistics.median(samples)
+
+
+def naive_postings_bytes(index: BM25Index) -> int:
+    """Size of the same postings as dict[str, list[tuple[int, int]]]."""
+    total = 0
+    for data in index._postings.values():
+        pairs = list(_decode_postings(data))
+        total += sys.getsizeof(pairs)
+        for pair in pairs:
+            total += sys.getsizeof(pair) + sum(sys.getsizeof(v) for v in pair)
+    return total
+
+
+def main() -> None:
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    paragraphs = load_paragraphs()
+
+    index = BM25Index()
+    metadata = {}
+    start = time.perf_counter()
+    for copy in range(copies):
+        for chunk_id, text in paragraphs:
+            key = f"kb{copy}/{chunk_id}"
+            metadata[key] = paragraph_metadata(chunk_id, copy)
+            index.add(key, text, metadata[key])
+    build = time.perf_counter() - start
+
+    print(
+        f"{len(index)} chunks ({copies} copies), {index.terms} terms, "
+        f"built in {build:.2f} s"
+    )
+    print(f"posting lists (varint): {index.memory_bytes / 1024:10.1f} KiB")
+    print(f"as Python tuples:       {naive_postings_bytes(index) / 1024:10.1f} KiB")
+
+    print(f"\n{'query':<50}{'p50 ms':>9}{'p95 ms':>9}")
+    for query in QUERIES:
+        samples = []
+        for _ in range(50):
+            start = time.perf_counter()
+            index.search(query, limit=30)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        p50 = 1000 * statistics.median(samples)
+        p95 = 1000 * samples[int(0.95 * (len(samples) - 1))]
+        print(f"{query:<50}{p50:>9.3f}{p95:>9.3f}")
+
+    print(f"\nfiltered: {FILTERED_QUERY!r}")
+    print(f"{'filter':<42}{'matches':>9}{'pushdown':>10}{'post-filter':>13}")
+    for expression in FILTERS:
+        filters = parse_search_filter(expression)
+        allowed = sum(matches(fields, filters) for fields in metadata.values())
+
+        def post_filter(filters=filters):
+            ranked = index.search(FILTERED_QUERY, limit=len(index))
+            kept = [hit for hit in ranked if matches(metadata[hit[0]], filters)]
+            return kept[:30]
+
+        pushed = index.search(FILTERED_QUERY, limit=30, filters=filters)
+        assert [item for item, _ in pushed] == [item for item, _ in post_filter()]
+        pushdown = p50_ms(lambda: index.search(FILTERED_QUERY, 30, filters))
+        post = p50_ms(post_filter)
+        print(f"{expression:<42}{allowed:>9}{pushdown:>10.3f}{post:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Time-to-first-token benchmark for POST /api/v1/chat/message.
+
+Calls the ASGI app directly against the local fake Ollama (one token every
+DELAY seconds), timestamping each body message the app sends (TestClient
+would buffer the whole response), and measures:
+    - time to the first token event (streamed SSE)
+    - time to the end of the reply, i.e. what a blocking endpoint that
+      returns the whole answer at once would make the user wait
+
+Usage (from src/server):
+    python -m app.tests.benchmarks.bench_chat_stream [tokens]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from app.api.dependencies import get_chat_service
+from app.domain.services.chat_service import ChatService
+from app.infrastructure.external import close_http_pool, open_http_pool
+from app.main import app
+from app.tests.benchmarks.bench_search_endpoint import percentiles
+from app.tests.fixtures.fake_ollama import FakeOllama
+from app.tests.unit.test_chat_service import make_service
+
+URL = "/api/v1/chat/message"
+DELAY = 0.005
+RUNS = 20
+
+
+async def post_chat(message: str) -> tuple[float, float]:
+    """Send one chat request; return (first token, end of reply) seconds."""
+    body = json.dumps({"message": message}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": URL,
+        "raw_path": URL.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    received = False
+    first_token = None
+
+    async def receive() -> dict:
+        nonlocal received
+        if received:  # Never disconnect while the reply streams
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal first_token
+        chunk = message.get("body", b"")
+        if first_token is None and chunk.startswith(b"event: token"):
+            first_token = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first_token or 0.0, time.perf_counter() - start
+
+
+async def run(service: ChatService) -> tuple[list[float], list[float]]:
+    open_http_pool()
+    first, total = [], []
+    for _ in range(RUNS):
+        ttft, duration = await post_chat("hexagonal architecture")
+        first.append(ttft)
+        total.append(duration)
+    await close_http_pool()
+    return first, total
+
+
+def main() -> None:
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with FakeOllama([f"t{i} " for i in range(tokens)], delay=DELAY) as ollama:
+        service = make_service(ollama.url)
+        app.dependency_overrides[get_chat_service] = lambda: service
+        first, total = asyncio.run(run(service))
+        app.dependency_overrides.clear()
+    metrics = service.metrics.snapshot()
+
+    print(f"{tokens} tokens, {1000 * DELAY:.0f} ms/token")
+    print(f"{'':<28}{'p50 ms':>9}{'p95 ms':>9}")
+    print(f"{'first token (SSE)':<28}{percentiles(first)}")
+    print(f"{'full reply (blocking)':<28}{percentiles(total)}")
+    print(f"\n/chat/metrics: {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Burst benchmark for single-flight coalescing of chat requests.
+
+Simulates a team opening the same project: [burst] users ask within a few
+milliseconds, against the local fake Ollama (TOKENS tokens, DELAY s per
+token). Fake Ollama generates in parallel threads where a real node would
+slow down with each extra generation, so wall times understate the cost of
+duplicates; the generation count is the work the Ollama node has to do.
+
+Scenarios:
+    - same question (case/whitespace variants): coalesced
+    - distinct questions: nothing to share, one generation each
+
+Usage (from src/server):
+    python -m app.tests.benchmarks.bench_coalescing [burst]
+"""
+
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+
+from app.infrastructure.external import close_http_pool, open_http_pool
+from app.tests.fixtures.fake_ollama import FakeOllama
+from app.tests.unit.test_chat_service import make_service
+
+TOKENS = 50
+DELAY = 0.005
+QUESTION = "What does the architecture template require?"
+
+
+async def burst(url: str, questions: list[str]) -> dict[str, float]:
+    service = make_service(url)
+
+    async def ask(question: str) -> float:
+        await asyncio.sleep(random.uniform(0, 0.01))  # Arrivals spread 10 ms
+        start = time.perf_counter()
+        prompt = await service.prepare(question)
+        async for _ in service.stream(prompt):
+            pass
+        return time.perf_counter() - start
+
+    open_http_pool()
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(ask(q) for q in questions))
+    wall = time.perf_counter() - start
+    await close_http_pool()
+    return {
+        "wall_ms": 1000 * wall,
+        "p50_ms": 1000 * statistics.median(latencies),
+        "hit_ratio": service.replies.stats.hit_ratio or 0.0,
+    }
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    variants = [QUESTION, QUESTION.lower(), "  " + QUESTION.upper()]
+    scenarios = {
+        "same question": [variants[i % 3] for i in range(size)],
+        "distinct questions": [f"{QUESTION} ({i})" for i in range(size)],
+    }
+    print(f"burst of {size}, {TOKENS} tokens at {1000 * DELAY:.0f} ms/token")
+    print(
+        f"{'scenario':<22}{'generations':>12}{'hit ratio':>11}"
+        f"{'wall ms':>9}{'p50 ms':>9}"
+    )
+    for label, questions in scenarios.items():
+        with FakeOllama(["t "] * TOKENS, delay=DELAY) as ollama:
+            result = asyncio.run(burst(ollama.url, questions))
+            generations = len(ollama.requests)
+        print(
+            f"{label:<22}{generations:>12}{result['hit_ratio']:>11.2f}"
+            f"{result['wall_ms']:>9.0f}{result['p50_ms']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Connection reuse benchmark for the pooled HTTP clients.
+
+Sends short chat requests to the local fake Ollama (loopback, so a TCP
+handshake costs far less than over a real network) and compares:
+    - a new client, hence a new connection, per request
+    - the shared pooled client (kept-alive connections)
+then runs concurrent bursts against per-host limits and prints the pool
+metrics used to size HTTP_MAX_CONNECTIONS_PER_HOST.
+
+Usage (from src/server):
+    python -m app.tests.benchmarks.bench_http_pool [requests]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+import httpx
+
+from app.infrastructure.external.http_pool import HttpClientPool
+from app.infrastructure.llm import OllamaClient
+from app.tests.benchmarks.bench_search_endpoint import percentiles
+from app.tests.fixtures.fake_ollama import FakeOllama
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+CONCURRENCY = 32
+
+
+async def chat(client: OllamaClient) -> None:
+    async for _ in client.stream_chat(MESSAGES):
+        pass
+
+
+async def sequential(url: str, requests: int) -> None:
+    fresh, pooled = [], []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            await chat(OllamaClient(base_url=url, client=client))
+        fresh.append(time.perf_counter() - start)
+
+    pool = HttpClientPool()
+    client = OllamaClient(base_url=url, client=pool.client(url))
+    for _ in range(requests):
+        start = time.perf_counter()
+        await chat(client)
+        pooled.append(time.perf_counter() - start)
+    await pool.aclose()
+
+    print(f"{'sequential request':<28}{'p50 ms':>9}{'p95 ms':>9}")
+    print(f"{'new connection each':<28}{percentiles(fresh)}")
+    print(f"{'pooled keep-alive':<28}{percentiles(pooled)}")
+
+
+async def bursts(url: str) -> None:
+    print(f"\n{CONCURRENCY} concurrent streams, 5 ms/token")
+    print(f"{'limit':>6}{'wall ms':>9}{'peak in use':>13}{'peak wait':>11}{'reuse':>8}")
+    for limit in (4, 8, 16, 32):
+        pool = HttpClientPool(max_connections_per_host=limit)
+        client = OllamaClient(base_url=url, client=pool.client(url))
+        start = time.perf_counter()
+        for _ in range(3):
+            await asyncio.gather(*(chat(client) for _ in range(CONCURRENCY)))
+        wall = 1000 * (time.perf_counter() - start)
+        m = pool.metrics()[url + "/"]
+        await pool.aclose()
+        print(
+            f"{limit:>6}{wall:>9.0f}{m['peak_in_use']:>13}"
+            f"{m['peak_waiting']:>11}{m['reuse_ratio']:>8.2f}"
+        )
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    with FakeOllama(["pong"]) as ollama:
+        asyncio.run(sequential(ollama.url, requests))
+    with FakeOllama(["t "] * 10, delay=0.005) as ollama:
+        asyncio.run(bursts(ollama.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Latency benchmark for GET /api/v1/knowledge/search.
+
+Indexes the paragraphs of packages/knowledge_base (replicated as in
+bench_bm25) behind the real endpoint and measures, through the ASGI app
+in-process (no network):
+    - first page, JSON and NDJSON (time until the first hit line, and
+      until the cursor line ends the body)
+    - a deep page reached with a cursor vs. the same page computed by
+      ranking RANKING_DEPTH results again, and its first NDJSON line
+NDJSON lines are timestamped as the app sends them, by calling the ASGI
+app directly (TestClient would buffer the whole response).
+and prints the Server-Timing split of the last first-page request.
+
+Usage (from src/server):
+    python -m app.tests.benchmarks.bench_search_endpoint [copies]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from urllib.parse import urlencode
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_search_service
+from app.domain.services.hybrid_search import HybridSearchService
+from app.infrastructure.search import BM25Index
+from app.main import app
+from app.tests.benchmarks.bench_bm25 import load_paragraphs, paragraph_metadata
+
+URL = "/api/v1/knowledge/search"
+QUERIES = [
+    "how do we handle authentication tokens securely",
+    "flutter state management",
+    "docker compose healthcheck",
+]
+FILTER = "category:02-TECH-PACKS"
+RUNS = 30
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = 1000 * statistics.median(samples)
+    p95 = 1000 * samples[int(0.95 * (len(samples) - 1))]
+    return f"{p50:>9.2f}{p95:>9.2f}"
+
+
+async def get_ndjson(params: dict) -> tuple[float, float]:
+    """GET one NDJSON page; return (first line, whole body) seconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": URL,
+        "raw_path": URL.encode(),
+        "query_string": urlencode(params).encode(),
+        "headers": [(b"accept", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    received = False
+    first_line = None
+
+    async def receive() -> dict:
+        nonlocal received
+        if received:  # Never disconnect while the page streams
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal first_line
+        if first_line is None and b"\n" in message.get("body", b""):
+            first_line = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first_line or 0.0, time.perf_counter() - start
+
+
+def main() -> None:
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    index = BM25Index()
+    for copy in range(copies):
+        for chunk_id, text in load_paragraphs():
+            index.add(f"kb{copy}/{chunk_id}", text, paragraph_metadata(chunk_id, copy))
+    service = HybridSearchService(lexical=index)
+    app.dependency_overrides[get_search_service] = lambda: service
+    print(f"{len(index)} chunks, filter {FILTER!r}, k=10")
+    print(f"{'request':<40}{'p50 ms':>9}{'p95 ms':>9}")
+
+    samples: dict[str, list[float]] = {}
+
+    def timed(label: str, request):
+        start = time.perf_counter()
+        result = request()
+        samples.setdefault(label, []).append(time.perf_counter() - start)
+        return result
+
+    def ndjson(label: str, params: dict) -> None:
+        first_line, total = asyncio.run(get_ndjson(params))
+        samples.setdefault(f"{label} (NDJSON first line)", []).append(first_line)
+        samples.setdefault(f"{label} (NDJSON full)", []).append(total)
+
+    timing = ""
+    with TestClient(app) as client:
+        for _ in range(RUNS):
+            for query in QUERIES:
+                params = {"q": query, "k": 10, "filter": FILTER}
+                response = timed(
+                    "first page (JSON)", lambda: client.get(URL, params=params)
+                )
+                timing = response.headers["server-timing"]
+                ndjson("first page", params)
+
+                cursor = response.json()["next_cursor"]
+                for _ in range(8):  # Walk to page 10
+                    page = client.get(URL, params={**params, "cursor": cursor})
+                    cursor = page.json()["next_cursor"]
+                deep = {**params, "cursor": cursor}
+                timed("page 10 via cursor", lambda: client.get(URL, params=deep))
+                ndjson("page 10 via cursor", deep)
+                service._rankings.clear()  # Expired ranking: ranks again
+                timed("page 10 re-ranked", lambda: client.get(URL, params=deep))
+    app.dependency_overrides.clear()
+
+    for label, values in samples.items():
+        print(f"{label:<40}{percentiles(values)}")
+    print(f"\nServer-Timing (last first page): {timing}")
+
+
+if __name__ == "__main__":
+    main()
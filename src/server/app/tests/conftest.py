@@ -3,8 +3,10 @@ Tests: Conftest for pytest configuration and shared fixtures.
 """
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
 
+from app.infrastructure.external import close_http_pool, open_http_pool
 from app.main import app
 
 
@@ -15,3 +17,13 @@ async def client():
     """
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
+
+
+@pytest_asyncio.fixture
+async def http_pool():
+    """
+    Open the application HTTP client pool for one async test, as startup
+    does, and close it afterwards so no connection outlives the test loop.
+    """
+    yield open_http_pool()
+    await close_http_pool()
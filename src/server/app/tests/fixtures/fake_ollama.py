@@ -0,0 +1,89 @@
+"""
+Local fake of the Ollama streaming chat API, for tests and benchmarks.
+
+Serves POST /api/chat on 127.0.0.1 (random port) from a background thread,
+streaming a fixed reply as NDJSON one token at a time with a delay between
+tokens, like a model generating. It records the requests it receives and
+whether a client hung up before the reply was complete.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Concurrent connects in load benchmarks
+
+
+class FakeOllama:
+    """
+    Fake Ollama server; use as a context manager.
+
+    Attributes:
+        tokens: Reply pieces streamed for every request
+        delay: Seconds before each piece
+        requests: JSON bodies received
+        cancelled: Set when a client disconnects mid-reply
+    """
+
+    def __init__(self, tokens: list[str], delay: float = 0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.requests: list[dict] = []
+        self.cancelled = threading.Event()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # TCP_NODELAY, as Ollama's Go server: without it a token written
+            # right after the headers waits for a delayed ACK (~40 ms) on
+            # kept-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                fake.requests.append(json.loads(self.rfile.read(length)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in fake.tokens:
+                        time.sleep(fake.delay)
+                        line = {"message": {"role": "assistant", "content": token}}
+                        self._write_chunk({**line, "done": False})
+                    self._write_chunk({"done": True, "eval_count": len(fake.tokens)})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    fake.cancelled.set()
+
+            def _write_chunk(self, data: dict) -> None:
+                body = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
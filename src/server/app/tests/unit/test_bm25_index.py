@@ -0,0 +1,145 @@
+import pytest
+
+from app.domain.entities import SearchFilter
+from app.infrastructure.search import BM25Index, tokenize
+from app.infrastructure.search.bm25_index import _decode_postings, _write_varint
+
+DOCS = {
+    "reqs.md#0": "HU-2.1 describes the knowledge base search user story.",
+    "reqs.md#1": "HU-1.2 covers login. The user story mentions search too.",
+    "adr.md#0": "ADR 004: we chose FastAPI over Flask for async support.",
+    "sec.md#0": "OWASP top ten: injection, broken auth and more. OWASP rules.",
+}
+
+
+def build() -> BM25Index:
+    index = BM25Index()
+    for chunk_id, text in DOCS.items():
+        index.add(chunk_id, text)
+    return index
+
+
+def test_tokenize_keeps_compound_identifiers():
+    assert tokenize("See HU-2.1, ADR-004!") == [
+        "see",
+        "hu-2.1",
+        "hu",
+        "2",
+        "1",
+        "adr-004",
+        "adr",
+        "004",
+    ]
+
+
+def test_varint_postings_roundtrip():
+    data = bytearray()
+    pairs = [(0, 1), (5, 300), (200, 2), (70000, 1)]
+    previous = 0
+    for doc, frequency in pairs:
+        _write_varint(data, doc - previous)
+        _write_varint(data, frequency)
+        previous = doc
+    assert list(_decode_postings(data)) == pairs
+    assert len(data) == 1 + 1 + 1 + 2 + 2 + 1 + 3 + 1
+
+
+def test_exact_reference_ranks_first():
+    index = build()
+    results = index.search("HU-2.1 search", limit=2)
+    assert results[0][0] == "reqs.md#0"
+    assert results[0][1] > results[1][1]
+    assert index.search("owasp")[0][0] == "sec.md#0"
+    assert index.search("nothing matches") == []
+
+
+def test_remove_and_replace():
+    index = build()
+    assert index.remove("sec.md#0")
+    assert not index.remove("sec.md#0")
+    assert index.search("owasp") == []
+
+    index.add("adr.md#0", "OWASP guidance now lives here")
+
+    assert len(index) == 3
+    assert [item for item, _ in index.search("owasp")] == ["adr.md#0"]
+    assert index.search("fastapi") == []
+
+
+def test_updating_a_document_keeps_scores():
+    index = build()
+    before = dict(index.search("search user story owasp"))
+
+    index.add("reqs.md#0", DOCS["reqs.md#0"])
+    after = dict(index.search("search user story owasp"))
+
+    assert after.keys() == before.keys()
+    assert all(after[key] == pytest.approx(before[key]) for key in before)
+
+
+def test_removed_documents_are_compacted():
+    index = build()
+    index.add("adr.md#0", DOCS["adr.md#0"], {"language": "en"})
+    before = index.search("search user story owasp fastapi")
+
+    for _ in range(10):
+        index.add("reqs.md#1", DOCS["reqs.md#1"])
+    index.remove("sec.md#0")
+    index.add("sec.md#0", DOCS["sec.md#0"])
+
+    assert len(index._ids) < 2 * len(index)  # Tombstones stay bounded
+    after = index.search("search user story owasp fastapi")
+    assert [item for item, _ in after] == [item for item, _ in before]
+    assert [score for _, score in after] == pytest.approx([s for _, s in before])
+    english = index.search("fastapi", filters=SearchFilter(language="en"))
+    assert [item for item, _ in english] == ["adr.md#0"]
+    index.remove("adr.md#0")
+    assert "fastapi" not in index._postings  # Only removed documents had it
+
+
+def test_add_many_from_chunk_stream():
+    class Chunk:
+        def __init__(self, chunk_id, content):
+            self.chunk_id = chunk_id
+            self.content = content
+
+    index = BM25Index()
+    assert index.add_many(Chunk(key, text) for key, text in DOCS.items()) == 4
+    assert "adr.md#0" in index
+    assert index.memory_bytes < sum(len(text) for text in DOCS.values())
+
+
+def test_metadata_filters():
+    index = BM25Index()
+    metadata = {
+        "reqs.md#0": {"category": "03-EXAMPLES", "tags": ["reqs"], "language": "es"},
+        "reqs.md#1": {"category": "03-EXAMPLES", "tags": ["reqs"], "language": "en"},
+        "adr.md#0": {"category": "02-TECH-PACKS", "language": "en", "depth": 3},
+    }
+    for key, text in DOCS.items():
+        index.add(key, text, metadata.get(key))
+
+    def ids(query, **conditions):
+        hits = index.search(query, filters=SearchFilter(**conditions))
+        return {item for item, _ in hits}
+
+    assert ids("search user story") == {"reqs.md#0", "reqs.md#1"}
+    assert ids("search user story", language="en") == {"reqs.md#1"}
+    assert ids("search", category="03-EXAMPLES", tags=["reqs"]) == {
+        "reqs.md#0",
+        "reqs.md#1",
+    }
+    assert ids("fastapi", min_depth=2, max_depth=3) == {"adr.md#0"}
+    assert ids("fastapi", max_depth=2) == set()
+    assert ids("owasp", category="03-EXAMPLES") == set()  # No metadata, no match
+    assert ids("owasp", category="missing") == set()
+
+    index.remove("reqs.md#1")
+    assert ids("search", language="en") == set()
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        BM25Index(b=2.0)
+    with pytest.raises(ValueError):
+        build().search("hu", limit=0)
@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_chat_service
+from app.domain.services.chat_service import ChatService, ChatStreamStats
+from app.domain.services.hybrid_search import HybridSearchService
+from app.infrastructure.llm import OllamaClient
+from app.infrastructure.search import BM25Index, ChunkStore
+from app.tests.fixtures.fake_ollama import FakeOllama
+
+CHUNKS = {
+    "adr#1": "Hexagonal architecture keeps adapters at the edges",
+    "adr#2": "Use event sourcing only where an audit log is required",
+    "ops#1": "Docker compose healthcheck for the backend service",
+}
+
+
+def make_service(ollama_url: str) -> ChatService:
+    index, chunks = BM25Index(), ChunkStore()
+    for chunk_id, text in CHUNKS.items():
+        index.add(chunk_id, text, {"category": chunk_id.split("#")[0]})
+        chunks.add(chunk_id, text)
+    return ChatService(
+        search=HybridSearchService(lexical=index),
+        llm=OllamaClient(base_url=ollama_url, model="fake"),
+        chunks=chunks,
+    )
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data[6:])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_prepare_puts_retrieved_chunks_in_the_prompt():
+    service = make_service("http://unused")
+    prompt = await service.prepare("hexagonal architecture adapters")
+    assert prompt.sources[0] == "adr#1"
+    system, user = prompt.messages
+    assert "[adr#1]\n" + CHUNKS["adr#1"] in system["content"]
+    assert user == {"role": "user", "content": "hexagonal architecture adapters"}
+
+    service.max_context_chars = 10
+    prompt = await service.prepare("hexagonal architecture adapters")
+    assert prompt.sources == ["adr#1"]
+    assert prompt.messages[0]["content"].endswith("[adr#1]\nHexagonal ")
+
+
+@pytest.mark.asyncio
+async def test_stream_relays_tokens_and_records_metrics(http_pool):
+    with FakeOllama(["Hex", "agonal", " it", " is"]) as ollama:
+        service = make_service(ollama.url)
+        prompt = await service.prepare("hexagonal", None)
+        stats = ChatStreamStats()
+        reply = [token async for token in service.stream(prompt, stats)]
+
+    assert reply == ["Hex", "agonal", " it", " is"]
+    assert ollama.requests[0]["model"] == "fake"
+    assert ollama.requests[0]["stream"] is True
+    assert stats.tokens == 4
+    assert stats.ttft is not None and stats.tokens_per_second is not None
+    snapshot = service.metrics.snapshot()
+    assert snapshot["streams"] == snapshot["completed"] == 1
+    assert snapshot["ttft_p50_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_the_generation(http_pool):
+    with FakeOllama([f"t{i} " for i in range(200)], delay=0.005) as ollama:
+        service = make_service(ollama.url)
+        prompt = await service.prepare("hexagonal")
+        stream = service.stream(prompt)
+        for _ in range(3):
+            await anext(stream)
+        await stream.aclose()
+        # The fake notices the closed connection on its next writes
+        assert ollama.cancelled.wait(timeout=5)
+
+    assert service.metrics.cancelled == 1
+    assert service.metrics.completed == 0
+
+
+def test_chat_endpoint_streams_sse_events():
+    from app.main import app
+
+    with FakeOllama(["Use", " adapters"]) as ollama:
+        service = make_service(ollama.url)
+        app.dependency_overrides[get_chat_service] = lambda: service
+        try:
+            with TestClient(app) as client:
+                resp = client.post(
+                    "/api/v1/chat/message",
+                    json={"message": "hexagonal adapters", "filter": "category:adr"},
+                )
+                metrics = client.get("/api/v1/chat/metrics").json()
+        finally:
+            app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(resp.text)
+    assert events[0] == ("context", {"sources": ["adr#1"]})
+    assert events[1:3] == [("token", {"text": "Use"}), ("token", {"text": " adapters"})]
+    name, done = events[3]
+    assert name == "done" and done["tokens"] == 2 and done["ttft_ms"] is not None
+    assert metrics["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_the_generation(http_pool):
+    from app.main import app
+
+    with FakeOllama([f"t{i} " for i in range(200)], delay=0.005) as ollama:
+        service = make_service(ollama.url)
+        app.dependency_overrides[get_chat_service] = lambda: service
+        first_token = asyncio.Event()
+        requested = False
+
+        async def receive() -> dict:
+            nonlocal requested
+            if not requested:
+                requested = True
+                body = json.dumps({"message": "hexagonal"}).encode()
+                return {"type": "http.request", "body": body}
+            await first_token.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message.get("body", b"").startswith(b"event: token"):
+                first_token.set()
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/chat/message",
+            "headers": [(b"content-type", b"application/json")],
+            "query_string": b"",
+        }
+        try:
+            await asyncio.wait_for(app(scope, receive, send), timeout=5)
+        finally:
+            app.dependency_overrides.clear()
+        assert ollama.cancelled.wait(timeout=5)
+
+    assert service.metrics.cancelled == 1
+
+
+def test_chat_endpoint_reports_upstream_failure_as_error_event():
+    from app.main import app
+
+    service = make_service("http://127.0.0.1:9")  # Nothing listens there
+    app.dependency_overrides[get_chat_service] = lambda: service
+    try:
+        with TestClient(app) as client:
+            resp = client.post("/api/v1/chat/message", json={"message": "docker"})
+            bad = client.post("/api/v1/chat/message", json={"message": "   "})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert parse_sse(resp.text)[-1] == ("error", {"detail": "Model stream failed"})
+    assert service.metrics.failed == 1
+    assert bad.status_code == 400
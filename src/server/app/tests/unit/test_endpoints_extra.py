@@ -1,19 +1,19 @@
 from fastapi.testclient import TestClient
 
 
-def test_chat_endpoint_not_implemented():
+def test_chat_endpoint_requires_message():
     from app.main import app
 
     with TestClient(app) as client:
         resp = client.post("/api/v1/chat/message")
-        assert resp.status_code == 200
-        assert resp.json() == {"message": "Chat endpoint not yet implemented"}
+        assert resp.status_code == 422
 
 
-def test_knowledge_endpoint_not_implemented():
+def test_knowledge_search_empty_index():
     from app.main import app
 
     with TestClient(app) as client:
-        resp = client.get("/api/v1/knowledge/search")
+        resp = client.get("/api/v1/knowledge/search", params={"q": "HU-2.1"})
         assert resp.status_code == 200
-        assert resp.json() == {"message": "Knowledge search not yet implemented"}
+        assert resp.json() == {"query": "HU-2.1", "results": [], "next_cursor": None}
+        assert "retrieval;dur=" in resp.headers["server-timing"]
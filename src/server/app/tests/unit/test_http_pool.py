@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infrastructure.external import http_pool
+from app.infrastructure.external.http_pool import HttpClientPool
+from app.infrastructure.llm import OllamaClient
+from app.infrastructure.vector_store import ChromaHttpClient
+from app.tests.fixtures.fake_ollama import FakeOllama
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+async def chat(client: OllamaClient) -> str:
+    return "".join([token async for token in client.stream_chat(MESSAGES)])
+
+
+@pytest.mark.asyncio
+async def test_sequential_requests_reuse_one_connection():
+    pool = HttpClientPool()
+    with FakeOllama(["a", "b"]) as ollama:
+        client = OllamaClient(base_url=ollama.url, client=pool.client(ollama.url))
+        for _ in range(5):
+            assert await chat(client) == "ab"
+        await pool.aclose()
+
+    metrics = pool.metrics()[ollama.url + "/"]
+    assert metrics["requests"] == 5
+    assert metrics["new_connections"] == 1
+    assert metrics["reuse_ratio"] == pytest.approx(0.8)
+    assert metrics["in_use"] == metrics["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_queues_requests():
+    pool = HttpClientPool(max_connections_per_host=1)
+    with FakeOllama(["a", "b", "c"], delay=0.02) as ollama:
+        client = OllamaClient(base_url=ollama.url, client=pool.client(ollama.url))
+        replies = await asyncio.gather(*(chat(client) for _ in range(3)))
+        await pool.aclose()
+
+    assert replies == ["abc"] * 3
+    metrics = pool.metrics()[ollama.url + "/"]
+    assert metrics["peak_in_use"] == 1
+    assert metrics["peak_waiting"] >= 2
+    assert metrics["new_connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_and_read_deadlines_are_separate():
+    pool = HttpClientPool(connect_timeout=1.0, read_timeout=0.05)
+    assert pool.timeout.connect == 1.0
+    assert pool.timeout.read == 0.05
+
+    with FakeOllama(["slow"], delay=0.2) as ollama:
+        client = OllamaClient(base_url=ollama.url, client=pool.client(ollama.url))
+        with pytest.raises(httpx.ReadTimeout):
+            await chat(client)
+        await pool.aclose()
+    assert pool.metrics()[ollama.url + "/"]["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_explicit_zero_overrides_the_setting():
+    pool = HttpClientPool(keepalive_expiry=0, pool_timeout=0)
+    assert pool.keepalive_expiry == 0
+    assert pool.timeout.pool == 0
+    with FakeOllama(["a"]) as ollama:
+        client = OllamaClient(base_url=ollama.url, client=pool.client(ollama.url))
+        for _ in range(3):
+            assert await chat(client) == "a"
+        await pool.aclose()
+
+    assert pool.metrics()[ollama.url + "/"]["new_connections"] == 3
+
+
+def test_one_client_per_origin():
+    pool = HttpClientPool()
+    ollama = pool.client("http://ollama:11434/api/chat")
+    assert pool.client("http://ollama:11434") is ollama
+    assert pool.client("http://chromadb:8000") is not ollama
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_when_host_is_at_its_limit():
+    pool = HttpClientPool(max_connections_per_host=1, pool_timeout=0.05)
+    with FakeOllama(["slow"], delay=0.2) as ollama:
+        client = OllamaClient(base_url=ollama.url, client=pool.client(ollama.url))
+        results = await asyncio.gather(
+            chat(client), chat(client), return_exceptions=True
+        )
+        await pool.aclose()
+
+    assert "slow" in results
+    assert any(isinstance(result, httpx.PoolTimeout) for result in results)
+    assert pool.metrics()[ollama.url + "/"]["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_chroma_client_parses_query_results():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/collections/kb"):
+            return httpx.Response(200, json={"id": "c-1", "name": "kb"})
+        assert request.url.path.endswith("/collections/c-1/query")
+        return httpx.Response(
+            200, json={"ids": [["a", "b"]], "distances": [[0.1, 0.4]]}
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    chroma = ChromaHttpClient(base_url="http://chroma:8000", client=client)
+    assert await chroma.query("kb", [[0.0, 1.0]], n_results=2) == [
+        [("a", 0.1), ("b", 0.4)]
+    ]
+    await client.aclose()
+
+
+def test_app_lifecycle_opens_and_closes_the_pool():
+    from app.main import app
+
+    with TestClient(app) as client:
+        ollama = http_pool.get_http_pool().client("http://ollama:11434")
+        resp = client.get("/api/v1/system/http-pool")
+        assert resp.status_code == 200
+        assert resp.json()["http://ollama:11434/"]["requests"] == 0
+
+    assert http_pool._pool is None
+    assert ollama.is_closed
@@ -0,0 +1,330 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import dependencies
+from app.api.dependencies import get_search_service
+from app.domain.entities import SearchFilter
+from app.domain.services.hybrid_search import (
+    HybridSearchService,
+    parse_search_filter,
+    reciprocal_rank_fusion,
+)
+from app.infrastructure.llm import OllamaClient
+from app.infrastructure.search import BM25Index
+from app.infrastructure.vector_store import (
+    ChromaHttpClient,
+    ChromaVectorSearcher,
+    chroma_where,
+)
+
+RECORDS = [
+    ("adr.md#0", "We chose FastAPI for async support", {"category": "adr"}),
+    ("reqs.md#0", "HU-2.1 knowledge search", {"tags": ["reqs"], "depth": 2}),
+    ("empty.md#0", None, {}),
+]
+
+
+class FakeVectorSearcher:
+    def __init__(self, ranking: list[str]):
+        self.ranking = ranking
+        self.filters: list[SearchFilter | None] = []
+
+    async def search(
+        self, query: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[tuple[str, float]]:
+        self.filters.append(filters)
+        return [(item, 1.0 - i / 10) for i, item in enumerate(self.ranking[:limit])]
+
+
+def make_service(vector_ranking: list[str] | None = None) -> HybridSearchService:
+    index = BM25Index()
+    index.add("a", "HU-2.1 search story", {"category": "reqs", "language": "es"})
+    index.add("b", "search ranking with vectors", {"category": "adr", "depth": 2})
+    index.add("c", "unrelated deployment notes", {"category": "adr", "depth": 3})
+    vector = FakeVectorSearcher(vector_ranking) if vector_ranking else None
+    return HybridSearchService(lexical=index, vector=vector)
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=1)
+    assert [item for item, _ in fused] == ["b", "a", "c"]
+    assert fused[0][1] == pytest.approx(1 / 3 + 1 / 2)
+    with pytest.raises(ValueError):
+        reciprocal_rank_fusion([["a"]], k=0)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_both_rankings():
+    service = make_service(vector_ranking=["c", "b"])
+    hits = await service.search("search", limit=3)
+    ranks = [(hit.chunk_id, hit.lexical_rank, hit.vector_rank) for hit in hits]
+    # "b" is found by both retrievers, so it beats each one's top result
+    assert ranks == [("b", 1, 2), ("c", None, 1), ("a", 2, None)]
+
+
+@pytest.mark.asyncio
+async def test_keyword_only_without_vector_searcher():
+    hits = await make_service().search("HU-2.1", limit=5)
+    assert [hit.chunk_id for hit in hits] == ["a"]
+    assert hits[0].vector_rank is None
+    with pytest.raises(ValueError):
+        await make_service().search("   ")
+
+
+def test_parse_search_filter():
+    parsed = parse_search_filter(
+        "category:02-TECH-PACKS tag:python,tag:api lang:ES depth>1"
+    )
+    assert parsed.category == "02-TECH-PACKS"
+    assert parsed.tags == ["python", "api"]
+    assert parsed.language == "es"
+    assert (parsed.min_depth, parsed.max_depth) == (2, None)
+    exact = parse_search_filter("depth:3")
+    assert (exact.min_depth, exact.max_depth) == (3, 3)
+    assert parse_search_filter("  ").is_empty
+    for invalid in ("category", "owner:me", "tag<=x", "depth:deep"):
+        with pytest.raises(ValueError):
+            parse_search_filter(invalid)
+
+
+@pytest.mark.asyncio
+async def test_filters_reach_both_retrievers():
+    service = make_service(vector_ranking=["c", "b"])
+    filters = SearchFilter(category="adr", max_depth=2)
+    hits = await service.search("search", limit=3, filters=filters)
+    # BM25 applies the filter ("a" is excluded); the fake vector side does not
+    assert [hit.chunk_id for hit in hits] == ["b", "c"]
+    assert service.vector.filters == [filters]
+
+
+def test_search_endpoint():
+    from app.main import app
+
+    app.dependency_overrides[get_search_service] = lambda: make_service(["c"])
+    try:
+        with TestClient(app) as client:
+            resp = client.get("/api/v1/knowledge/search", params={"q": "HU-2.1"})
+            missing = client.get("/api/v1/knowledge/search")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["query"] == "HU-2.1"
+    assert [hit["chunk_id"] for hit in body["results"]] == ["a", "c"]
+    assert body["results"][0]["lexical_rank"] == 1
+    assert missing.status_code == 422
+
+
+def test_search_endpoint_filter():
+    from app.main import app
+
+    app.dependency_overrides[get_search_service] = lambda: make_service()
+    try:
+        with TestClient(app) as client:
+            filtered = client.get(
+                "/api/v1/knowledge/search",
+                params={"q": "search", "filter": "category:adr depth<=2"},
+            )
+            invalid = client.get(
+                "/api/v1/knowledge/search",
+                params={"q": "search", "filter": "owner:me"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert filtered.status_code == 200
+    assert [hit["chunk_id"] for hit in filtered.json()["results"]] == ["b"]
+    assert invalid.status_code == 400
+
+
+class CountingIndex(BM25Index):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def search(self, query, limit=10, filters=None):
+        self.calls += 1
+        return super().search(query, limit, filters)
+
+
+def paged_service(**options) -> HybridSearchService:
+    index = CountingIndex()
+    for i in range(25):
+        index.add(f"doc{i:02d}", "search " * (25 - i), {"depth": i % 3})
+    return HybridSearchService(lexical=index, **options)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_reuse_the_ranking():
+    service = paged_service()
+    seen, cursor = [], None
+    while True:
+        page = await service.search_page("search", k=10, cursor=cursor)
+        seen.extend(hit.chunk_id for hit in page.hits)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == [f"doc{i:02d}" for i in range(25)]
+    assert service.lexical.calls == 1  # Pages 2 and 3 are slices
+
+
+@pytest.mark.asyncio
+async def test_cursor_key_ignores_case_and_whitespace():
+    service = paged_service()
+    first = await service.search_page("Search", k=10)
+    second = await service.search_page("  search ", k=10, cursor=first.next_cursor)
+
+    assert second.hits[0].chunk_id == "doc10"
+    assert service.lexical.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_ranking_is_recomputed():
+    service = paged_service(ranking_ttl=0.0)
+    first = await service.search_page("search", k=10)
+    second = await service.search_page("search", k=10, cursor=first.next_cursor)
+
+    assert service.lexical.calls == 2
+    assert second.hits[0].chunk_id == "doc10"
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursors():
+    service = paged_service()
+    page = await service.search_page("search", k=5, filters=SearchFilter(max_depth=1))
+
+    with pytest.raises(ValueError, match="another query"):
+        await service.search_page("search", k=5, cursor=page.next_cursor)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await service.search_page("search", k=5, cursor="not-a-cursor")
+
+
+def test_search_endpoint_pages_and_ndjson():
+    from app.main import app
+
+    service = paged_service()
+    app.dependency_overrides[get_search_service] = lambda: service
+    try:
+        with TestClient(app) as client:
+            params = {"q": "search", "k": 10, "filter": "depth<=1"}
+            first = client.get("/api/v1/knowledge/search", params=params)
+            cursor = first.json()["next_cursor"]
+            streamed = client.get(
+                "/api/v1/knowledge/search",
+                params={**params, "cursor": cursor},
+                headers={"Accept": "application/x-ndjson"},
+            )
+            stale = client.get(
+                "/api/v1/knowledge/search",
+                params={"q": "other", "cursor": cursor},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    matching = [f"doc{i:02d}" for i in range(25) if i % 3 <= 1]
+    assert [hit["chunk_id"] for hit in first.json()["results"]] == matching[:10]
+    timing = first.headers["server-timing"]
+    for stage in ("filter", "retrieval", "fusion", "serialize"):
+        assert f"{stage};dur=" in timing
+
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    assert "serialize;dur=" not in streamed.headers["server-timing"]
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [line["chunk_id"] for line in lines[:-1]] == matching[10:]
+    assert lines[-1] == {"next_cursor": None}
+    assert stale.status_code == 400
+
+
+class FakeChroma:
+    """ChromaDB and Ollama embedding endpoints, for an httpx MockTransport."""
+
+    def __init__(self, records=RECORDS, fail: bool = False):
+        self.records = records
+        self.fail = fail
+        self.queries: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.fail:
+            raise httpx.ConnectError("connection refused", request=request)
+        path = request.url.path
+        if path == "/api/embed":
+            return httpx.Response(200, json={"embeddings": [[0.1, 0.2]]})
+        if path.endswith("/collections/softarchitect"):
+            return httpx.Response(200, json={"id": "c-1"})
+        body = json.loads(request.content)
+        if path.endswith("/c-1/get"):
+            page = self.records[body["offset"] : body["offset"] + body["limit"]]
+            return httpx.Response(
+                200,
+                json={
+                    "ids": [record[0] for record in page],
+                    "documents": [record[1] for record in page],
+                    "metadatas": [record[2] for record in page],
+                },
+            )
+        self.queries.append(body)
+        return httpx.Response(
+            200, json={"ids": [["reqs.md#0", "adr.md#0"]], "distances": [[0.2, 0.5]]}
+        )
+
+
+def test_chroma_where_translates_filters():
+    assert chroma_where(None) is None
+    assert chroma_where(SearchFilter(category="adr")) == {"category": "adr"}
+    assert chroma_where(SearchFilter(tags=["a"], language="es", max_depth=2)) == {
+        "$and": [
+            {"tags": {"$contains": "a"}},
+            {"language": "es"},
+            {"depth": {"$lte": 2}},
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_chroma_vector_searcher_ranks_and_degrades():
+    fake = FakeChroma()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    searcher = ChromaVectorSearcher(
+        ChromaHttpClient(base_url="http://chroma:8000", client=client),
+        OllamaClient(base_url="http://ollama:11434", client=client),
+        "softarchitect",
+    )
+
+    hits = await searcher.search("search", 2, SearchFilter(language="es"))
+    assert [item for item, _ in hits] == ["reqs.md#0", "adr.md#0"]
+    assert fake.queries[0]["query_embeddings"] == [[0.1, 0.2]]
+    assert fake.queries[0]["where"] == {"language": "es"}
+
+    fake.fail = True
+    assert await searcher.search("search", 2) == []
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_load_knowledge_base_from_chroma():
+    fake = FakeChroma()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    chroma = ChromaHttpClient(base_url="http://chroma:8000", client=client)
+    paged = [chunk.chunk_id async for chunk in chroma.iter_chunks("softarchitect", 2)]
+    assert paged == ["adr.md#0", "reqs.md#0"]  # Records without text skipped
+    dependencies.get_bm25_index.cache_clear()
+    dependencies.get_chunk_store.cache_clear()
+    try:
+        assert await dependencies.load_knowledge_base(chroma) == 2
+        index = dependencies.get_bm25_index()
+        assert [item for item, _ in index.search("fastapi")] == ["adr.md#0"]
+        by_tag = index.search("search", filters=SearchFilter(tags=["reqs"]))
+        assert [item for item, _ in by_tag] == ["reqs.md#0"]
+        assert dependencies.get_chunk_store().get("reqs.md#0") == RECORDS[1][1]
+
+        fake.fail = True
+        assert await dependencies.load_knowledge_base(chroma) == 0  # Starts anyway
+    finally:
+        dependencies.get_bm25_index.cache_clear()
+        dependencies.get_chunk_store.cache_clear()
+        await client.aclose()
@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from app.core.timing import ServerTiming
+from app.domain.entities import SearchFilter
+from app.domain.services.hybrid_search import HybridSearchService, query_key
+from app.domain.services.single_flight import FanOut, SingleFlight
+from app.infrastructure.search import BM25Index
+from app.tests.fixtures.fake_ollama import FakeOllama
+from app.tests.unit.test_chat_service import make_service
+
+
+class Upstream:
+    """Async stream of n items, recording how many times it was opened."""
+
+    def __init__(self, n: int, delay: float = 0.01, fail_at: int | None = None):
+        self.n = n
+        self.delay = delay
+        self.fail_at = fail_at
+        self.opened = 0
+        self.closed = 0
+
+    async def stream(self):
+        self.opened += 1
+        try:
+            for i in range(self.n):
+                await asyncio.sleep(self.delay)
+                if i == self.fail_at:
+                    raise RuntimeError("upstream failed")
+                yield i
+        finally:
+            self.closed += 1
+
+
+async def collect(stream) -> list:
+    return [item async for item in stream]
+
+
+def test_query_key_normalizes_case_whitespace_and_tag_order():
+    a = SearchFilter(category="adr", tags=["x", "y"])
+    b = SearchFilter(category="adr", tags=["y", "x"])
+    assert query_key("What  does\nthe template", a) == query_key(
+        "what does the Template ", b
+    )
+    assert query_key("q", a) != query_key("q", None)
+    assert query_key("q", None, "llama") != query_key("q", None, "qwen")
+    assert query_key("q", SearchFilter()) == query_key("q", None)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_computation():
+    flights: SingleFlight[int] = SingleFlight()
+    runs = 0
+
+    async def compute() -> int:
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flights.do("k", compute) for _ in range(5)))
+    assert results == [42] * 5
+    assert runs == 1
+    assert flights.stats.snapshot() == {"calls": 5, "coalesced": 4, "hit_ratio": 0.8}
+    assert len(flights) == 0
+
+    await flights.do("k", compute)  # Finished work is not cached
+    assert runs == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_errors_and_survives_one_cancellation():
+    flights: SingleFlight[int] = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flights.do("e", fail), flights.do("e", fail), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flights.do("s", slow))
+    second = asyncio.create_task(flights.do("s", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "done"
+
+    lonely = asyncio.create_task(flights.do("c", slow))
+    await asyncio.sleep(0.01)
+    lonely.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await lonely
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_fan_out_shares_one_stream_and_replays_for_late_subscribers():
+    replies: FanOut[int] = FanOut()
+    upstream = Upstream(5)
+    early = asyncio.create_task(collect(replies.subscribe("k", upstream.stream)))
+    await asyncio.sleep(0.025)  # A few items already produced
+    late = asyncio.create_task(collect(replies.subscribe("k", upstream.stream)))
+
+    assert await early == await late == [0, 1, 2, 3, 4]
+    assert upstream.opened == upstream.closed == 1
+    assert replies.stats.hit_ratio == 0.5
+    assert len(replies) == 0
+
+
+@pytest.mark.asyncio
+async def test_fan_out_cancels_upstream_when_the_last_subscriber_leaves():
+    replies: FanOut[int] = FanOut()
+    upstream = Upstream(100)
+    first = replies.subscribe("k", upstream.stream)
+    second = replies.subscribe("k", upstream.stream)
+    assert await anext(first) == 0
+    assert await anext(second) == 0
+
+    await first.aclose()
+    assert await anext(second) == 1  # Still generating for the other one
+    await second.aclose()
+    await asyncio.sleep(0.02)
+    assert upstream.closed == 1
+    assert len(replies) == 0
+
+
+@pytest.mark.asyncio
+async def test_fan_out_raises_upstream_errors_to_every_subscriber():
+    replies: FanOut[int] = FanOut()
+    upstream = Upstream(5, fail_at=2)
+    results = await asyncio.gather(
+        collect(replies.subscribe("k", upstream.stream)),
+        collect(replies.subscribe("k", upstream.stream)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.opened == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_chats_share_one_generation(http_pool):
+    with FakeOllama(["Use", " adapters"], delay=0.01) as ollama:
+        service = make_service(ollama.url)
+
+        async def ask(message: str) -> str:
+            prompt = await service.prepare(message)
+            return "".join([token async for token in service.stream(prompt)])
+
+        replies = await asyncio.gather(
+            ask("Hexagonal adapters?"), ask("hexagonal  adapters?"), ask("docker")
+        )
+
+    assert replies == ["Use adapters"] * 3
+    assert len(ollama.requests) == 2  # One per distinct question
+    assert service.replies.stats.snapshot()["coalesced"] == 1
+    assert service.metrics.completed == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_retrieval():
+    class SlowVectorSearcher:
+        calls = 0
+
+        async def search(self, query, limit, filters=None):
+            SlowVectorSearcher.calls += 1
+            await asyncio.sleep(0.01)
+            return [("a", 1.0)]
+
+    index = BM25Index()
+    index.add("a", "hexagonal architecture")
+    service = HybridSearchService(lexical=index, vector=SlowVectorSearcher())
+    pages = await asyncio.gather(
+        *(service.search_page("Hexagonal", k=5) for _ in range(4))
+    )
+    assert all([hit.chunk_id for hit in page.hits] == ["a"] for page in pages)
+    assert SlowVectorSearcher.calls == 1
+    assert service.flights.stats.hit_ratio == 0.75
+
+
+@pytest.mark.asyncio
+async def test_coalesced_search_times_its_wait_as_retrieval():
+    class SlowVectorSearcher:
+        async def search(self, query, limit, filters=None):
+            await asyncio.sleep(0.02)
+            return [("a", 1.0)]
+
+    index = BM25Index()
+    index.add("a", "hexagonal architecture")
+    service = HybridSearchService(lexical=index, vector=SlowVectorSearcher())
+
+    async def timed_search() -> ServerTiming:
+        timing = ServerTiming()
+        with timing.activate():
+            await service.search_page("hexagonal", k=5)
+        return timing
+
+    leader, follower = await asyncio.gather(timed_search(), timed_search())
+
+    assert service.flights.stats.coalesced == 1
+    assert set(leader.durations) == {"retrieval", "fusion"}
+    assert set(follower.durations) == {"retrieval"}
+    assert follower.durations["retrieval"] >= 0.01
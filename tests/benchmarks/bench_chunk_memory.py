@@ -0,0 +1,143 @@
+"""Memory benchmark for the chunk and metadata representation.
+
+Builds a synthetic corpus of 100k chunks twice: once with plain dataclasses
+equivalent to the previous DocumentChunk/DocumentMetadata (per-instance
+__dict__, one metadata object and fresh category/tag strings per chunk) and
+once with the current slotted classes (one shared metadata per document,
+interned strings). The chunk text objects are shared by both runs so only
+the representation overhead is measured.
+
+Usage:
+    python -m tests.benchmarks.bench_chunk_memory [num_chunks]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from services.rag.document_loader import DocumentChunk, DocumentMetadata
+
+CHUNKS_PER_DOCUMENT = 10
+CATEGORIES = ["00-META", "01-TEMPLATES", "02-TECH-PACKS", "03-EXAMPLES"]
+
+
+@dataclass
+class LegacyMetadata:
+    """Previous DocumentMetadata layout."""
+
+    title: str
+    filepath: str
+    filename: str
+    size_bytes: int
+    modified_at: datetime
+    depth: int
+    category: Optional[str] = None
+    tags: list = field(default_factory=list)
+
+
+@dataclass
+class LegacyChunk:
+    """Previous DocumentChunk layout."""
+
+    content: str
+    metadata: LegacyMetadata
+    chunk_index: int
+    total_chunks: int
+    char_count: int
+    header_level: Optional[int] = None
+
+
+def fresh(text: str) -> str:
+    """Return an equal but distinct string object (as parsing produces)."""
+    return "".join(list(text))
+
+
+def build_legacy(contents: list[str]) -> list[LegacyChunk]:
+    chunks = []
+    for i, content in enumerate(contents):
+        doc = i // CHUNKS_PER_DOCUMENT
+        category = CATEGORIES[doc % len(CATEGORIES)]
+        metadata = LegacyMetadata(
+            title=f"Document {doc}",
+            filepath=f"{category}/doc_{doc}.md",
+            filename=f"doc_{doc}.md",
+            size_bytes=4096,
+            modified_at=datetime.now(),
+            depth=2,
+            category=fresh(category),
+            tags=list({fresh(category), fresh("doc"), fresh(str(doc))}),
+        )
+        chunks.append(
+            LegacyChunk(
+                content=content,
+                metadata=metadata,
+                chunk_index=i % CHUNKS_PER_DOCUMENT,
+                total_chunks=CHUNKS_PER_DOCUMENT,
+                char_count=len(content),
+                header_level=2,
+            )
+        )
+    return chunks
+
+
+def build_current(contents: list[str]) -> list[DocumentChunk]:
+    chunks = []
+    metadata = None
+    for i, content in enumerate(contents):
+        doc = i // CHUNKS_PER_DOCUMENT
+        if i % CHUNKS_PER_DOCUMENT == 0:
+            category = CATEGORIES[doc % len(CATEGORIES)]
+            metadata = DocumentMetadata(
+                title=f"Document {doc}",
+                filepath=f"{category}/doc_{doc}.md",
+                filename=f"doc_{doc}.md",
+                size_bytes=4096,
+                modified_at=datetime.now(),
+                depth=2,
+                category=sys.intern(fresh(category)),
+                tags=[sys.intern(fresh(t)) for t in (category, "doc", str(doc))],
+            )
+        chunks.append(
+            DocumentChunk(
+                content=content,
+                metadata=metadata,
+                chunk_index=i % CHUNKS_PER_DOCUMENT,
+                total_chunks=CHUNKS_PER_DOCUMENT,
+                char_count=len(content),
+                header_level=2,
+            )
+        )
+    return chunks
+
+
+def measure(builder, contents: list[str]) -> int:
+    """Return bytes allocated by builder (excluding the shared contents)."""
+    gc.collect()
+    tracemalloc.start()
+    result = builder(contents)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    num_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    contents = [f"Chunk body {i} " * 20 for i in range(num_chunks)]
+
+    legacy = measure(build_legacy, contents)
+    current = measure(build_current, contents)
+
+    print(f"chunks:           {num_chunks}")
+    print(f"legacy bytes/chunk:  {legacy / num_chunks:8.1f}")
+    print(f"current bytes/chunk: {current / num_chunks:8.1f}")
+    print(f"saving:              {100 * (1 - current / legacy):7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
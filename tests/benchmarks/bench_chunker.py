@@ -0,0 +1,77 @@
+"""Micro-benchmark for DocumentLoader semantic chunking.
+
+Measures _semantic_split on synthetic documents up to the 10 MB
+MAX_FILE_SIZE limit and prints throughput per size, so linear scaling shows
+up as a flat MB/s column. Two shapes are generated:
+
+- sections: many H2 sections, each larger than max_chunk_size
+- flat: a single header-less section made only of paragraphs (the shape
+  that was quadratic when total_chunks was recomputed per chunk)
+
+Usage:
+    python -m tests.benchmarks.bench_chunker
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from pathlib import Path
+
+from services.rag.document_loader import DocumentLoader, DocumentMetadata
+
+FIXTURE_PATH = Path(__file__).parent.parent / "fixtures" / "kb_mock"
+SIZES_MB = [1, 2, 5, 10]
+PARAGRAPH = (
+    "Architecture decisions must be recorded with context, options and "
+    "consequences so that future maintainers understand the trade-offs. " * 6
+)
+
+
+def build_document(size_bytes: int, with_sections: bool) -> str:
+    """Generate a Markdown document of roughly size_bytes characters."""
+    parts = ["# Synthetic Document", ""]
+    length = 0
+    section = 0
+    while length < size_bytes:
+        if with_sections and section % 8 == 0:
+            parts.append(f"## Section {section // 8}")
+            parts.append("")
+        parts.append(PARAGRAPH)
+        parts.append("")
+        length += len(PARAGRAPH) + 2
+        section += 1
+    return "\n".join(parts)
+
+
+def time_split(loader: DocumentLoader, content: str) -> tuple[float, int]:
+    """Return (seconds, chunk count) for one _semantic_split call."""
+    metadata = DocumentMetadata(
+        title="Synthetic",
+        filepath="synthetic.md",
+        filename="synthetic.md",
+        size_bytes=len(content),
+        modified_at=datetime.now(),
+        depth=1,
+    )
+    start = time.perf_counter()
+    chunks = loader._semantic_split(content, metadata)
+    return time.perf_counter() - start, len(chunks)
+
+
+def main() -> None:
+    loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+    print(f"{'shape':<10}{'size MB':>9}{'chunks':>10}{'seconds':>10}{'MB/s':>10}")
+    for shape in ("sections", "flat"):
+        for size_mb in SIZES_MB:
+            content = build_document(size_mb * 1024 * 1024, shape == "sections")
+            seconds, count = time_split(loader, content)
+            print(
+                f"{shape:<10}{size_mb:>9}{count:>10}{seconds:>10.3f}"
+                f"{size_mb / seconds:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
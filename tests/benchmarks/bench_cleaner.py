@@ -0,0 +1,80 @@
+"""Throughput benchmark for MarkdownCleaner.clean.
+
+Cleans the real knowledge base (packages/knowledge_base) with the fused
+cleaner and with the previous multi-pass pipeline, checks both outputs are
+identical, and prints MB/s for each. An all-ASCII copy of the corpus shows
+the effect of the NFKC fast path separately. The last line reports the
+preserve_code_blocks mode, which skips fenced code entirely. Finally the
+per-stage breakdown shows which step dominates, and clean_many is timed
+with a growing process pool.
+
+Usage:
+    python -m tests.benchmarks.bench_cleaner [rounds]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from services.rag.markdown_cleaner import CleaningStats, MarkdownCleaner
+from tests.benchmarks.legacy_cleaner import legacy_clean
+
+KNOWLEDGE_BASE = Path(__file__).parent.parent.parent / "packages" / "knowledge_base"
+
+
+def throughput(clean: Callable[[str], str], texts: list[str], rounds: int) -> float:
+    """Return MB/s of clean over texts, best of rounds."""
+    size_mb = sum(len(t.encode("utf-8")) for t in texts) / (1024 * 1024)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            clean(text)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    texts = [p.read_text(encoding="utf-8") for p in KNOWLEDGE_BASE.rglob("*.md")]
+    ascii_texts = [t.encode("ascii", "ignore").decode("ascii") for t in texts]
+
+    for text in texts + ascii_texts:
+        assert MarkdownCleaner.clean(text) == legacy_clean(text)
+
+    print(f"{'corpus':<10}{'legacy MB/s':>14}{'fused MB/s':>14}{'speedup':>10}")
+    for name, corpus in (("mixed", texts), ("ascii", ascii_texts)):
+        legacy = throughput(legacy_clean, corpus, rounds)
+        fused = throughput(MarkdownCleaner.clean, corpus, rounds)
+        print(f"{name:<10}{legacy:>14.1f}{fused:>14.1f}{fused / legacy:>9.2f}x")
+
+    fenced = throughput(
+        lambda text: MarkdownCleaner.clean(text, preserve_code_blocks=True),
+        texts,
+        rounds,
+    )
+    print(f"preserve_code_blocks=True on mixed corpus: {fenced:.1f} MB/s")
+
+    stats = CleaningStats()
+    MarkdownCleaner.clean_many(texts, stats=stats)
+    print("\nstage share (mixed corpus):")
+    for stage in ("html", "whitespace", "suspicious", "unicode"):
+        seconds = getattr(stats, f"{stage}_seconds")
+        print(f"  {stage:<12}{100 * seconds / stats.total_seconds:6.1f}%")
+
+    # Replicate the corpus so pool startup does not dominate
+    batch = texts * 20
+    size_mb = sum(len(t.encode("utf-8")) for t in batch) / (1024 * 1024)
+    print("\nclean_many on the corpus x20:")
+    for workers in (1, 2, 4):
+        start = time.perf_counter()
+        MarkdownCleaner.clean_many(batch, workers=workers)
+        seconds = time.perf_counter() - start
+        print(f"  workers={workers:<3}{size_mb / seconds:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Throughput benchmark for EmbeddingPipeline against a local fake Ollama.
+
+Embeds every chunk of packages/knowledge_base through tests.fake_ollama,
+which charges a fixed per-request overhead plus a per-token cost and serves
+a few requests at a time, first one chunk per request (the naive stage),
+then with token-budgeted concurrent batches. Runs fully offline.
+
+Usage:
+    python -m tests.benchmarks.bench_embedding [base_latency] [ms_per_1k_tokens]
+"""
+
+from __future__ import annotations
+
+import sys
+import asyncio
+
+from services.rag.document_loader import DocumentLoader
+from services.rag.embedding_pipeline import EmbeddingPipeline
+from tests.fake_ollama import FakeOllamaServer
+
+
+async def run(label: str, server: FakeOllamaServer, chunks, **options) -> None:
+    async with EmbeddingPipeline(
+        base_url=server.base_url, model="bench", **options
+    ) as pipeline:
+        async for _ in pipeline.embed_chunks(chunks):
+            pass
+    stats = pipeline.stats
+    print(
+        f"{label:<28}{stats.chunks_per_second:>10.1f}{stats.tokens_per_second:>12.0f}"
+        f"{stats.requests:>10}{pipeline.batch_tokens:>14}"
+    )
+
+
+async def main() -> None:
+    base_latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.02
+    ms_per_1k = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    chunks = list(DocumentLoader().load_all_documents())
+    print(
+        f"{len(chunks)} chunks, fake Ollama: {1000 * base_latency:.0f} ms/request "
+        f"+ {ms_per_1k:.0f} ms/1k tokens, 2 slots"
+    )
+    print(
+        f"{'mode':<28}{'chunks/s':>10}{'tokens/s':>12}{'requests':>10}"
+        f"{'final budget':>14}"
+    )
+
+    with FakeOllamaServer(
+        base_latency=base_latency, seconds_per_token=ms_per_1k / 1e6, slots=2
+    ) as server:
+        await run(
+            "one chunk per request",
+            server,
+            chunks,
+            max_concurrency=1,
+            batch_tokens=1,
+            min_batch_tokens=1,
+            max_batch_tokens=1,
+        )
+        await run("batched, 1 in flight", server, chunks, max_concurrency=1)
+        await run("batched, 4 in flight", server, chunks, max_concurrency=4)
+        await run(
+            "batched, 4 in flight, 0.2s",
+            server,
+            chunks,
+            max_concurrency=4,
+            target_latency=0.2,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
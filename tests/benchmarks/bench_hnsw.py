@@ -0,0 +1,111 @@
+"""Recall vs latency benchmark: HNSWIndex against exact FlatIndex search.
+
+Two datasets:
+- knowledge base: every chunk of packages/knowledge_base, embedded with a
+  hashed bag-of-words projection (no embedding model is needed to run the
+  benchmark; neighbour structure is what matters here), queried with
+  chunks of itself
+- synthetic: clustered random vectors, sizes given on the command line
+
+For each dataset the exact top-10 from FlatIndex is the ground truth, and
+recall@10 and p50 latency are printed for a range of ef_search values.
+Building the graph is pure Python (a few ms per insert), so the 1M-vector
+set takes about an hour to build; pass it explicitly.
+
+Usage:
+    python -m tests.benchmarks.bench_hnsw [synthetic_size ...]
+    python -m tests.benchmarks.bench_hnsw 20000 1000000
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+import hashlib
+import tempfile
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+from services.rag.document_loader import DocumentLoader
+from services.vectors.flat_index import FlatIndex
+from services.vectors.hnsw_index import HNSWIndex
+
+DIM = 384
+TOP_K = 10
+QUERIES = 200
+EF_VALUES = (10, 20, 40, 80, 160)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def hashed_embedding(text: str) -> np.ndarray:
+    """Project word counts onto DIM signed hash buckets."""
+    vector = np.zeros(DIM, dtype=np.float32)
+    for word in WORD_PATTERN.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little")
+        vector[bucket % DIM] += 1.0 if digest[4] & 1 else -1.0
+    return vector
+
+
+def knowledge_base_vectors() -> np.ndarray:
+    chunks = list(DocumentLoader().load_all_documents())
+    return np.stack([hashed_embedding(chunk.content) for chunk in chunks])
+
+
+def synthetic_vectors(count: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((max(count // 1000, 10), DIM))
+    labels = rng.integers(0, len(centers), count)
+    noise = rng.standard_normal((count, DIM), dtype=np.float32)
+    return (centers[labels] + 0.6 * noise).astype(np.float32)
+
+
+def run(name: str, vectors: np.ndarray, queries: np.ndarray) -> None:
+    ids = [str(i) for i in range(len(vectors))]
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = FlatIndex(DIM, Path(tmp) / "flat")
+        flat.add(ids, vectors)
+        truth = [{hit.id for hit in hits} for hits in flat.search(queries, TOP_K)]
+        exact = []
+        for query in queries:
+            start = time.perf_counter()
+            flat.search(query, TOP_K)
+            exact.append(time.perf_counter() - start)
+
+        hnsw = HNSWIndex(DIM, Path(tmp) / "hnsw", seed=0)
+        start = time.perf_counter()
+        hnsw.add(ids, vectors)
+        build = time.perf_counter() - start
+
+        print(f"\n{name}: {len(vectors)} vectors x {DIM} dims")
+        print(f"  build {build:.1f} s ({1000 * build / len(vectors):.2f} ms/insert)")
+        print(f"  exact        p50 {1000 * statistics.median(exact):7.3f} ms")
+        for ef in EF_VALUES:
+            found, latencies = 0, []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                (hits,) = hnsw.search(query, TOP_K, ef=ef)
+                latencies.append(time.perf_counter() - start)
+                found += len(expected & {hit.id for hit in hits})
+            recall = found / (TOP_K * len(queries))
+            p50 = 1000 * statistics.median(latencies)
+            print(f"  ef={ef:<4}  p50 {p50:7.3f} ms  recall@{TOP_K} {recall:.3f}")
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20_000]
+    rng = np.random.default_rng(0)
+
+    vectors = knowledge_base_vectors()
+    picks = rng.choice(len(vectors), min(QUERIES, len(vectors)), replace=False)
+    run("knowledge base", vectors, vectors[picks])
+
+    for size in sizes:
+        vectors = synthetic_vectors(size + QUERIES, rng)
+        run("synthetic", vectors[:size], vectors[size:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Latency of metadata-filtered search: pushed down vs post-filtered.
+
+Builds a FlatIndex of clustered synthetic vectors with knowledge-base-like
+metadata (skewed categories, tags, two languages, depth 1-6) and runs each
+filter three ways:
+- pushdown: bitmaps resolve the filter, only candidate rows are scored
+  (FlatIndex.search(where=...))
+- post-filter scan: every row is scored, then non-matching rows are masked
+  out (the mask is precomputed, so this is a lower bound)
+- post-filter top-k: the unfiltered top 10 * k is fetched and filtered,
+  as with a vector store that cannot filter; "hits" shows how many of the
+  k results survive
+
+Usage:
+    python -m tests.benchmarks.bench_metadata_filter [size]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tempfile
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+from services.vectors.flat_index import FlatIndex, normalize_rows, top_k_rows
+from services.vectors.metadata_index import MetadataFilter
+from tests.benchmarks.bench_hnsw import DIM, TOP_K, synthetic_vectors
+
+QUERIES = 50
+OVERFETCH = 10
+CATEGORIES = ["02-TECH-PACKS", "01-TEMPLATES", "03-EXAMPLES", "00-META"]
+CATEGORY_WEIGHTS = [0.7, 0.15, 0.1, 0.05]
+TAGS = [f"tag{i}" for i in range(40)]
+FILTERS = [
+    ("language=es", MetadataFilter(language="es")),
+    ("category=02-TECH-PACKS", MetadataFilter(category="02-TECH-PACKS")),
+    ("category=00-META", MetadataFilter(category="00-META")),
+    ("00-META, en, depth<=2", MetadataFilter("00-META", language="en", max_depth=2)),
+    ("tag39 + tag38", MetadataFilter(tags=("tag39", "tag38"))),
+]
+
+
+def synthetic_metadata(count: int, rng: np.random.Generator) -> list[dict]:
+    categories = rng.choice(len(CATEGORIES), count, p=CATEGORY_WEIGHTS)
+    # Zipf-like tag popularity: tag0 is common, tag39 rare
+    tag_weights = 1.0 / np.arange(1, len(TAGS) + 1)
+    tags = rng.choice(len(TAGS), (count, 3), p=tag_weights / tag_weights.sum())
+    languages = rng.random(count) < 0.8
+    depths = rng.integers(1, 7, count)
+    return [
+        {
+            "category": CATEGORIES[categories[row]],
+            "tags": [TAGS[tag] for tag in tags[row]],
+            "language": "es" if languages[row] else "en",
+            "depth": int(depths[row]),
+        }
+        for row in range(count)
+    ]
+
+
+def post_filter_scan(index, matrix, mask, query) -> list[str]:
+    scores = (normalize_rows(query) @ matrix.T)[np.newaxis, :]
+    scores[:, ~mask] = -np.inf
+    top, _ = top_k_rows(scores, TOP_K)
+    return [index._ids[row] for row in top[0].tolist()]
+
+
+def post_filter_top_k(index, allowed, query) -> list[str]:
+    hits = index.search(query, TOP_K * OVERFETCH)[0]
+    return [hit.id for hit in hits if hit.id in allowed][:TOP_K]
+
+
+def p50_ms(search, queries) -> tuple[float, list]:
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - start)
+    return 1000 * statistics.median(latencies), results
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = np.random.default_rng(0)
+    vectors = synthetic_vectors(size + QUERIES, rng)
+    queries = vectors[size:]
+    ids = [str(i) for i in range(size)]
+    metadata = synthetic_metadata(size, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = FlatIndex(DIM, Path(tmp))
+        start = time.perf_counter()
+        index.add(ids, vectors[:size], metadata=metadata)
+        print(
+            f"{size} vectors x {DIM} dims, metadata indexed in "
+            f"{time.perf_counter() - start:.1f} s with vectors, "
+            f"bitmaps {index.metadata.memory_bytes / 1e6:.2f} MB"
+        )
+        matrix = np.asarray(index._matrix[:size])
+        unfiltered, _ = p50_ms(lambda q: index.search(q, TOP_K), queries)
+        print(f"unfiltered search p50 {unfiltered:.2f} ms\n")
+        print(
+            f"{'filter':<24}{'rows':>8}{'pushdown':>10}{'scan+mask':>11}"
+            f"{'top-k+filter':>14}{'hits':>6}"
+        )
+
+        for label, where in FILTERS:
+            rows = index.metadata.select(where).to_array()
+            mask = np.zeros(size, dtype=bool)
+            mask[rows] = True
+            allowed = {ids[row] for row in rows.tolist()}
+
+            pushdown, exact = p50_ms(
+                lambda q: [hit.id for hit in index.search(q, TOP_K, where=where)[0]],
+                queries,
+            )
+            scan, reference = p50_ms(
+                lambda q: post_filter_scan(index, matrix, mask, q), queries
+            )
+            top_k, fetched = p50_ms(
+                lambda q: post_filter_top_k(index, allowed, q), queries
+            )
+            assert exact == reference, label
+            hits = statistics.mean(len(result) for result in fetched)
+            print(
+                f"{label:<24}{len(rows):>8}{pushdown:>10.2f}{scan:>11.2f}"
+                f"{top_k:>14.2f}{hits:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
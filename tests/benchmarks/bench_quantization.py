@@ -0,0 +1,95 @@
+"""Memory and recall report for quantized vector storage.
+
+For each setting, prints the resident bytes per vector (codes + codebooks;
+exact vectors stay in the mmap'd file), recall@10 against exact search and
+p50 query latency, on the knowledge base chunks (hashed bag-of-words
+embeddings, see bench_hnsw) and on a clustered synthetic set. Use it to
+pick a quantizer and rescore factor per deployment.
+
+Usage:
+    python -m tests.benchmarks.bench_quantization [synthetic_size]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tempfile
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+from services.vectors.flat_index import FlatIndex
+from services.vectors.quantization import (
+    ProductQuantizer,
+    QuantizedIndex,
+    ScalarQuantizer,
+)
+from tests.benchmarks.bench_hnsw import (
+    DIM,
+    QUERIES,
+    TOP_K,
+    knowledge_base_vectors,
+    synthetic_vectors,
+)
+
+TRAIN_SAMPLE = 20_000
+SETTINGS = [
+    ("int8", lambda: ScalarQuantizer(DIM), (0, 2)),
+    ("pq48", lambda: ProductQuantizer(DIM, n_subvectors=48), (0, 4, 10)),
+    ("pq16", lambda: ProductQuantizer(DIM, n_subvectors=16), (0, 4, 10)),
+]
+
+
+def run(name: str, vectors: np.ndarray, queries: np.ndarray) -> None:
+    ids = [str(i) for i in range(len(vectors))]
+    print(f"\n{name}: {len(vectors)} vectors x {DIM} dims")
+    print(f"  {'setting':<16}{'bytes/vec':>10}{'recall@10':>11}{'p50 ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = FlatIndex(DIM, Path(tmp) / "flat")
+        flat.add(ids, vectors)
+        truth = [{hit.id for hit in hits} for hits in flat.search(queries, TOP_K)]
+        report("float32", 4 * DIM, flat.search, queries, truth)
+
+        for label, make_quantizer, rescores in SETTINGS:
+            index = QuantizedIndex(DIM, make_quantizer(), Path(tmp) / label)
+            index.train(vectors[:TRAIN_SAMPLE])
+            index.add(ids, vectors)
+            per_vector = index.memory_bytes / len(vectors)
+            for rescore in rescores:
+                report(
+                    f"{label} rescore={rescore}",
+                    per_vector,
+                    lambda query, k: index.search(query, k, rescore=rescore),
+                    queries,
+                    truth,
+                )
+
+
+def report(label, per_vector, search, queries, truth) -> None:
+    found, latencies = 0, []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        (hits,) = search(query, TOP_K)
+        latencies.append(time.perf_counter() - start)
+        found += len(expected & {hit.id for hit in hits})
+    recall = found / (TOP_K * len(queries))
+    p50 = 1000 * statistics.median(latencies)
+    print(f"  {label:<16}{per_vector:>10.1f}{recall:>11.3f}{p50:>9.3f}")
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+
+    vectors = knowledge_base_vectors()
+    picks = rng.choice(len(vectors), min(QUERIES, len(vectors)), replace=False)
+    run("knowledge base", vectors, vectors[picks])
+
+    vectors = synthetic_vectors(size + QUERIES, rng)
+    run("synthetic", vectors[:size], vectors[size:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Latency benchmark: in-process FlatIndex vs a local ChromaDB stand-in.
+
+The stand-in is a loopback HTTP server that answers JSON query requests by
+searching the same vectors, i.e. what a round trip to the ChromaDB container
+adds on top of the search itself (HTTP, JSON encoding of the embedding and
+of the results). If the ``chromadb`` package is installed, its in-process
+client is measured as well.
+
+Usage:
+    python -m tests.benchmarks.bench_vector_search [num_vectors] [dim]
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import time
+import tempfile
+import threading
+import statistics
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+from services.vectors.flat_index import FlatIndex
+
+QUERIES = 200
+TOP_K = 10
+
+
+def serve_stand_in(index: FlatIndex) -> ThreadingHTTPServer:
+    """Start a loopback server exposing index.search over HTTP/JSON."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like a pooled client
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            hits = index.search(np.asarray(body["query_embeddings"]), body["n_results"])
+            payload = json.dumps(
+                {
+                    "ids": [[h.id for h in row] for row in hits],
+                    "distances": [[1 - h.score for h in row] for row in hits],
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentiles(samples: list[float]) -> str:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p50 = statistics.median(samples_ms)
+    p95 = samples_ms[int(0.95 * (len(samples_ms) - 1))]
+    return f"p50 {p50:7.3f} ms   p95 {p95:7.3f} ms"
+
+
+def main() -> None:
+    num_vectors = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 384
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_vectors, dim), dtype=np.float32)
+    queries = rng.standard_normal((QUERIES, dim), dtype=np.float32)
+    ids = [f"chunk-{i}" for i in range(num_vectors)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = FlatIndex(dim, Path(tmp))
+        index.add(ids, vectors)
+        print(f"{num_vectors} vectors x {dim} dims, top-{TOP_K}, {QUERIES} queries")
+
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, TOP_K)
+            samples.append(time.perf_counter() - start)
+        print(f"FlatIndex (single query)      {percentiles(samples)}")
+
+        start = time.perf_counter()
+        index.search(queries, TOP_K)
+        per_query = (time.perf_counter() - start) / QUERIES
+        print(f"FlatIndex (batch of {QUERIES})     {per_query * 1000:7.3f} ms/query")
+
+        server = serve_stand_in(index)
+        conn = HTTPConnection(*server.server_address)
+        samples = []
+        for query in queries:
+            body = json.dumps(
+                {"query_embeddings": [query.tolist()], "n_results": TOP_K}
+            )
+            start = time.perf_counter()
+            conn.request(
+                "POST", "/query", body, {"Content-Type": "application/json"}
+            )
+            json.loads(conn.getresponse().read())
+            samples.append(time.perf_counter() - start)
+        print(f"HTTP stand-in (loopback)      {percentiles(samples)}")
+        conn.close()
+        server.shutdown()
+
+        try:
+            import chromadb
+        except ImportError:
+            print("chromadb not installed: skipping the chromadb client")
+        else:
+            collection = chromadb.EphemeralClient().create_collection(
+                "bench", metadata={"hnsw:space": "cosine"}
+            )
+            for start_row in range(0, num_vectors, 5000):
+                collection.add(
+                    ids=ids[start_row : start_row + 5000],
+                    embeddings=vectors[start_row : start_row + 5000].tolist(),
+                )
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                collection.query(query_embeddings=[query.tolist()], n_results=TOP_K)
+                samples.append(time.perf_counter() - start)
+            print(f"chromadb (in-process)         {percentiles(samples)}")
+
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
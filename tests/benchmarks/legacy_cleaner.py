@@ -0,0 +1,49 @@
+"""Reference copy of the multi-pass MarkdownCleaner.clean pipeline.
+
+Kept verbatim (as one function) so the fused cleaner can be checked for
+byte-identical output and benchmarked against it.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>", re.IGNORECASE | re.MULTILINE)
+HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL | re.MULTILINE)
+MULTIPLE_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+MULTIPLE_SPACES_PATTERN = re.compile(r"  +")
+TRAILING_WHITESPACE_PATTERN = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def legacy_clean(text: str) -> str:
+    """Clean text exactly like MarkdownCleaner.clean did before fusion."""
+    if not text or not isinstance(text, str):
+        return ""
+
+    text = HTML_COMMENT_PATTERN.sub("", text)
+    text = HTML_TAG_PATTERN.sub("", text)
+
+    text = MULTIPLE_NEWLINES_PATTERN.sub("\n\n", text)
+    text = TRAILING_WHITESPACE_PATTERN.sub("", text)
+    lines = text.split("\n")
+    normalized_lines = []
+    for line in lines:
+        if line.startswith("    ") or line.startswith("\t"):
+            normalized_lines.append(line)
+        else:
+            normalized_lines.append(MULTIPLE_SPACES_PATTERN.sub(" ", line))
+    text = "\n".join(normalized_lines)
+
+    text = re.sub(r"javascript:\s*", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"data:[^,]*,", "", text, flags=re.IGNORECASE)
+    text = re.sub(
+        r"<iframe[^>]*>.*?</iframe>", "", text, flags=re.IGNORECASE | re.DOTALL
+    )
+    text = re.sub(
+        r"<script[^>]*>.*?</script>", "", text, flags=re.IGNORECASE | re.DOTALL
+    )
+
+    text = unicodedata.normalize("NFKC", text)
+
+    return text.strip()
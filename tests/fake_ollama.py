@@ -0,0 +1,111 @@
+"""Local fake of the Ollama embedding API, for offline tests and benchmarks.
+
+Serves POST /api/embed on a loopback port with deterministic embeddings
+(hashed bag of words) and a simulated cost: every request waits
+``base_latency + seconds_per_token * tokens`` while holding one of
+``slots`` model slots, the way a single GPU serves a few requests at a time.
+"""
+
+from __future__ import annotations
+
+import re
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def fake_embedding(text: str, dim: int) -> list[float]:
+    """Return a deterministic unit vector for text."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in WORD_PATTERN.findall(text.lower()) or [""]:
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+class FakeOllamaServer:
+    """Threaded loopback server speaking the /api/embed protocol.
+
+    Example:
+        >>> with FakeOllamaServer(dim=64) as server:
+        ...     pipeline = EmbeddingPipeline(base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        base_latency: float = 0.0,
+        seconds_per_token: float = 0.0,
+        slots: int = 1,
+        fail_status: int | None = None,
+    ):
+        self.dim = dim
+        self.base_latency = base_latency
+        self.seconds_per_token = seconds_per_token
+        self.fail_status = fail_status
+        self.batches: list[list[str]] = []  # Texts of each request, by arrival
+        self._slots = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return len(self.batches)
+
+    def __enter__(self) -> FakeOllamaServer:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like Ollama
+
+            def do_POST(self) -> None:
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                if self.path != "/api/embed" or fake.fail_status:
+                    self._reply(fake.fail_status or 404, {"error": "failed"})
+                    return
+
+                texts = body["input"]
+                texts = [texts] if isinstance(texts, str) else texts
+                with fake._lock:
+                    fake.batches.append(texts)
+                tokens = sum(len(WORD_PATTERN.findall(text)) for text in texts)
+                with fake._slots:
+                    time.sleep(fake.base_latency + fake.seconds_per_token * tokens)
+                embeddings = [fake_embedding(text, fake.dim) for text in texts]
+                self._reply(200, {"model": body["model"], "embeddings": embeddings})
+
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
@@ -29,3 +29,11 @@ def test_cors_origins_parsing():
     settings = get_settings()
     assert isinstance(settings.BACKEND_CORS_ORIGINS, list)
     assert len(settings.BACKEND_CORS_ORIGINS) > 0
+
+
+def test_ollama_base_url():
+    """The Ollama URL is derived from host and port."""
+    settings = get_settings()
+    assert settings.OLLAMA_BASE_URL == (
+        f"http://{settings.OLLAMA_HOST}:{settings.OLLAMA_PORT}"
+    )
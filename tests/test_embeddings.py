@@ -0,0 +1,305 @@
+"""
+Test suite for embedding storage (services.vectors).
+
+Tests cover:
+- Bulk lookup / insert keyed by model and content hash
+- LRU eviction within the size budget
+- Token-budgeted, concurrent, adaptive embedding against a fake Ollama
+- Upserting embedded chunks into the server's ChromaDB collection
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+from services.rag.chroma_ingestion import chunk_metadata, ingest_chunks
+from services.rag.document_loader import DocumentChunk, DocumentLoader, DocumentMetadata
+from services.rag.embedding_pipeline import EmbeddingPipeline
+from services.vectors.chroma_collection import ChromaCollection
+from services.vectors.embedding_cache import EmbeddingCache
+from tests.fake_ollama import FakeOllamaServer, fake_embedding
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "kb_mock"
+
+DIM = 8
+
+
+def vectors_for(texts: list[str]) -> np.ndarray:
+    return np.stack([np.full(DIM, len(text), dtype=np.float32) for text in texts])
+
+
+def make_chunks(texts: list[str]) -> list[DocumentChunk]:
+    metadata = DocumentMetadata(
+        title="doc",
+        filepath="doc.md",
+        filename="doc.md",
+        size_bytes=0,
+        modified_at=datetime(2024, 1, 1),
+        depth=0,
+    )
+    return [
+        DocumentChunk(
+            content=text,
+            metadata=metadata,
+            chunk_index=i,
+            total_chunks=len(texts),
+            char_count=len(text),
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+async def collect(pipeline: EmbeddingPipeline, chunks) -> dict[str, np.ndarray]:
+    return {
+        chunk.chunk_id: vector async for chunk, vector in pipeline.embed_chunks(chunks)
+    }
+
+
+class TestEmbeddingCache:
+    """Test the persistent embedding cache."""
+
+    def test_bulk_lookup_reports_misses(self, tmp_path):
+        """Only stored texts hit; order and duplicates are preserved."""
+        cache = EmbeddingCache(tmp_path / "emb.db", model="m")
+        cache.put_many(["a", "bb"], vectors_for(["a", "bb"]))
+
+        vectors = cache.get_many(["bb", "ccc", "a", "bb"])
+
+        assert vectors[1] is None
+        np.testing.assert_array_equal(vectors[0], np.full(DIM, 2.0))
+        np.testing.assert_array_equal(vectors[2], np.full(DIM, 1.0))
+        np.testing.assert_array_equal(vectors[3], vectors[0])
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_keyed_by_model_and_persistent(self, tmp_path):
+        """Entries survive reopen and are never shared across models."""
+        with EmbeddingCache(tmp_path / "emb.db", model="m1") as cache:
+            cache.put_many(["text"], vectors_for(["text"]))
+
+        other = EmbeddingCache(tmp_path / "emb.db", model="m2")
+        same = EmbeddingCache(tmp_path / "emb.db", model="m1")
+
+        assert other.get_many(["text"]) == [None]
+        assert same.get_many(["text"])[0] is not None
+        assert len(same) == 1 and len(other) == 0
+
+    def test_defaults_to_configured_model(self, tmp_path):
+        """The model name comes from OLLAMA_EMBED_MODEL when not given."""
+        from core.config import settings
+
+        assert EmbeddingCache(tmp_path / "emb.db").model == settings.OLLAMA_EMBED_MODEL
+
+    def test_lru_eviction(self, tmp_path):
+        """Least recently used vectors go first once over budget."""
+        entry_size = DIM * 4
+        cache = EmbeddingCache(tmp_path / "emb.db", model="m", max_bytes=2 * entry_size)
+        cache.put_many(["a"], vectors_for(["a"]))
+        cache.put_many(["bb"], vectors_for(["bb"]))
+        cache.get_many(["a"])  # "bb" is now the least recently used
+
+        cache.put_many(["ccc"], vectors_for(["ccc"]))
+
+        assert cache.get_many(["bb"]) == [None]
+        assert cache.size_bytes() == 2 * entry_size
+
+    def test_shape_mismatch(self, tmp_path):
+        """put_many needs one vector per text."""
+        cache = EmbeddingCache(tmp_path / "emb.db", model="m")
+
+        with pytest.raises(ValueError, match="Expected 2 vectors"):
+            cache.put_many(["a", "b"], vectors_for(["a"]))
+
+
+class TestEmbeddingPipeline:
+    """Test the batched embedding stage against a local fake Ollama."""
+
+    TEXTS = [f"chunk number {i} " + "word " * (i % 7) for i in range(40)]
+
+    @pytest.mark.asyncio
+    async def test_batches_by_token_budget(self):
+        """Every chunk is embedded once, in batches within the budget."""
+        chunks = make_chunks(self.TEXTS)
+        with FakeOllamaServer(dim=DIM) as server:
+            async with EmbeddingPipeline(
+                base_url=server.base_url,
+                model="m",
+                batch_tokens=40,
+                min_batch_tokens=1,
+                max_batch_tokens=40,
+            ) as pipeline:
+                vectors = await collect(pipeline, chunks)
+
+        assert len(vectors) == len(chunks)
+        for chunk in chunks:
+            np.testing.assert_allclose(
+                vectors[chunk.chunk_id], fake_embedding(chunk.content, DIM), rtol=1e-6
+            )
+        assert server.requests == pipeline.stats.requests > 1
+        for batch in server.batches:
+            assert sum(pipeline.tokenizer.count(text) for text in batch) <= 40
+        assert pipeline.stats.embedded_chunks == len(chunks)
+        assert pipeline.stats.chunks_per_second > 0
+        assert pipeline.stats.tokens_per_second > 0
+
+    @pytest.mark.asyncio
+    async def test_defaults_to_configured_embedding_model(self):
+        """Chunks are embedded with OLLAMA_EMBED_MODEL, the query model."""
+        from core.config import settings
+
+        async with EmbeddingPipeline() as pipeline:
+            assert pipeline.model == settings.OLLAMA_EMBED_MODEL
+
+    @pytest.mark.asyncio
+    async def test_cache_skips_unchanged_chunks(self, tmp_path):
+        """A second run only embeds chunks whose text changed."""
+        cache = EmbeddingCache(tmp_path / "emb.db", model="m")
+        with FakeOllamaServer(dim=DIM) as server:
+            async with EmbeddingPipeline(base_url=server.base_url, cache=cache) as p:
+                await collect(p, make_chunks(self.TEXTS))
+            first_requests = server.requests
+
+            edited = self.TEXTS[:-1] + ["an edited chunk"]
+            async with EmbeddingPipeline(base_url=server.base_url, cache=cache) as p:
+                vectors = await collect(p, make_chunks(edited))
+
+        assert len(vectors) == len(edited)
+        assert server.requests == first_requests + 1
+        assert server.batches[-1] == ["an edited chunk"]
+        assert p.stats.cache_hits == len(edited) - 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests(self):
+        """Requests overlap up to max_concurrency."""
+        chunks = make_chunks(self.TEXTS[:8])
+        with FakeOllamaServer(dim=DIM, base_latency=0.1, slots=4) as server:
+            async with EmbeddingPipeline(
+                base_url=server.base_url,
+                model="m",
+                max_concurrency=4,
+                batch_tokens=5,
+                min_batch_tokens=1,
+            ) as pipeline:
+                start = time.perf_counter()
+                await collect(pipeline, chunks)
+                elapsed = time.perf_counter() - start
+
+        assert server.requests == 8
+        assert elapsed < 8 * 0.1 / 2
+
+    @pytest.mark.asyncio
+    async def test_budget_adapts_to_latency(self):
+        """Slow requests shrink the token budget; fast ones grow it."""
+
+        async def texts():
+            for chunk in make_chunks(self.TEXTS):
+                yield chunk
+
+        with FakeOllamaServer(dim=DIM, seconds_per_token=0.002) as server:
+            async with EmbeddingPipeline(
+                base_url=server.base_url,
+                model="m",
+                batch_tokens=200,
+                min_batch_tokens=10,
+                target_latency=0.05,
+            ) as slow:
+                await collect(slow, texts())
+        assert slow.batch_tokens < 200
+
+        with FakeOllamaServer(dim=DIM) as server:
+            async with EmbeddingPipeline(
+                base_url=server.base_url, model="m", batch_tokens=20, min_batch_tokens=1
+            ) as fast:
+                await collect(fast, make_chunks(self.TEXTS))
+        assert fast.batch_tokens > 20
+
+    @pytest.mark.asyncio
+    async def test_http_errors_propagate(self):
+        """A failing server raises instead of silently dropping chunks."""
+        with FakeOllamaServer(dim=DIM, fail_status=500) as server:
+            async with EmbeddingPipeline(base_url=server.base_url, model="m") as p:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await collect(p, make_chunks(self.TEXTS))
+
+
+class FakeChroma:
+    """In-memory stand-in for the ChromaDB REST API (create and upsert)."""
+
+    def __init__(self):
+        self.records: dict[str, dict] = {}
+        self.upserts = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        if request.url.path.endswith("/collections"):
+            return httpx.Response(200, json={"id": "cid", "name": body["name"]})
+        if request.url.path.endswith("/collections/cid/upsert"):
+            self.upserts += 1
+            for record in zip(
+                body["ids"], body["documents"], body["metadatas"], body["embeddings"]
+            ):
+                chunk_id, document, metadata, embedding = record
+                self.records[chunk_id] = {
+                    "document": document,
+                    "metadata": metadata,
+                    "embedding": embedding,
+                }
+            return httpx.Response(200, json=True)
+        return httpx.Response(404, json={"error": "not found"})
+
+
+class TestChromaIngestion:
+    """Test loading, embedding and upserting the knowledge base into Chroma."""
+
+    @pytest.mark.asyncio
+    async def test_ingests_loader_output(self):
+        """Every loaded chunk is upserted with its text, metadata and vector."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        chunks = list(loader.load_all_documents())
+        chroma = FakeChroma()
+        with FakeOllamaServer(dim=DIM) as server:
+            async with (
+                EmbeddingPipeline(base_url=server.base_url, model="m") as pipeline,
+                httpx.AsyncClient(
+                    transport=chroma.transport, base_url="http://chroma"
+                ) as client,
+            ):
+                collection = ChromaCollection(name="kb", client=client)
+                count = await ingest_chunks(chunks, pipeline, collection, batch_size=2)
+
+        assert count == len(chunks) == len(chroma.records)
+        assert chroma.upserts == -(-len(chunks) // 2)
+        for chunk in chunks:
+            record = chroma.records[chunk.chunk_id]
+            assert record["document"] == chunk.content
+            np.testing.assert_allclose(
+                record["embedding"], fake_embedding(chunk.content, DIM), rtol=1e-6
+            )
+            metadata = record["metadata"]
+            assert metadata["depth"] == chunk.metadata.depth
+            assert metadata.get("tags", []) == list(chunk.metadata.tags)
+            assert None not in metadata.values()
+
+    def test_chunk_metadata_drops_missing_fields(self):
+        """Chroma rejects None values, so unset fields are left out."""
+        (chunk,) = make_chunks(["text"])
+        metadata = chunk_metadata(chunk)
+
+        assert metadata["depth"] == 0 and metadata["filepath"] == "doc.md"
+        assert "category" not in metadata and "tags" not in metadata
+        assert "language" not in metadata
+
+    @pytest.mark.asyncio
+    async def test_rejects_mismatched_records(self):
+        """An upsert needs one text, metadata and embedding per id."""
+        async with httpx.AsyncClient(transport=FakeChroma().transport) as client:
+            collection = ChromaCollection(name="kb", client=client)
+            with pytest.raises(ValueError):
+                await collection.upsert(["a", "b"], ["a"], [{}], np.zeros((2, DIM)))
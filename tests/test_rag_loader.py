@@ -12,12 +12,25 @@ This test suite validates:
 
 from __future__ import annotations
 
+import sys
+import time
+import random
+import pickle
+import asyncio
+import threading
 import pytest
 from pathlib import Path
 from datetime import datetime
 
+from services.rag.async_loader import AsyncDocumentLoader
+from services.rag.chunk_batch import ChunkBatch
+from services.rag.chunk_cache import ChunkCache
 from services.rag.document_loader import DocumentLoader, DocumentMetadata, DocumentChunk
-from services.rag.markdown_cleaner import MarkdownCleaner
+from services.rag.ingestion_manifest import ChunkTombstone, IngestionManifest
+from services.rag.markdown_cleaner import CleaningStats, MarkdownCleaner
+from services.rag.tokenizers import RegexTokenizer
+from services.rag.watcher import KnowledgeBaseWatcher
+from tests.benchmarks.legacy_cleaner import legacy_clean
 
 # Define fixture path
 FIXTURE_PATH = Path(__file__).parent / "fixtures" / "kb_mock"
@@ -188,6 +201,26 @@ class TestMetadataExtraction:
         assert len(chunks) > 0
         assert chunks[0].metadata.category == "nested"
 
+    def test_language_detection(self, tmp_path):
+        """Language comes from function words; too little text gives None."""
+        texts = {
+            "es.md": "# Guía\n\nEl servicio de la API se despliega con una "
+            "imagen para que los equipos la usen en producción.",
+            "en.md": "# Guide\n\nThe service is deployed with an image that "
+            "the teams use in production for all of the APIs.",
+            "short.md": "# Title\n\nJust a few words.",
+        }
+        for name, text in texts.items():
+            (tmp_path / name).write_text(text, encoding="utf-8")
+        loader = DocumentLoader(knowledge_base_dir=tmp_path)
+
+        languages = {
+            name: loader.load_document(tmp_path / name)[0].metadata.language
+            for name in texts
+        }
+
+        assert languages == {"es.md": "es", "en.md": "en", "short.md": None}
+
     def test_title_extraction_from_h1(self):
         """Verify that title is extracted from H1 header."""
         loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
@@ -237,6 +270,27 @@ class TestSemanticChunking:
             # Note: Some chunks may be larger than max due to indivisible sections
             # but most should respect the limit
 
+    def test_total_chunks_is_global_per_document(self):
+        """total_chunks counts every chunk of the document, not one section."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_chunk_size=300, min_chunk_size=20
+        )
+        file_path = FIXTURE_PATH / "large_document.md"
+        chunks = loader.load_document(file_path)
+
+        assert len(chunks) > 1
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+        assert all(c.total_chunks == len(chunks) for c in chunks)
+
+    def test_split_by_header_keeps_preamble_and_sections(self):
+        """H2 split yields the preamble and one section per header."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        content = "# Title\nintro\n## A\nalpha\n### A.1\nsub\n## B\nbeta"
+
+        sections = loader._split_by_header(content, level=2)
+
+        assert sections == ["# Title\nintro", "## A\nalpha\n### A.1\nsub", "## B\nbeta"]
+
     def test_empty_file_handling(self):
         """Verify that empty or invalid files are handled gracefully."""
         loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
@@ -247,6 +301,87 @@ class TestSemanticChunking:
         assert len(chunks) == 0, "Empty file should produce no chunks"
 
 
+class TestTokenBudgetedChunking:
+    """Test token-aware chunking mode."""
+
+    def test_regex_tokenizer_counts_words_and_punctuation(self):
+        """Words and punctuation marks each cost a token."""
+        tokenizer = RegexTokenizer(chars_per_token=100)
+
+        assert tokenizer.count("def main(): return") == 6
+        assert tokenizer.count("") == 0
+
+    def test_regex_tokenizer_charges_long_words(self):
+        """Long words cost extra subword tokens."""
+        tokenizer = RegexTokenizer(chars_per_token=4)
+
+        assert tokenizer.count("arquitectura") > tokenizer.count("api")
+
+    def test_chunks_respect_token_budget(self):
+        """Every chunk fits the budget and carries its cached token count."""
+        tokenizer = RegexTokenizer()
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH,
+            tokenizer=tokenizer,
+            max_chunk_tokens=120,
+            min_chunk_tokens=20,
+        )
+        chunks = loader.load_document(FIXTURE_PATH / "large_document.md")
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert chunk.token_count == tokenizer.count(chunk.content)
+            assert chunk.token_count <= 120
+            assert chunk.total_chunks == len(chunks)
+
+    def test_small_sections_are_merged_not_dropped(self, tmp_path):
+        """Undersized sibling sections share a chunk; no content is lost."""
+        sections = [f"## Section {i}\n\nShort body {i}." for i in range(10)]
+        (tmp_path / "small.md").write_text("# Doc\n\n" + "\n\n".join(sections))
+        loader = DocumentLoader(
+            knowledge_base_dir=tmp_path,
+            tokenizer=RegexTokenizer(),
+            max_chunk_tokens=40,
+            min_chunk_tokens=10,
+        )
+
+        chunks = loader.load_document(tmp_path / "small.md")
+
+        assert 1 < len(chunks) < len(sections)
+        joined = "\n".join(c.content for c in chunks)
+        for i in range(10):
+            assert f"Short body {i}." in joined
+
+    def test_overlap_repeats_trailing_context(self, tmp_path):
+        """With overlap, each chunk starts with the tail of the previous one."""
+        paragraphs = [f"Paragraph number {i} with some words." for i in range(12)]
+        (tmp_path / "flat.md").write_text("\n\n".join(paragraphs))
+        loader = DocumentLoader(
+            knowledge_base_dir=tmp_path,
+            tokenizer=RegexTokenizer(),
+            max_chunk_tokens=30,
+            min_chunk_tokens=5,
+            chunk_overlap_tokens=12,
+        )
+
+        chunks = loader.load_document(tmp_path / "flat.md")
+
+        assert len(chunks) > 1
+        for previous, current in zip(chunks, chunks[1:]):
+            last_paragraph = previous.content.split("\n\n")[-1]
+            assert current.content.startswith(last_paragraph)
+
+    def test_invalid_token_budget(self):
+        """Overlap must be smaller than the budget."""
+        with pytest.raises(ValueError, match="chunk_overlap_tokens"):
+            DocumentLoader(
+                knowledge_base_dir=FIXTURE_PATH,
+                tokenizer=RegexTokenizer(),
+                max_chunk_tokens=100,
+                chunk_overlap_tokens=100,
+            )
+
+
 class TestMarkdownCleaner:
     """Test MarkdownCleaner functionality."""
 
@@ -288,6 +423,141 @@ class TestMarkdownCleaner:
         assert not MarkdownCleaner.is_valid_markdown("   ")
         assert not MarkdownCleaner.is_valid_markdown("!@#$%^&*()")
 
+    def test_cleaner_matches_legacy_pipeline_on_corpus(self):
+        """The optimized cleaner is byte-identical on the knowledge base."""
+        kb_dir = Path(__file__).parent.parent / "packages" / "knowledge_base"
+        paths = list(kb_dir.rglob("*.md")) + list(FIXTURE_PATH.rglob("*.md"))
+
+        for path in paths:
+            text = path.read_text(encoding="utf-8")
+            assert MarkdownCleaner.clean(text) == legacy_clean(text), path
+
+    def test_cleaner_matches_legacy_pipeline_on_edge_cases(self):
+        """Randomized differential test over whitespace, HTML and URI edge cases."""
+        atoms = [
+            " ", "  ", "\t", "\n", "\n\n\n", "    ", " \t ", "\r",
+            "<", ">", "<!--", "-->", "<b>", "<iframe>", "</script>",
+            "javascript:", "JavaScript: ", "javaſcript:", "DATA:", "data:", ",",
+            "ﬁ", "\u3000", "ñ", "İ", "a", "#", "`",
+        ]  # fmt: skip
+        rng = random.Random(42)
+
+        for _ in range(5000):
+            text = "".join(rng.choice(atoms) for _ in range(rng.randint(0, 25)))
+            assert MarkdownCleaner.clean(text) == legacy_clean(text), repr(text)
+
+
+class TestCleanMany:
+    """Test batch cleaning."""
+
+    TEXTS = [
+        "Text  with <b>tags</b>   ",
+        "```\ncode  block\n```",
+        "Unicode ﬁ ligature",
+        "",
+        "javascript:alert(1) link",
+    ] * 3
+
+    def test_sequential_matches_clean(self):
+        """clean_many returns clean() of every text, in order."""
+        expected = [MarkdownCleaner.clean(t) for t in self.TEXTS]
+
+        assert MarkdownCleaner.clean_many(self.TEXTS) == expected
+
+    def test_process_pool_preserves_order(self):
+        """The pooled path returns the same list as the sequential one."""
+        expected = [
+            MarkdownCleaner.clean(t, preserve_code_blocks=True) for t in self.TEXTS
+        ]
+
+        cleaned = MarkdownCleaner.clean_many(
+            self.TEXTS, workers=2, chunksize=4, preserve_code_blocks=True
+        )
+
+        assert cleaned == expected
+
+    def test_stage_timings_are_collected(self):
+        """Stats count every non-empty text and time every stage."""
+        stats = CleaningStats()
+
+        MarkdownCleaner.clean_many(self.TEXTS, workers=2, stats=stats)
+
+        non_empty = [t for t in self.TEXTS if t]
+        assert stats.texts_cleaned == len(non_empty)
+        assert stats.chars_cleaned == sum(len(t) for t in non_empty)
+        assert stats.html_seconds > 0
+        assert stats.unicode_seconds > 0
+        assert stats.total_seconds >= stats.whitespace_seconds
+
+    def test_invalid_workers(self):
+        """workers must be positive."""
+        with pytest.raises(ValueError, match="workers"):
+            MarkdownCleaner.clean_many(self.TEXTS, workers=0)
+
+
+class TestCodeFenceCleaning:
+    """Test cleaning that leaves fenced code blocks untouched."""
+
+    DOCUMENT = (
+        "Intro  with   <b>HTML</b>\n"
+        "\n"
+        "```java\n"
+        "List<String> names  =  new ArrayList<>();   \n"
+        "```\n"
+        "\n"
+        "After    the  block"
+    )
+
+    def test_code_block_is_preserved(self):
+        """Code keeps generics and spacing while prose is still cleaned."""
+        cleaned = MarkdownCleaner.clean(self.DOCUMENT, preserve_code_blocks=True)
+
+        assert "List<String> names  =  new ArrayList<>();   " in cleaned
+        assert cleaned.startswith("Intro with HTML\n")
+        assert cleaned.endswith("After the block")
+
+    def test_default_mode_still_cleans_code(self):
+        """Without the flag code blocks are cleaned like prose."""
+        cleaned = MarkdownCleaner.clean(self.DOCUMENT)
+
+        assert "List<String>" not in cleaned
+
+    def test_find_code_fences(self):
+        """Fences pair by character and length; unclosed blocks run to the end."""
+        text = "a\n~~~~\n```\n~~~\n~~~~\nb\n```py\ncode"
+
+        spans = MarkdownCleaner.find_code_fences(text)
+
+        assert [text[start:end] for start, end in spans] == [
+            "~~~~\n```\n~~~\n~~~~",
+            "```py\ncode",
+        ]
+
+    def test_backtick_info_string_does_not_open_fence(self):
+        """A backtick line with backticks after the fence is inline code."""
+        assert MarkdownCleaner.find_code_fences("``` a ` b\ntext") == []
+
+    def test_loader_does_not_split_inside_code(self, tmp_path):
+        """Header-like lines inside code blocks are not section boundaries."""
+        body = "Text. " * 40
+        (tmp_path / "doc.md").write_text(
+            f"# Doc\n\n## Setup\n\n{body}\n\n"
+            "```python\n## not a header\nx  =  1\n```\n\n"
+            f"## Usage\n\n{body}",
+            encoding="utf-8",
+        )
+        loader = DocumentLoader(
+            knowledge_base_dir=tmp_path,
+            min_chunk_size=10,
+            preserve_code_blocks=True,
+        )
+
+        chunks = loader.load_document(tmp_path / "doc.md")
+
+        setup = next(c for c in chunks if "## Setup" in c.content)
+        assert "## not a header\nx  =  1" in setup.content
+        assert any(c.content.startswith("## Usage") for c in chunks)
+
 
 class TestSecurity:
     """Test security features."""
@@ -396,6 +666,697 @@ class TestErrorHandling:
             loader.load_document(FIXTURE_PATH / "ignored.txt")
 
 
+class TestSinglePassParse:
+    """Test that each document is read and stat'ed only once."""
+
+    def test_load_document_single_stat_and_open(self):
+        """load_document takes one stat and one open per file."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        loader.load_document(FIXTURE_PATH / "valid.md")
+
+        assert loader.io_stats.stat_calls == 1
+        assert loader.io_stats.open_calls == 1
+        assert loader.io_stats.bytes_read == (FIXTURE_PATH / "valid.md").stat().st_size
+
+    def test_load_all_documents_io_per_file(self):
+        """A full load costs exactly one stat and one open per file."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        files = list(loader._find_markdown_files())
+
+        list(loader.load_all_documents())
+
+        assert loader.io_stats.stat_calls == len(files)
+        assert loader.io_stats.open_calls == len(files)
+
+    def test_parallel_mode_aggregates_io_stats(self):
+        """Parallel mode counts exactly the IO of the sequential path."""
+        sequential = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        list(sequential.load_all_documents())
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        list(loader.load_all_documents(workers=2))
+
+        assert loader.io_stats == sequential.io_stats
+
+    def test_crlf_content_matches_lf(self, tmp_path):
+        """CRLF files produce the same chunks as their LF equivalent."""
+        text = (FIXTURE_PATH / "large_document.md").read_text(encoding="utf-8")
+        (tmp_path / "lf.md").write_bytes(text.encode("utf-8"))
+        (tmp_path / "crlf.md").write_bytes(text.replace("\n", "\r\n").encode())
+        loader = DocumentLoader(knowledge_base_dir=tmp_path)
+
+        lf = loader.load_document(tmp_path / "lf.md")
+        crlf = loader.load_document(tmp_path / "crlf.md")
+
+        assert [c.content for c in crlf] == [c.content for c in lf]
+        assert crlf[0].metadata.title == lf[0].metadata.title
+
+
+class TestStreamingLoader:
+    """Test memory-mapped streaming of large documents."""
+
+    def test_stream_matches_in_memory_load(self):
+        """Streaming a regular document yields the same chunk texts."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_chunk_size=400, min_chunk_size=50
+        )
+        file_path = FIXTURE_PATH / "large_document.md"
+
+        loaded = loader.load_document(file_path)
+        streamed = list(loader.stream_document(file_path))
+
+        assert [c.content for c in streamed] == [c.content for c in loaded]
+        assert [c.chunk_index for c in streamed] == list(range(len(streamed)))
+
+    def test_size_limit_is_configurable(self):
+        """Files above max_file_size are streamed instead of rejected."""
+        file_path = FIXTURE_PATH / "large_document.md"
+        strict = DocumentLoader(knowledge_base_dir=FIXTURE_PATH, max_file_size=1000)
+        streaming = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH,
+            max_file_size=1000,
+            stream_large_files=True,
+        )
+        unlimited = DocumentLoader(knowledge_base_dir=FIXTURE_PATH, max_file_size=None)
+
+        with pytest.raises(ValueError, match="File too large"):
+            strict.load_document(file_path)
+        assert [c.content for c in streaming.load_document(file_path)] == [
+            c.content for c in unlimited.load_document(file_path)
+        ]
+
+    def test_windowed_spans_keep_utf8_intact(self, tmp_path):
+        """Oversized sections are cut into windows on character boundaries."""
+        text = "# Título\n\n" + "ñandú " * 400
+        (tmp_path / "wide.md").write_text(text, encoding="utf-8")
+        loader = DocumentLoader(knowledge_base_dir=tmp_path, min_chunk_size=1)
+        loader.STREAM_WINDOW_SIZE = 64
+
+        chunks = list(loader.stream_document(tmp_path / "wide.md"))
+
+        assert chunks
+        assert "".join(c.content for c in chunks).count("ñandú") == 400
+
+    def test_load_all_documents_streams_large_files(self):
+        """The generator API picks the streaming path transparently."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_file_size=1000, stream_large_files=True
+        )
+
+        chunks = list(loader.load_all_documents())
+
+        assert any(c.metadata.filename == "large_document.md" for c in chunks)
+
+
+class TestCompactChunks:
+    """Test the memory layout of chunks and metadata."""
+
+    def test_chunks_and_metadata_are_slotted(self):
+        """Neither chunks nor metadata carry a per-instance __dict__."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        chunk = loader.load_document(FIXTURE_PATH / "valid.md")[0]
+
+        assert not hasattr(chunk, "__dict__")
+        assert not hasattr(chunk.metadata, "__dict__")
+
+    def test_chunks_share_document_metadata(self):
+        """All chunks of a document reference a single metadata object."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_chunk_size=400, min_chunk_size=50
+        )
+
+        chunks = loader.load_document(FIXTURE_PATH / "large_document.md")
+
+        assert len(chunks) > 1
+        assert all(c.metadata is chunks[0].metadata for c in chunks)
+
+    def test_metadata_is_immutable(self):
+        """Shared metadata cannot be mutated through one chunk."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        chunk = loader.load_document(FIXTURE_PATH / "valid.md")[0]
+
+        with pytest.raises(AttributeError):
+            chunk.metadata.title = "Changed"
+        assert isinstance(chunk.metadata.tags, tuple)
+        assert chunk.metadata in {chunk.metadata}  # Hashable
+
+    def test_category_and_tags_are_interned(self):
+        """Repeated category and tag strings resolve to one object."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        chunks = list(loader.load_all_documents())
+
+        for chunk in chunks:
+            metadata = chunk.metadata
+            if metadata.category:
+                assert metadata.category is sys.intern(metadata.category)
+            assert all(tag is sys.intern(tag) for tag in metadata.tags)
+
+
+class TestChunkBatches:
+    """Test the columnar batch API."""
+
+    def test_batches_match_chunk_stream(self):
+        """load_batches yields the same chunks, in order, as load_all_documents."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        chunks = list(loader.load_all_documents())
+        batches = list(loader.load_batches(batch_size=2))
+
+        assert all(len(b) == 2 for b in batches[:-1])
+        assert [c for b in batches for c in b.to_chunks()] == chunks
+        assert [i for b in batches for i in b.chunk_ids()] == [
+            c.chunk_id for c in chunks
+        ]
+
+    def test_documents_are_stored_once_per_batch(self):
+        """Rows of one document point at a single metadata entry."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_chunk_size=400, min_chunk_size=50
+        )
+        chunks = loader.load_document(FIXTURE_PATH / "large_document.md")
+
+        batch = ChunkBatch.from_chunks(chunks)
+
+        assert batch.documents == [chunks[0].metadata]
+        assert list(batch.char_counts) == [c.char_count for c in chunks]
+
+    def test_pickle_protocol_5_uses_out_of_band_buffers(self):
+        """Columns travel as out-of-band buffers and round-trip exactly."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        batch = next(loader.load_batches())
+        buffers = []
+
+        data = pickle.dumps(batch, protocol=5, buffer_callback=buffers.append)
+        restored = pickle.loads(data, buffers=buffers)
+
+        assert buffers
+        assert len(data) < sum(len(c) for c in batch.contents)
+        assert list(restored.to_chunks()) == list(batch.to_chunks())
+
+    def test_restored_batch_accepts_appends(self):
+        """Appending to an unpickled batch copies its columns first."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        chunks = list(loader.load_all_documents())
+        batch = ChunkBatch.from_chunks(chunks[:2])
+        buffers = []
+
+        data = pickle.dumps(batch, protocol=5, buffer_callback=buffers.append)
+        restored = pickle.loads(data, buffers=buffers)
+        restored.append(chunks[2])
+
+        assert list(restored.to_chunks()) == chunks[:3]
+        assert len(batch) == 2
+
+    def test_invalid_batch_size(self):
+        """batch_size must be positive."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        with pytest.raises(ValueError, match="batch_size"):
+            next(loader.load_batches(batch_size=0))
+
+
+class TestAsyncLoader:
+    """Test the asyncio front end of the loader."""
+
+    @pytest.mark.asyncio
+    async def test_matches_sync_loader(self):
+        """aload_all_documents yields the sync chunks in the same order."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        expected = list(loader.load_all_documents())
+
+        chunks = [c async for c in AsyncDocumentLoader(loader).aload_all_documents()]
+
+        assert chunks == expected
+
+    @pytest.mark.asyncio
+    async def test_backpressure_bounds_buffered_chunks(self):
+        """A paused consumer leaves at most max_queue_size chunks buffered."""
+        loader = DocumentLoader(
+            knowledge_base_dir=FIXTURE_PATH, max_chunk_size=400, min_chunk_size=50
+        )
+        async_loader = AsyncDocumentLoader(loader, max_queue_size=1)
+        stream = async_loader.aload_all_documents()
+
+        await anext(stream)
+        await asyncio.sleep(0.1)  # Let the producer run ahead as far as it can
+
+        assert loader.io_stats.files_parsed < len(list(loader._find_markdown_files()))
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_io_stats_are_merged_per_file(self):
+        """Worker threads' IO counters add up to the sync loader's."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        list(loader.load_all_documents())
+        expected = loader.io_stats
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        async for _ in AsyncDocumentLoader(loader, workers=4).aload_all_documents():
+            pass
+
+        assert loader.io_stats == expected
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_producer(self):
+        """Closing the generator early stops ingestion without errors."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        stream = AsyncDocumentLoader(loader).aload_all_documents()
+
+        await anext(stream)
+        await stream.aclose()
+
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        assert not tasks
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self):
+        """Other coroutines keep running while documents load."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        async for _ in AsyncDocumentLoader(loader).aload_all_documents():
+            pass
+        task.cancel()
+
+        assert ticks > 0
+
+    def test_invalid_settings(self):
+        """Pool and queue sizes must be positive."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        with pytest.raises(ValueError, match="max_queue_size"):
+            AsyncDocumentLoader(loader, max_queue_size=0)
+
+
+class TestKnowledgeBaseWatcher:
+    """Test watch mode on a writable copy of the knowledge base."""
+
+    @pytest.fixture
+    def kb_dir(self, tmp_path):
+        (tmp_path / "01-TEMPLATES").mkdir()
+        (tmp_path / "01-TEMPLATES" / "adr.md").write_text(
+            "# ADR\n\n" + "Decision context. " * 40, encoding="utf-8"
+        )
+        return tmp_path
+
+    def run_watcher(self, kb_dir, use_inotify, change):
+        """Start a watcher, apply change, and return the events it emitted."""
+        loader = DocumentLoader(knowledge_base_dir=kb_dir, min_chunk_size=1)
+        watcher = KnowledgeBaseWatcher(
+            loader, debounce=0.1, poll_interval=0.05, use_inotify=use_inotify
+        )
+        events = []
+        received = threading.Event()
+
+        def on_event(event):
+            events.append(event)
+            received.set()
+
+        watcher.subscribe(on_event)
+        with watcher:
+            received.clear()
+            events.clear()
+            change(kb_dir)
+            assert received.wait(5), "No event received"
+            time.sleep(0.3)  # Let a late duplicate show up, if any
+        return events
+
+    @pytest.fixture(
+        params=[
+            False,
+            pytest.param(
+                True,
+                marks=pytest.mark.skipif(
+                    not sys.platform.startswith("linux"), reason="inotify is Linux-only"
+                ),
+            ),
+        ],
+        ids=["polling", "inotify"],
+    )
+    def use_inotify(self, request):
+        return request.param
+
+    def test_initial_load_emits_added(self, kb_dir):
+        """Starting the watcher emits one 'added' event per existing file."""
+        loader = DocumentLoader(knowledge_base_dir=kb_dir, min_chunk_size=1)
+        watcher = KnowledgeBaseWatcher(loader, use_inotify=False)
+        events = []
+        watcher.subscribe(events.append)
+
+        watcher.start()
+        watcher.stop()
+
+        assert [(e.kind, e.filepath) for e in events] == [
+            ("added", str(Path("01-TEMPLATES") / "adr.md"))
+        ]
+        assert events[0].chunks
+
+    def test_burst_of_writes_is_debounced(self, kb_dir, use_inotify):
+        """Several quick writes to one file produce a single update."""
+
+        def change(root):
+            for i in range(5):
+                (root / "01-TEMPLATES" / "adr.md").write_text(
+                    f"# ADR {i}\n\nNew content.", encoding="utf-8"
+                )
+                time.sleep(0.01)
+
+        events = self.run_watcher(kb_dir, use_inotify, change)
+
+        assert [e.kind for e in events] == ["updated"]
+        assert events[0].chunks[0].metadata.title == "ADR 4"
+
+    def test_new_and_deleted_files(self, kb_dir, use_inotify):
+        """Adding and removing files produce added and deleted events."""
+
+        def change(root):
+            (root / "new.md").write_text("# New\n\nFresh page.", encoding="utf-8")
+            (root / "01-TEMPLATES" / "adr.md").unlink()
+
+        events = self.run_watcher(kb_dir, use_inotify, change)
+        kinds = {e.filepath: e.kind for e in events}
+
+        assert kinds == {
+            "new.md": "added",
+            str(Path("01-TEMPLATES") / "adr.md"): "deleted",
+        }
+        deleted = next(e for e in events if e.kind == "deleted")
+        assert deleted.removed_chunk_ids
+
+    def test_filtered_files_are_ignored(self, kb_dir, use_inotify):
+        """Hidden, system and non-Markdown files never produce events."""
+
+        def change(root):
+            (root / ".hidden.md").write_text("# Hidden", encoding="utf-8")
+            (root / "notes.txt").write_text("plain text", encoding="utf-8")
+            (root / ".git").mkdir()
+            (root / ".git" / "x.md").write_text("# X", encoding="utf-8")
+            (root / "visible.md").write_text("# Visible\n\nText.", encoding="utf-8")
+
+        events = self.run_watcher(kb_dir, use_inotify, change)
+
+        assert [e.filepath for e in events] == ["visible.md"]
+
+    def test_new_subdirectory_is_watched(self, kb_dir, use_inotify):
+        """Files in directories created after start are picked up."""
+
+        def change(root):
+            (root / "02-TECH-PACKS").mkdir()
+            (root / "02-TECH-PACKS" / "flutter.md").write_text(
+                "# Flutter\n\nWidgets.", encoding="utf-8"
+            )
+
+        events = self.run_watcher(kb_dir, use_inotify, change)
+
+        assert [(e.kind, e.filepath) for e in events] == [
+            ("added", str(Path("02-TECH-PACKS") / "flutter.md"))
+        ]
+
+
+class TestChunkCache:
+    """Test the content-addressed chunk cache."""
+
+    def test_restart_is_served_from_cache(self, tmp_path):
+        """A fresh loader and cache on the same file reuse every document."""
+        db = tmp_path / "cache.db"
+        with ChunkCache(db) as cache:
+            cold = list(
+                DocumentLoader(
+                    knowledge_base_dir=FIXTURE_PATH, chunk_cache=cache
+                ).load_all_documents()
+            )
+            stored = len(cache)
+
+        with ChunkCache(db) as cache:
+            warm = list(
+                DocumentLoader(
+                    knowledge_base_dir=FIXTURE_PATH, chunk_cache=cache
+                ).load_all_documents()
+            )
+
+            assert warm == cold
+            assert cache.hits == stored
+            assert cache.misses == 0
+
+    def test_config_change_misses(self, tmp_path):
+        """Chunking settings are part of the key."""
+        with ChunkCache(tmp_path / "cache.db") as cache:
+            first = DocumentLoader(knowledge_base_dir=FIXTURE_PATH, chunk_cache=cache)
+            first.load_document(FIXTURE_PATH / "valid.md")
+            loader = DocumentLoader(
+                knowledge_base_dir=FIXTURE_PATH, max_chunk_size=300, chunk_cache=cache
+            )
+
+            loader.load_document(FIXTURE_PATH / "valid.md")
+
+            assert cache.hits == 0
+            assert len(cache) == 2
+
+    def test_uncompressed_entries(self, tmp_path):
+        """Entries round-trip without zstd as well."""
+        with ChunkCache(tmp_path / "cache.db", compress=False) as cache:
+            chunks = [("## Title\n\nBody", 2, None), ("Body", None, 7)]
+            cache.put("key", chunks)
+
+            assert cache.get("key") == chunks
+
+    def test_lru_eviction_respects_budget(self, tmp_path):
+        """Least recently used entries go first once max_bytes is exceeded."""
+        with ChunkCache(tmp_path / "cache.db", max_bytes=2500, compress=False) as cache:
+            for key in ("a", "b"):
+                cache.put(key, [("x" * 1000, None, None)])
+            cache.get("a")  # "b" is now least recently used
+
+            cache.put("c", [("x" * 1000, None, None)])
+
+            assert cache.size_bytes() <= 2500
+            assert cache.get("b") is None
+            assert cache.get("a") is not None
+
+    def test_parallel_workers_share_cache(self, tmp_path):
+        """The cache survives pickling into pool workers."""
+        with ChunkCache(tmp_path / "cache.db") as cache:
+            loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH, chunk_cache=cache)
+            sequential = list(loader.load_all_documents())
+
+            parallel = list(loader.load_all_documents(workers=2))
+
+            assert parallel == sequential
+
+    @pytest.mark.asyncio
+    async def test_async_loader_threads_share_cache(self, tmp_path):
+        """AsyncDocumentLoader pool threads read and fill one cache."""
+        with ChunkCache(tmp_path / "cache.db") as cache:
+            loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH, chunk_cache=cache)
+            async_loader = AsyncDocumentLoader(loader, workers=4)
+            expected = list(
+                DocumentLoader(knowledge_base_dir=FIXTURE_PATH).load_all_documents()
+            )
+
+            cold = [c async for c in async_loader.aload_all_documents()]
+            stored = len(cache)
+            warm = [c async for c in async_loader.aload_all_documents()]
+
+            assert cold == warm == expected
+            assert stored > 0
+            assert cache.hits == stored
+
+    def test_watcher_thread_shares_cache(self, tmp_path):
+        """The watcher thread reloads changed files through the cache."""
+        (tmp_path / "kb").mkdir()
+        target = tmp_path / "kb" / "adr.md"
+        target.write_text("# ADR\n\n" + "Decision context. " * 40, encoding="utf-8")
+        events = []
+        received = threading.Event()
+
+        def on_event(event):
+            events.append(event)
+            received.set()
+
+        with ChunkCache(tmp_path / "cache.db") as cache:
+            loader = DocumentLoader(
+                knowledge_base_dir=tmp_path / "kb", min_chunk_size=1, chunk_cache=cache
+            )
+            watcher = KnowledgeBaseWatcher(
+                loader, debounce=0.05, poll_interval=0.05, use_inotify=False
+            )
+            watcher.subscribe(on_event)
+            with watcher:
+                received.clear()
+                target.write_text("# ADR 2\n\nRevised decision.", encoding="utf-8")
+                assert received.wait(5), "No event received"
+
+            assert events[-1].kind == "updated"
+            assert events[-1].chunks[0].metadata.title == "ADR 2"
+            assert len(cache) == 2
+
+
+class TestParallelLoading:
+    """Test the process-pool ingestion mode."""
+
+    def test_parallel_ordered_matches_sequential(self):
+        """Ordered parallel mode yields exactly the sequential chunk stream."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        sequential = list(loader.load_all_documents())
+        parallel = list(loader.load_all_documents(workers=2, max_in_flight=1))
+
+        assert [(c.metadata.filepath, c.chunk_index) for c in parallel] == [
+            (c.metadata.filepath, c.chunk_index) for c in sequential
+        ]
+        assert [c.content for c in parallel] == [c.content for c in sequential]
+
+    def test_parallel_as_completed_yields_same_chunks(self):
+        """Unordered parallel mode yields the same chunks in any order."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        sequential = list(loader.load_all_documents())
+        parallel = list(loader.load_all_documents(workers=2, ordered=False))
+
+        def key(c):
+            return (c.metadata.filepath, c.chunk_index)
+
+        assert sorted(map(key, parallel)) == sorted(map(key, sequential))
+
+    def test_parallel_continues_on_error(self):
+        """A failing file in one worker does not stop the others."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        problem_file = FIXTURE_PATH / "problem_parallel.md"
+        try:
+            problem_file.write_bytes(b"\x80\x81")
+
+            chunks = list(loader.load_all_documents(workers=2))
+
+            assert any("valid" in str(c.metadata.filepath) for c in chunks)
+            assert not any("problem" in c.metadata.filepath for c in chunks)
+        finally:
+            if problem_file.exists():
+                problem_file.unlink()
+
+    def test_parallel_rejects_invalid_worker_count(self):
+        """Worker count and in-flight bound must be positive."""
+        loader = DocumentLoader(knowledge_base_dir=FIXTURE_PATH)
+
+        with pytest.raises(ValueError, match="workers must be >= 1"):
+            list(loader.load_all_documents(workers=0))
+        with pytest.raises(ValueError, match="max_in_flight must be >= 1"):
+            list(loader.load_all_documents(workers=2, max_in_flight=0))
+
+
+class TestIncrementalIngestion:
+    """Test manifest-based incremental re-ingestion."""
+
+    @pytest.fixture
+    def kb_copy(self, tmp_path):
+        """Writable copy of the mock knowledge base."""
+        import shutil
+
+        kb = tmp_path / "kb"
+        shutil.copytree(FIXTURE_PATH, kb)
+        return kb
+
+    def test_first_run_yields_everything(self, kb_copy, tmp_path):
+        """With an empty manifest every chunk is new."""
+        loader = DocumentLoader(knowledge_base_dir=kb_copy)
+
+        with IngestionManifest(tmp_path / "manifest.db") as manifest:
+            items = list(loader.load_incremental(manifest))
+
+        full = list(loader.load_all_documents())
+        assert [c.chunk_id for c in items] == [c.chunk_id for c in full]
+
+    def test_unchanged_run_is_noop(self, kb_copy, tmp_path):
+        """A second run over an untouched tree yields nothing."""
+        loader = DocumentLoader(knowledge_base_dir=kb_copy)
+        manifest_path = tmp_path / "manifest.db"
+
+        with IngestionManifest(manifest_path) as manifest:
+            list(loader.load_incremental(manifest))
+        with IngestionManifest(manifest_path) as manifest:
+            assert list(loader.load_incremental(manifest)) == []
+
+    def test_touched_but_identical_file_is_skipped(self, kb_copy, tmp_path):
+        """An mtime change alone does not re-chunk the file."""
+        import os
+
+        loader = DocumentLoader(knowledge_base_dir=kb_copy)
+
+        with IngestionManifest(tmp_path / "manifest.db") as manifest:
+            list(loader.load_incremental(manifest))
+            target = kb_copy / "valid.md"
+            os.utime(target, ns=(0, target.stat().st_mtime_ns + 10**9))
+
+            assert list(loader.load_incremental(manifest)) == []
+
+    def test_changed_and_deleted_files(self, kb_copy, tmp_path):
+        """Changed files yield chunks, deleted files yield tombstones."""
+        loader = DocumentLoader(knowledge_base_dir=kb_copy, min_chunk_size=10)
+
+        with IngestionManifest(tmp_path / "manifest.db") as manifest:
+            first = list(loader.load_incremental(manifest))
+            deep_ids = [c.chunk_id for c in first if "deep" in c.metadata.filepath]
+            assert deep_ids
+
+            (kb_copy / "valid.md").write_text("# Valid\n\nRewritten content here.")
+            (kb_copy / "nested" / "deep.md").unlink()
+
+            items = list(loader.load_incremental(manifest))
+
+        chunks = [i for i in items if isinstance(i, DocumentChunk)]
+        tombstones = [i for i in items if isinstance(i, ChunkTombstone)]
+
+        assert {c.metadata.filepath for c in chunks} == {"valid.md"}
+        deleted = [t for t in tombstones if t.file_deleted]
+        assert len(deleted) == 1
+        assert deleted[0].chunk_ids == deep_ids
+
+    def test_chunker_settings_change_rechunks(self, kb_copy, tmp_path):
+        """Unchanged files are re-chunked when the loader settings differ."""
+        manifest_path = tmp_path / "manifest.db"
+        loader = DocumentLoader(knowledge_base_dir=kb_copy)
+        resized = DocumentLoader(knowledge_base_dir=kb_copy, min_chunk_size=10)
+        assert loader.cache_fingerprint != resized.cache_fingerprint
+
+        with IngestionManifest(manifest_path) as manifest:
+            list(loader.load_incremental(manifest))
+        with IngestionManifest(manifest_path) as manifest:
+            items = list(resized.load_incremental(manifest))
+            assert list(resized.load_incremental(manifest)) == []
+
+        chunks = [i for i in items if isinstance(i, DocumentChunk)]
+        full = list(resized.load_all_documents())
+        assert [c.chunk_id for c in chunks] == [c.chunk_id for c in full]
+
+    def test_legacy_manifest_gains_fingerprint_column(self, tmp_path):
+        """Manifests created before fingerprints are migrated on open."""
+        import sqlite3
+
+        path = tmp_path / "manifest.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE files (filepath TEXT PRIMARY KEY, mtime_ns INTEGER "
+            "NOT NULL, size_bytes INTEGER NOT NULL, digest TEXT NOT NULL, "
+            "chunk_ids TEXT NOT NULL)"
+        )
+        conn.execute("INSERT INTO files VALUES ('a.md', 1, 2, 'abc', '[]')")
+        conn.commit()
+        conn.close()
+
+        with IngestionManifest(path) as manifest:
+            assert manifest.get("a.md").fingerprint == ""
+
+
 class TestIntegration:
     """Integration tests combining multiple features."""
 
@@ -0,0 +1,367 @@
+"""
+Test suite for the in-process vector indexes (services.vectors).
+
+Tests cover:
+- Exact cosine top-k against a brute-force reference
+- Add / replace / delete / compact
+- Memory-mapped persistence across reopen
+- HNSW recall against exact search, soft deletes and incremental inserts
+- Quantized storage (int8 / PQ) with exact re-scoring
+- Roaring bitmaps and metadata-filtered search
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from services.vectors.bitmap import RoaringBitmap
+from services.vectors.flat_index import FlatIndex
+from services.vectors.hnsw_index import HNSWIndex
+from services.vectors.metadata_index import MetadataFilter, MetadataIndex
+from services.vectors.quantization import (
+    ProductQuantizer,
+    QuantizedIndex,
+    ScalarQuantizer,
+)
+
+DIM = 16
+
+
+def random_vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIM), dtype=np.float32)
+
+
+def clustered_vectors(count: int, seed: int = 0) -> np.ndarray:
+    """Vectors around a few centers, closer to real embeddings than noise."""
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(42).standard_normal((20, DIM))
+    points = centers[rng.integers(0, 20, count)] + 0.3 * rng.standard_normal(
+        (count, DIM)
+    )
+    return points.astype(np.float32)
+
+
+def brute_force_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores)[:k])
+
+
+class TestFlatIndex:
+    """Test the exact memory-mapped index."""
+
+    def test_search_matches_brute_force(self, tmp_path):
+        """Top-k ids and order match a full sort of cosine scores."""
+        vectors = random_vectors(500)
+        queries = random_vectors(8, seed=1)
+        index = FlatIndex(DIM, tmp_path)
+        index.add([f"v{i}" for i in range(500)], vectors)
+
+        results = index.search(queries, k=10)
+
+        for query, hits in zip(queries, results):
+            expected = [f"v{i}" for i in brute_force_top_k(vectors, query, 10)]
+            assert [hit.id for hit in hits] == expected
+            assert hits[0].score >= hits[-1].score
+
+    def test_single_query_and_small_index(self, tmp_path):
+        """A 1-D query works and k is capped at the index size."""
+        index = FlatIndex(DIM, tmp_path)
+        index.add(["a", "b"], random_vectors(2))
+
+        (hits,) = index.search(random_vectors(1)[0], k=10)
+
+        assert sorted(hit.id for hit in hits) == ["a", "b"]
+
+    def test_add_replaces_existing_id(self, tmp_path):
+        """Re-adding an id overwrites its vector instead of duplicating it."""
+        index = FlatIndex(DIM, tmp_path)
+        vectors = random_vectors(2)
+        index.add(["a"], vectors[:1])
+
+        index.add(["a"], vectors[1:])
+
+        assert len(index) == 1
+        assert index.search(vectors[1], k=1)[0][0].score == pytest.approx(1.0)
+
+    def test_delete_and_compact(self, tmp_path):
+        """Deleted vectors never come back, before or after compaction."""
+        vectors = random_vectors(50)
+        index = FlatIndex(DIM, tmp_path)
+        index.add([f"v{i}" for i in range(50)], vectors)
+
+        assert index.delete(["v0", "v1", "missing"]) == 2
+        hits = index.search(vectors[0], k=50)[0]
+        assert "v0" not in {hit.id for hit in hits}
+        assert len(hits) == 48
+
+        index.compact()
+
+        assert index.deleted_rows == 0
+        assert index.search(vectors[2], k=1)[0][0].id == "v2"
+
+    def test_persists_across_reopen(self, tmp_path):
+        """Vectors and ids survive close and reopen (memory-mapped file)."""
+        vectors = random_vectors(3000)  # Forces the file to grow
+        with FlatIndex(DIM, tmp_path) as index:
+            index.add([f"v{i}" for i in range(3000)], vectors)
+            index.delete(["v7"])
+
+        reopened = FlatIndex(DIM, tmp_path)
+
+        assert len(reopened) == 2999
+        assert "v7" not in reopened
+        assert reopened.search(vectors[42], k=1)[0][0].id == "v42"
+
+    def test_dimension_mismatch(self, tmp_path):
+        """Vectors and existing indexes must match the dimension."""
+        with FlatIndex(DIM, tmp_path) as index:
+            with pytest.raises(ValueError, match="shape"):
+                index.add(["a"], np.zeros((1, DIM + 1)))
+
+        with pytest.raises(ValueError, match="dim"):
+            FlatIndex(DIM + 1, tmp_path)
+
+
+class TestHNSWIndex:
+    """Test the approximate graph index."""
+
+    def test_recall_against_exact_search(self, tmp_path):
+        """Recall@10 stays high with default parameters."""
+        vectors = clustered_vectors(2000)
+        queries = clustered_vectors(50, seed=1)
+        index = HNSWIndex(DIM, tmp_path, M=8, ef_construction=64, seed=0)
+        index.add([f"v{i}" for i in range(2000)], vectors)
+
+        results = index.search(queries, k=10)
+
+        found = 0
+        for query, hits in zip(queries, results):
+            expected = {f"v{i}" for i in brute_force_top_k(vectors, query, 10)}
+            found += len(expected & {hit.id for hit in hits})
+            assert [hit.score for hit in hits] == sorted(
+                (hit.score for hit in hits), reverse=True
+            )
+        assert found / (10 * len(queries)) >= 0.95
+
+    def test_soft_delete_and_replace(self, tmp_path):
+        """Deleted ids never come back; re-adding an id replaces its vector."""
+        vectors = clustered_vectors(300)
+        index = HNSWIndex(DIM, tmp_path, M=8, seed=0)
+        index.add([f"v{i}" for i in range(300)], vectors)
+
+        assert index.delete(["v0", "missing"]) == 1
+        assert "v0" not in {hit.id for hit in index.search(vectors[0], k=20)[0]}
+
+        index.add(["v1"], vectors[2:3])
+
+        assert len(index) == 299
+        assert index.deleted_rows == 2
+        hits = index.search(vectors[2], k=2)[0]
+        assert {hit.id for hit in hits} == {"v1", "v2"}
+
+    def test_incremental_insert_after_reopen(self, tmp_path):
+        """A reopened (mmap-loaded) index answers queries and accepts inserts."""
+        vectors = clustered_vectors(600)
+        with HNSWIndex(DIM, tmp_path, M=8, seed=0) as index:
+            index.add([f"v{i}" for i in range(500)], vectors[:500])
+            index.delete(["v3"])
+
+        reopened = HNSWIndex(DIM, tmp_path, M=8, seed=0)
+        assert isinstance(reopened._vectors, np.memmap)
+        assert len(reopened) == 499
+        assert reopened.search(vectors[42], k=1)[0][0].id == "v42"
+
+        reopened.add([f"v{i}" for i in range(500, 600)], vectors[500:])
+
+        assert reopened.search(vectors[550], k=1)[0][0].id == "v550"
+        assert "v3" not in reopened
+
+    def test_parameter_validation(self, tmp_path):
+        """Bad parameters and mismatched existing indexes are rejected."""
+        with pytest.raises(ValueError, match="M"):
+            HNSWIndex(DIM, tmp_path, M=1)
+        with HNSWIndex(DIM, tmp_path, M=8) as index:
+            index.add(["a"], random_vectors(1))
+
+        with pytest.raises(ValueError, match="M=8"):
+            HNSWIndex(DIM, tmp_path, M=16)
+        with pytest.raises(ValueError, match="dim"):
+            HNSWIndex(DIM + 1, tmp_path, M=8)
+
+
+class TestQuantizedIndex:
+    """Test quantizers and the re-scoring index."""
+
+    @pytest.mark.parametrize(
+        "quantizer", [ScalarQuantizer(DIM), ProductQuantizer(DIM, n_subvectors=4)]
+    )
+    def test_adc_scores_match_decoded_vectors(self, quantizer):
+        """Asymmetric scores equal dot products with the decoded vectors."""
+        vectors = clustered_vectors(500)
+        queries = random_vectors(3, seed=1)
+        quantizer.train(vectors)
+
+        codes = quantizer.encode(vectors)
+
+        assert codes.dtype == np.uint8
+        assert codes.shape == (500, quantizer.code_size)
+        expected = queries @ quantizer.decode(codes).T
+        np.testing.assert_allclose(
+            quantizer.scores(queries, codes), expected, rtol=1e-4, atol=1e-4
+        )
+
+    @pytest.mark.parametrize(
+        "quantizer", [ScalarQuantizer(DIM), ProductQuantizer(DIM, n_subvectors=4)]
+    )
+    def test_rescored_search_matches_exact(self, tmp_path, quantizer):
+        """With re-scoring, results and scores match exact search."""
+        vectors = clustered_vectors(1000)
+        queries = clustered_vectors(20, seed=1)
+        ids = [f"v{i}" for i in range(1000)]
+        index = QuantizedIndex(DIM, quantizer, tmp_path, rescore=10)
+        index.train(vectors)
+        index.add(ids, vectors)
+
+        results = index.search(queries, k=5)
+
+        for query, hits in zip(queries, results):
+            expected = [f"v{i}" for i in brute_force_top_k(vectors, query, 5)]
+            assert [hit.id for hit in hits][:3] == expected[:3]
+        exact = FlatIndex(DIM, tmp_path / "flat")
+        exact.add(ids, vectors)
+        assert results[0][0].score == pytest.approx(
+            exact.search(queries[0], k=1)[0][0].score, abs=1e-5
+        )
+        assert index.memory_bytes < vectors.nbytes
+
+    def test_untrained_and_persisted_quantizer(self, tmp_path):
+        """add() requires training; codes and codebooks survive reopen."""
+        vectors = clustered_vectors(300)
+        index = QuantizedIndex(DIM, ProductQuantizer(DIM, n_subvectors=8), tmp_path)
+        with pytest.raises(ValueError, match="train"):
+            index.add(["a"], vectors[:1])
+
+        index.train(vectors)
+        index.add([f"v{i}" for i in range(300)], vectors)
+        index.delete(["v5"])
+        index.close()
+
+        reopened = QuantizedIndex(DIM, path=tmp_path)
+
+        assert reopened.quantizer.kind == "pq"
+        assert reopened.quantizer.n_subvectors == 8
+        assert reopened.search(vectors[7], k=1)[0][0].id == "v7"
+        hits = reopened.search(vectors[5], k=300, rescore=0)[0]
+        assert "v5" not in {hit.id for hit in hits}
+        with pytest.raises(ValueError, match="already has a quantizer"):
+            QuantizedIndex(DIM, ScalarQuantizer(DIM), tmp_path)
+
+    def test_compact_keeps_codes_aligned(self, tmp_path):
+        """Codes follow their vectors when rows move during compaction."""
+        vectors = clustered_vectors(200)
+        index = QuantizedIndex(DIM, path=tmp_path, rescore=0)
+        index.train(vectors)
+        index.add([f"v{i}" for i in range(200)], vectors)
+        index.delete([f"v{i}" for i in range(0, 200, 2)])
+
+        index.compact()
+        index.add(["new"], vectors[:1])
+
+        assert index.search(vectors[51], k=1)[0][0].id == "v51"
+        assert index.search(vectors[0], k=1)[0][0].id == "new"
+
+
+def row_metadata(row: int) -> dict:
+    """Deterministic metadata: 4 categories, 2 languages, depth 1-3."""
+    return {
+        "category": f"cat{row % 4}",
+        "tags": ["even" if row % 2 == 0 else "odd", f"t{row % 5}"],
+        "language": "es" if row % 3 else "en",
+        "depth": 1 + row % 3,
+    }
+
+
+class TestMetadataFilter:
+    """Test bitmaps, the metadata index and filtered search."""
+
+    def test_bitmap_set_operations(self):
+        """Array and bitmap containers agree with Python sets."""
+        rng = np.random.default_rng(0)
+        dense = set(rng.integers(0, 200_000, 50_000).tolist())  # Bitmap containers
+        sparse = set(rng.integers(0, 200_000, 500).tolist())  # Array containers
+        a, b = RoaringBitmap.from_values(dense), RoaringBitmap.from_values(sparse)
+
+        assert set(a & b) == dense & sparse
+        assert set(a | b) == dense | sparse
+        assert len(a) == len(dense)
+        assert a.nbytes < 50_000 * 4
+
+        value = next(iter(sparse))
+        b.discard(value)
+        a.add(300_000)
+        assert value not in b and 300_000 in a
+        assert set(a & b) == (dense | {300_000}) & (sparse - {value})
+
+    def test_select_combines_conditions(self):
+        """Every condition must hold; unknown values match nothing."""
+        index = MetadataIndex()
+        index.add_many(list(range(60)), [row_metadata(row) for row in range(60)])
+
+        where = MetadataFilter(
+            category="cat0", tags=("even",), language="es", max_depth=2
+        )
+        expected = [
+            row
+            for row in range(60)
+            if row % 4 == 0 and row % 3 and 1 + row % 3 <= 2
+        ]
+
+        assert index.select(where).to_array().tolist() == expected
+        assert index.select(MetadataFilter()) is None
+        assert not index.select(MetadataFilter(category="missing"))
+        assert index.values("language") == {"es": 40, "en": 20}
+
+    def test_filtered_search_matches_post_filter(self, tmp_path):
+        """Pushed-down filters return the exact filtered top-k."""
+        vectors = random_vectors(400)
+        ids = [f"v{i}" for i in range(400)]
+        index = FlatIndex(DIM, tmp_path)
+        index.add(ids, vectors, metadata=[row_metadata(row) for row in range(400)])
+        selective = MetadataFilter(category="cat1", language="en")  # Gathered
+        dense = MetadataFilter(language="es")  # Scanned and masked
+
+        for where, allowed in [
+            (selective, [row for row in range(400) if row % 4 == 1 and row % 3 == 0]),
+            (dense, [row for row in range(400) if row % 3]),
+        ]:
+            hits = index.search(vectors[7], k=5, where=where)[0]
+
+            reference = brute_force_top_k(vectors[allowed], vectors[7], 5)
+            assert [hit.id for hit in hits] == [ids[allowed[i]] for i in reference]
+
+    def test_filters_follow_delete_compact_and_reopen(self, tmp_path):
+        """Metadata stays attached to its vector as rows move."""
+        vectors = clustered_vectors(100)
+        index = QuantizedIndex(DIM, path=tmp_path)
+        index.train(vectors)
+        index.add(
+            [f"v{i}" for i in range(100)],
+            vectors,
+            metadata=[row_metadata(row) for row in range(100)],
+        )
+        index.delete([f"v{i}" for i in range(0, 100, 2)])
+        index.compact()
+        index.close()
+
+        reopened = QuantizedIndex(DIM, path=tmp_path)
+        where = MetadataFilter(tags=("odd", "t3"))
+        hits = reopened.search(vectors[0], k=100, where=where)[0]
+
+        assert sorted(hit.id for hit in hits) == sorted(
+            f"v{i}" for i in range(1, 100, 2) if i % 5 == 3
+        )
+        assert reopened.search(vectors[0], where=MetadataFilter(tags=("even",))) == [
+            []
+        ]